@@ -0,0 +1,147 @@
+"""
+Benchmark Bermuda's area selection, with and without contender pruning.
+
+Simulates many tracked devices, each heard by many proxies, with distances
+that wander a little every cycle (and now and then a device moves to a new
+room). Each cycle runs _refresh_area_by_min_distance() for every device, once
+with the real _area_contenders() (which skips adverts that can't win) and
+once with every advert entered into the contest, as it used to be. The areas
+chosen by the two runs are compared after every cycle.
+
+Run from the repository root, in a Home Assistant development environment:
+
+    python benchmarks/bermuda_area_selection.py [--devices 500] [--scanners 20] [--cycles 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bluetooth_data_tools import monotonic_time_coarse  # noqa: E402
+
+from custom_components.bermuda.bermuda_history import BermudaHistory  # noqa: E402
+from custom_components.bermuda.const import CONF_MAX_RADIUS, DEFAULT_MAX_RADIUS  # noqa: E402
+from custom_components.bermuda.coordinator import BermudaDataUpdateCoordinator  # noqa: E402
+
+
+class BenchScanner:
+    """Just enough of a scanner BermudaDevice for area selection."""
+
+    def __init__(self, index: int) -> None:
+        self.name = f"scanner_{index}"
+        self.area_id = f"area_{index}"
+        self.area_name = f"Area {index}"
+        self.last_seen = 0.0
+
+
+class BenchAdvert:
+    """Just enough of a BermudaAdvert for area selection."""
+
+    def __init__(self, scanner: BenchScanner, distance: float) -> None:
+        self.scanner_device = scanner
+        self.name = scanner.name
+        self.area_id = scanner.area_id
+        self.area_name = scanner.area_name
+        self.stamp = 0.0
+        self.rssi_distance: float | None = distance
+        self.hist_distance_by_interval = BermudaHistory(20)
+
+
+class BenchDevice:
+    """Just enough of a BermudaDevice for area selection."""
+
+    def __init__(self, index: int, scanners: list[BenchScanner], rng: random.Random) -> None:
+        self.name = f"device_{index}"
+        self.area_advert: BenchAdvert | None = None
+        self.diag_area_switch: str | None = None
+        self.adverts = {scanner.name: BenchAdvert(scanner, rng.uniform(0.5, 15)) for scanner in scanners}
+
+    def apply_scanner_selection(self, advert: BenchAdvert | None) -> None:
+        self.area_advert = advert
+
+
+def make_coordinator(prune: bool) -> BermudaDataUpdateCoordinator:
+    """A coordinator with only what _refresh_area_by_min_distance() needs."""
+    coordinator = BermudaDataUpdateCoordinator.__new__(BermudaDataUpdateCoordinator)
+    coordinator.options = {CONF_MAX_RADIUS: DEFAULT_MAX_RADIUS}
+    if not prune:
+        # Every advert is a contender, as before _area_contenders() existed.
+        coordinator._area_contenders = lambda device: device.adverts.values()  # noqa: SLF001
+    return coordinator
+
+
+def make_world(devices: int, scanners: int, seed: int):
+    rng = random.Random(seed)
+    scanner_list = [BenchScanner(i) for i in range(scanners)]
+    return scanner_list, [BenchDevice(i, scanner_list, rng) for i in range(devices)]
+
+
+def step(world, rng: random.Random, stamp: float, move_chance: float) -> None:
+    """Wander the distances a little, and occasionally move a device somewhere else."""
+    scanner_list, device_list = world
+    for scanner in scanner_list:
+        scanner.last_seen = stamp
+    for device in device_list:
+        moving = rng.random() < move_chance
+        for advert in device.adverts.values():
+            if moving:
+                advert.rssi_distance = rng.uniform(0.5, 15)
+            else:
+                advert.rssi_distance = max(0.1, advert.rssi_distance + rng.uniform(-0.3, 0.3))
+            advert.stamp = stamp - rng.random()
+            advert.hist_distance_by_interval.push(advert.rssi_distance)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--scanners", type=int, default=20)
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--move-chance", type=float, default=0.02)
+    args = parser.parse_args()
+
+    full = make_world(args.devices, args.scanners, 1234)
+    pruned = make_world(args.devices, args.scanners, 1234)
+    full_coordinator = make_coordinator(prune=False)
+    pruned_coordinator = make_coordinator(prune=True)
+    rng_a = random.Random(99)
+    rng_b = random.Random(99)
+
+    time_full = 0.0
+    time_pruned = 0.0
+    for cycle in range(args.cycles):
+        stamp = monotonic_time_coarse()
+        step(full, rng_a, stamp, args.move_chance)
+        step(pruned, rng_b, stamp, args.move_chance)
+
+        start = time.perf_counter()
+        for device in full[1]:
+            full_coordinator._refresh_area_by_min_distance(device)  # noqa: SLF001
+        time_full += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for device in pruned[1]:
+            pruned_coordinator._refresh_area_by_min_distance(device)  # noqa: SLF001
+        time_pruned += time.perf_counter() - start
+
+        chosen_full = [device.area_advert and device.area_advert.name for device in full[1]]
+        chosen_pruned = [device.area_advert and device.area_advert.name for device in pruned[1]]
+        if chosen_full != chosen_pruned:
+            print(f"MISMATCH between full and pruned area selection in cycle {cycle}")
+            return 1
+
+    print(f"{args.devices} devices x {args.scanners} scanners, {args.cycles} cycles")
+    print(f"  every advert: {time_full / args.cycles * 1000:8.2f} ms/cycle")
+    print(f"  pruned:       {time_pruned / args.cycles * 1000:8.2f} ms/cycle")
+    print(f"  speedup:      {time_full / time_pruned:8.2f}x  (same areas chosen)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
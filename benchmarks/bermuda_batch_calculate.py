@@ -0,0 +1,338 @@
+"""
+Benchmark Bermuda's per-object and batch (NumPy) distance calculation.
+
+The batch engine (BermudaBatchCalculator below) gathers the history rings of
+every advert into NumPy arrays and computes the velocities and moving averages
+in one vectorised pass each, reusing BermudaAdvert's calculate_data() stages
+for the state handling. It is kept here rather than in the integration as, on
+CPython, copying the python-held histories into arrays costs more than the
+vectorised maths saves (~0.6-0.7x of the per-object path at 1000 devices x 8
+scanners).
+
+Simulates 1,000 devices heard by 8 scanners, feeds both paths identical
+adverts for a number of update cycles, and times only the calculate step
+(BermudaDevice.calculate_data() for every device, versus
+BermudaBatchCalculator.calculate_devices()). After every cycle the two
+simulations are compared and the run aborts if any result differs.
+
+Run from the repository root, in a Home Assistant development environment:
+
+    python benchmarks/bermuda_batch_calculate.py [--devices 1000] [--scanners 8] [--cycles 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from itertools import chain
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from bluetooth_data_tools import monotonic_time_coarse  # noqa: E402
+
+from custom_components.bermuda.bermuda_advert import BermudaAdvert  # noqa: E402
+from custom_components.bermuda.bermuda_device import BermudaDevice  # noqa: E402
+from custom_components.bermuda.const import (  # noqa: E402
+    CONF_ATTENUATION,
+    CONF_DEVTRACK_TIMEOUT,
+    CONF_MAX_VELOCITY,
+    CONF_REF_POWER,
+    CONF_RSSI_OFFSETS,
+    CONF_SMOOTHING_SAMPLES,
+    DEFAULT_ATTENUATION,
+    DEFAULT_DEVTRACK_TIMEOUT,
+    DEFAULT_MAX_VELOCITY,
+    DEFAULT_REF_POWER,
+    DEFAULT_SMOOTHING_SAMPLES,
+    DISTANCE_INFINITE,
+    _LOGGER_SPAM_LESS,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from custom_components.bermuda.bermuda_history import BermudaHistory
+
+OPTIONS = {
+    CONF_ATTENUATION: DEFAULT_ATTENUATION,
+    CONF_DEVTRACK_TIMEOUT: DEFAULT_DEVTRACK_TIMEOUT,
+    CONF_MAX_VELOCITY: DEFAULT_MAX_VELOCITY,
+    CONF_REF_POWER: DEFAULT_REF_POWER,
+    CONF_SMOOTHING_SAMPLES: DEFAULT_SMOOTHING_SAMPLES,
+    CONF_RSSI_OFFSETS: {},
+}
+
+
+class BermudaBatchCalculator:
+    """
+    Runs the calculate_data() step for all devices as vectorised batches.
+
+    Some adverts are referenced by more than one device (metadevices hold the
+    adverts of their source devices), and so get calculated more than once per
+    cycle, just as they do in the per-object path. Each repeat depends on the
+    previous one's result, so the adverts are grouped into "rounds" where each
+    round holds at most one calculation of a given advert.
+    """
+
+    def calculate_devices(self, devices: Iterable[BermudaDevice]) -> None:
+        """Equivalent to calling calculate_data() on each of the devices, in order."""
+        nowstamp = monotonic_time_coarse()
+        adverts: list[BermudaAdvert] = []
+        device_list: list[BermudaDevice] = []
+
+        for device in devices:
+            device_list.append(device)
+            for advert in device.adverts.values():
+                if isinstance(advert, BermudaAdvert):
+                    adverts.append(advert)
+                else:
+                    _LOGGER_SPAM_LESS.error(
+                        "scanner_not_instance", "Scanner device is not a BermudaDevice instance, skipping."
+                    )
+
+        while adverts:
+            # Split off any repeats into the next round.
+            this_round: list[BermudaAdvert] = []
+            repeats: list[BermudaAdvert] = []
+            seen: set[int] = set()
+            for advert in adverts:
+                if id(advert) in seen:
+                    repeats.append(advert)
+                else:
+                    seen.add(id(advert))
+                    this_round.append(advert)
+            self._calculate_adverts(this_round, nowstamp)
+            adverts = repeats
+
+        for device in device_list:
+            device.calculate_device_state()
+
+    def _calculate_adverts(self, adverts: list[BermudaAdvert], nowstamp: float) -> None:
+        """Run one calculate_data() pass over a list of distinct adverts."""
+        pending = [advert for advert in adverts if advert.calculate_data_prepare(nowstamp)]
+        if not pending:
+            return
+
+        for advert, velocity in zip(pending, self.calculate_velocities(pending), strict=True):
+            advert.apply_velocity(velocity)
+
+        for advert, movavg in zip(pending, self.calculate_movavgs(pending), strict=True):
+            advert.apply_smoothed_distance(movavg)
+
+    @staticmethod
+    def _gather(histories: list[BermudaHistory]):
+        """
+        Copy a list of history rings into a 2D array, newest reading in column 0.
+
+        Returns the array and the number of valid entries in each row. Columns past
+        a row's length hold stale values (or NaN) and must be masked by the caller.
+        """
+        bufs, heads, lengths = zip(*[hist.storage() for hist in histories], strict=True)
+        capacities = list(map(len, bufs))
+        flat = list(chain.from_iterable(bufs))
+        width = max(capacities)
+        if min(capacities) == width:
+            # The usual case, every ring is the same size.
+            raw = np.array(flat, dtype=float).reshape(len(histories), width)
+        else:
+            raw = np.full((len(histories), width), np.nan)
+            offset = 0
+            for row, capacity in enumerate(capacities):
+                raw[row, :capacity] = flat[offset : offset + capacity]
+                offset += capacity
+        # None (unused slots, or stamps that were never set) has become NaN.
+        caps = np.array(capacities, dtype=np.intp)
+        index = np.array(heads, dtype=np.intp)[:, None] + np.arange(width)
+        index %= caps[:, None]
+        return np.take_along_axis(raw, index, axis=1), np.array(lengths, dtype=np.intp)
+
+    def calculate_velocities(self, adverts: list[BermudaAdvert]) -> list[float]:
+        """Vectorised BermudaAdvert.calculate_velocity() for each advert."""
+        stamps, stamp_lengths = self._gather([advert.hist_stamp for advert in adverts])
+        distances, distance_lengths = self._gather([advert.hist_distance for advert in adverts])
+        width = min(stamps.shape[1], distances.shape[1])
+        stamps = stamps[:, :width]
+        distances = distances[:, :width]
+        pair_lengths = np.minimum(stamp_lengths, distance_lengths)
+
+        delta_t = stamps[:, :1] - stamps
+        delta_d = distances[:, :1] - distances
+
+        # Velocity versus the previous reading, or 0 if time didn't move forward.
+        first_valid = delta_t[:, 1] > 0
+        first = np.zeros(len(adverts))
+        np.divide(delta_d[:, 1], delta_t[:, 1], out=first, where=first_valid)
+
+        # Peak retreat velocity versus all the older readings.
+        older_valid = (np.arange(width) >= 2) & (np.arange(width) < pair_lengths[:, None]) & (delta_t > 0)
+        older = np.full(stamps.shape, -np.inf)
+        np.divide(delta_d, delta_t, out=older, where=older_valid)
+        older_peak = older.max(axis=1)
+
+        # Older readings only count if the first is not an approach, and only if faster.
+        peak = np.where((first >= 0) & (older_peak > first), older_peak, first)
+
+        velocities = peak.tolist()
+        for row in np.flatnonzero((stamp_lengths > 1) & (distance_lengths < 2)).tolist():
+            # Mismatched histories, let the advert deal with it the usual way.
+            velocities[row] = adverts[row].calculate_velocity()
+        return velocities
+
+    def calculate_movavgs(self, adverts: list[BermudaAdvert]) -> list[float]:
+        """Vectorised BermudaAdvert.calculate_movavg() for each advert."""
+        values, lengths = self._gather([advert.hist_distance_by_interval for advert in adverts])
+        starts = np.array(
+            [advert.rssi_distance_raw or DISTANCE_INFINITE for advert in adverts],
+            dtype=float,
+        )
+        # Running minimum, newest to oldest, seeded with the raw distance. fmin skips
+        # the NaNs that stand in for None readings, as the per-object loop does.
+        running = np.fmin.accumulate(np.concatenate((starts[:, None], values), axis=1), axis=1)
+        # accumulate (not sum) so the additions happen in the same order as the loop.
+        totals = np.add.accumulate(running[:, 1:], axis=1)
+
+        counts = np.maximum(lengths, 1)
+        movavgs = totals[np.arange(len(adverts)), counts - 1] / counts
+        # An empty history averages to just the starting minimum.
+        return np.where(lengths > 0, movavgs, running[:, 0]).tolist()
+
+
+class BenchScanner:
+    """Just enough of a scanner BermudaDevice for BermudaAdvert."""
+
+    def __init__(self, index: int) -> None:
+        self.address = f"aa:bb:cc:00:00:{index:02x}"
+        self.name = f"scanner_{index}"
+        self.area_id = f"area_{index}"
+        self.area_name = f"Area {index}"
+        self.is_remote_scanner = True
+        self.last_seen = 0.0
+        self.stamps: dict[str, float] = {}
+
+    def async_as_scanner_get_stamp(self, address: str) -> float | None:
+        return self.stamps.get(address.upper())
+
+
+class BenchDevice:
+    """A tracked device, borrowing the real calculate methods from BermudaDevice."""
+
+    calculate_data = BermudaDevice.calculate_data
+    calculate_device_state = BermudaDevice.calculate_device_state
+
+    def __init__(self, index: int) -> None:
+        self.address = f"11:22:{index >> 16 & 0xFF:02x}:{index >> 8 & 0xFF:02x}:{index & 0xFF:02x}:00"
+        self.name = f"device_{index}"
+        self.name_bt_local_name = None
+        self.ref_power = 0
+        self.create_sensor = False
+        self.options = OPTIONS
+        self.last_seen = 0.0
+        self.zone = None
+        self.adverts: dict[tuple[str, str], BermudaAdvert] = {}
+
+    def process_manufacturer_data(self, advert) -> None:
+        pass
+
+    def make_name(self) -> None:
+        pass
+
+
+def make_world(devices: int, scanners: int):
+    scanner_list = [BenchScanner(i) for i in range(scanners)]
+    device_list = [BenchDevice(i) for i in range(devices)]
+    return scanner_list, device_list
+
+
+def feed(world, rng: random.Random, stamp: float, hear_chance: float) -> None:
+    """Deliver one cycle's worth of adverts."""
+    scanner_list, device_list = world
+    for device in device_list:
+        for scanner in scanner_list:
+            if rng.random() > hear_chance:
+                continue
+            rssi = rng.randint(-95, -45)
+            scanner.stamps[device.address.upper()] = stamp + rng.random() * 0.9
+            scanner.last_seen = max(scanner.last_seen, scanner.stamps[device.address.upper()])
+            addata = SimpleNamespace(
+                rssi=rssi,
+                tx_power=None,
+                local_name=None,
+                manufacturer_data={},
+                service_data={},
+                service_uuids=[],
+            )
+            key = (device.address, scanner.address)
+            if key in device.adverts:
+                device.adverts[key].update_advertisement(addata, scanner)
+            else:
+                device.adverts[key] = BermudaAdvert(device, addata, OPTIONS, scanner)
+
+
+def snapshot(world):
+    """Everything calculate_data() affects, for comparing the two paths."""
+    _scanners, device_list = world
+    out = []
+    for device in device_list:
+        for advert in device.adverts.values():
+            out.append(
+                (
+                    advert.rssi_distance,
+                    tuple(advert.hist_velocity),
+                    tuple(advert.hist_distance_by_interval),
+                )
+            )
+        out.append(device.zone)
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--scanners", type=int, default=8)
+    parser.add_argument("--cycles", type=int, default=30)
+    parser.add_argument("--hear-chance", type=float, default=0.7)
+    args = parser.parse_args()
+
+    per_object = make_world(args.devices, args.scanners)
+    batched = make_world(args.devices, args.scanners)
+    calculator = BermudaBatchCalculator()
+    rng_a = random.Random(1234)
+    rng_b = random.Random(1234)
+
+    time_object = 0.0
+    time_batch = 0.0
+    for cycle in range(args.cycles):
+        # Both simulations get the same, fresh, stamps (well inside DISTANCE_TIMEOUT).
+        stamp = monotonic_time_coarse()
+        feed(per_object, rng_a, stamp, args.hear_chance)
+        feed(batched, rng_b, stamp, args.hear_chance)
+
+        start = time.perf_counter()
+        for device in per_object[1]:
+            device.calculate_data()
+        time_object += time.perf_counter() - start
+
+        start = time.perf_counter()
+        calculator.calculate_devices(batched[1])
+        time_batch += time.perf_counter() - start
+
+        if snapshot(per_object) != snapshot(batched):
+            print(f"MISMATCH between per-object and batch results in cycle {cycle}")
+            return 1
+
+    adverts = sum(len(device.adverts) for device in per_object[1])
+    print(f"{args.devices} devices x {args.scanners} scanners, {adverts} adverts, {args.cycles} cycles")
+    print(f"  per-object: {time_object / args.cycles * 1000:8.2f} ms/cycle")
+    print(f"  batch:      {time_batch / args.cycles * 1000:8.2f} ms/cycle")
+    print(f"  speedup:    {time_object / time_batch:8.2f}x  (results identical)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
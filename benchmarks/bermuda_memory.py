@@ -0,0 +1,148 @@
+"""
+Measure the memory used per BermudaDevice and per BermudaAdvert.
+
+Builds a population of devices, each heard by several scanners, and reports
+the bytes allocated per device and per advert (including the lists and
+histories they own), using tracemalloc. For comparison the same is done with
+"dict-based" copies of both classes, built on the fly from the current ones
+but with a dict base and a per-instance __dict__, as they were before they
+switched to __slots__.
+
+Run from the repository root, in a Home Assistant development environment:
+
+    python benchmarks/bermuda_memory.py [--devices 1000] [--scanners 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bluetooth_data_tools import monotonic_time_coarse  # noqa: E402
+from homeassistant.helpers import area_registry as ar  # noqa: E402
+from homeassistant.helpers import floor_registry as fr  # noqa: E402
+
+from custom_components.bermuda.bermuda_advert import BermudaAdvert  # noqa: E402
+from custom_components.bermuda.bermuda_device import BermudaDevice  # noqa: E402
+from custom_components.bermuda.const import (  # noqa: E402
+    CONF_ATTENUATION,
+    CONF_MAX_VELOCITY,
+    CONF_REF_POWER,
+    CONF_RSSI_OFFSETS,
+    CONF_SMOOTHING_SAMPLES,
+    DEFAULT_ATTENUATION,
+    DEFAULT_MAX_VELOCITY,
+    DEFAULT_REF_POWER,
+    DEFAULT_SMOOTHING_SAMPLES,
+)
+
+OPTIONS = {
+    CONF_ATTENUATION: DEFAULT_ATTENUATION,
+    CONF_MAX_VELOCITY: DEFAULT_MAX_VELOCITY,
+    CONF_REF_POWER: DEFAULT_REF_POWER,
+    CONF_SMOOTHING_SAMPLES: DEFAULT_SMOOTHING_SAMPLES,
+    CONF_RSSI_OFFSETS: {},
+}
+
+
+def dict_based(cls: type) -> type:
+    """Return a copy of cls with a dict base and no __slots__, like the classes used to be."""
+    namespace = {
+        key: value
+        for key, value in vars(cls).items()
+        if key not in ("__slots__", "__dict__", "__weakref__", *cls.__slots__)
+    }
+    return type(f"DictBased{cls.__name__}", (dict,), namespace)
+
+
+class BenchHass:
+    """Just enough of hass for the registry lookups in BermudaDevice.__init__()."""
+
+    def __init__(self) -> None:
+        self.data = {ar.DATA_REGISTRY: object(), fr.DATA_REGISTRY: object()}
+
+
+def make_coordinator():
+    """Just enough of a coordinator for BermudaDevice.__init__()."""
+    return SimpleNamespace(hass=BenchHass(), options=OPTIONS, hass_version_min_2025_4=True)
+
+
+def make_scanners(device_cls: type, coordinator, count: int) -> list:
+    scanners = []
+    for index in range(count):
+        scanner = device_cls(f"aa:bb:cc:00:00:{index:02x}", coordinator)
+        scanner._is_scanner = True  # noqa: SLF001
+        scanner._is_remote_scanner = True  # noqa: SLF001
+        scanners.append(scanner)
+    return scanners
+
+
+def populate(device_cls: type, advert_cls: type, coordinator, scanners: list, count: int, with_adverts: bool):
+    stamp = monotonic_time_coarse()
+    devices = []
+    for index in range(count):
+        address = f"11:22:{index >> 16 & 0xFF:02x}:{index >> 8 & 0xFF:02x}:{index & 0xFF:02x}:00"
+        device = device_cls(address, coordinator)
+        if with_adverts:
+            for scanner in scanners:
+                scanner.stamps[device.address] = stamp
+                addata = SimpleNamespace(
+                    rssi=-70,
+                    tx_power=None,
+                    local_name=None,
+                    manufacturer_data={},
+                    service_data={},
+                    service_uuids=[],
+                )
+                device.adverts[(device.address, scanner.address)] = advert_cls(device, addata, OPTIONS, scanner)
+        devices.append(device)
+    return devices
+
+
+def measure(device_cls: type, advert_cls: type, devices: int, scanners: int) -> tuple[float, float]:
+    """Return (bytes per device, bytes per advert)."""
+    coordinator = make_coordinator()
+    scanner_list = make_scanners(device_cls, coordinator, scanners)
+    results = []
+    for with_adverts in (False, True):
+        gc.collect()
+        tracemalloc.start()
+        population = populate(device_cls, advert_cls, coordinator, scanner_list, devices, with_adverts)
+        gc.collect()
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(size)
+        del population
+        for scanner in scanner_list:
+            scanner.stamps.clear()
+    per_device = results[0] / devices
+    per_advert = (results[1] - results[0]) / (devices * scanners)
+    return per_device, per_advert
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--scanners", type=int, default=8)
+    args = parser.parse_args()
+
+    old_device, old_advert = measure(
+        dict_based(BermudaDevice), dict_based(BermudaAdvert), args.devices, args.scanners
+    )
+    new_device, new_advert = measure(BermudaDevice, BermudaAdvert, args.devices, args.scanners)
+
+    print(f"{args.devices} devices x {args.scanners} scanners (bytes, including owned lists/histories)")
+    print("                 dict-based    slots   saving")
+    print(f"  per device:    {old_device:10.0f} {new_device:8.0f} {1 - new_device / old_device:8.0%}")
+    print(f"  per advert:    {old_advert:10.0f} {new_advert:8.0f} {1 - new_advert / old_advert:8.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Benchmark meross_lan's header-first parsing of inbound MQTT messages.
+
+Replays the received (RX) messages of one or more meross_lan trace files (the
+tab separated files saved by the device/profile tracing) as if they were
+published on a busy broker carrying many devices, of which only a fraction is
+managed by us. Each message is then handled the way
+MQTTConnection.async_mqtt_message does: the header is looked up to dispatch
+it and the payload is only consumed for managed devices. This is timed for a
+full MerossResponse decode of every message (as it was before) versus the
+MerossLazyResponse header-first parse, and the results of both are checked
+to be identical.
+
+Without --trace a small built-in set of typical messages is used.
+
+Run from the repository root, in a Home Assistant development environment:
+
+    python benchmarks/meross_lan_mqtt_parse.py [--trace FILE ...] [--devices 200] [--managed 0.1]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.meross_lan.merossclient import json_dumps  # noqa: E402
+from custom_components.meross_lan.merossclient.protocol import const as mc  # noqa: E402
+from custom_components.meross_lan.merossclient.protocol.message import (  # noqa: E402
+    MerossLazyResponse,
+    MerossResponse,
+    build_message,
+    get_message_uuid,
+)
+
+# (method, namespace, payload) used when no trace is given
+SAMPLES = [
+    (
+        mc.METHOD_PUSH,
+        "Appliance.Control.ToggleX",
+        {"togglex": [{"channel": 0, "onoff": 1, "lmTime": 1700000000}]},
+    ),
+    (
+        mc.METHOD_GETACK,
+        "Appliance.Control.Electricity",
+        {
+            "electricity": {
+                "channel": 0,
+                "current": 1234,
+                "voltage": 2301,
+                "power": 250000,
+                "config": {"voltageRatio": 188, "electricityRatio": 100},
+            }
+        },
+    ),
+    (
+        mc.METHOD_GETACK,
+        "Appliance.Control.ConsumptionX",
+        {
+            "consumptionx": [
+                {"date": f"2024-01-{day:02}", "time": 1704067200 + day * 86400, "value": day * 37}
+                for day in range(1, 31)
+            ]
+        },
+    ),
+    (
+        mc.METHOD_GETACK,
+        "Appliance.System.All",
+        {
+            "all": {
+                "system": {
+                    "hardware": {
+                        "type": "mss310",
+                        "subType": "us",
+                        "version": "6.0.0",
+                        "chipType": "rtl8710cf",
+                        "uuid": "0" * 32,
+                        "macAddress": "48:e1:e9:00:00:00",
+                    },
+                    "firmware": {
+                        "version": "6.1.8",
+                        "compileTime": "2022/04/22-10:00:00",
+                        "server": "mqtt-eu.meross.com",
+                        "port": 443,
+                        "innerIp": "192.168.1.10",
+                        "userId": 1000000,
+                    },
+                    "time": {"timestamp": 1700000000, "timezone": "Europe/Rome", "timeRule": []},
+                    "online": {"status": 1, "bindId": "x" * 16, "who": 1},
+                },
+                "digest": {
+                    "togglex": [{"channel": 0, "onoff": 1, "lmTime": 1700000000}],
+                    "triggerx": [],
+                    "timerx": [],
+                },
+            }
+        },
+    ),
+]
+
+
+def load_traces(paths: list[str]) -> list[tuple[str, str, dict]]:
+    """Return the (method, namespace, payload) of every RX row in the trace files."""
+    samples = []
+    for path in paths:
+        with open(path, encoding="utf-8", newline="") as file:
+            for row in csv.reader(file, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(row) != 6 or row[1] != "RX":
+                    continue
+                _time, _rxtx, _protocol, method, namespace, data = row
+                if method not in mc.METHOD_ACK_MAP.values() and method != mc.METHOD_PUSH:
+                    continue
+                try:
+                    payload = json.loads(data)
+                except ValueError:
+                    continue
+                if isinstance(payload, dict):
+                    samples.append((method, namespace, payload))
+    return samples
+
+
+def build_stream(samples: list, devices: int, managed: float, count: int, seed: int):
+    """Return (serialized messages, managed uuids) as seen on the broker."""
+    rnd = random.Random(seed)
+    uuids = [f"{index:032x}" for index in range(devices)]
+    managed_uuids = set(rnd.sample(uuids, max(1, int(devices * managed))))
+    stream = []
+    for index in range(count):
+        method, namespace, payload = rnd.choice(samples)
+        uuid = rnd.choice(uuids)
+        message = build_message(
+            namespace,
+            method,
+            payload,
+            f"{index:032x}",
+            "key",
+            f"/appliance/{uuid}/publish",
+        )
+        stream.append(json_dumps(message))
+    return stream, managed_uuids
+
+
+def run_full(stream: list[str], managed: set[str]):
+    results = []
+    for json_str in stream:
+        message = MerossResponse(json_str)
+        header = message[mc.KEY_HEADER]
+        device_id = get_message_uuid(header)
+        header[mc.KEY_NAMESPACE]
+        header[mc.KEY_MESSAGEID]
+        results.append(
+            (device_id, header, message[mc.KEY_PAYLOAD] if device_id in managed else None)
+        )
+    return results
+
+
+def run_lazy(stream: list[str], managed: set[str]):
+    results = []
+    for json_str in stream:
+        message = MerossLazyResponse(json_str)
+        header = message.header
+        device_id = get_message_uuid(header)
+        header[mc.KEY_NAMESPACE]
+        header[mc.KEY_MESSAGEID]
+        results.append(
+            (
+                device_id,
+                header,
+                message.response[mc.KEY_PAYLOAD] if device_id in managed else None,
+            )
+        )
+    return results
+
+
+def best_of(func, repeat: int, *args) -> tuple[float, list]:
+    best = float("inf")
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", action="append", default=[], help="meross_lan trace file (repeatable)")
+    parser.add_argument("--devices", type=int, default=200, help="devices publishing on the broker")
+    parser.add_argument("--managed", type=float, default=0.1, help="fraction of them managed by us")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    samples = load_traces(args.trace) if args.trace else SAMPLES
+    if not samples:
+        print("No RX messages found in the trace files")
+        return 1
+    stream, managed = build_stream(samples, args.devices, args.managed, args.messages, args.seed)
+
+    full_time, full_results = best_of(run_full, args.repeat, stream, managed)
+    lazy_time, lazy_results = best_of(run_lazy, args.repeat, stream, managed)
+    if full_results != lazy_results:
+        print("MISMATCH between full and header-first parsing")
+        return 1
+
+    consumed = sum(1 for result in full_results if result[2] is not None)
+    size = sum(len(json_str) for json_str in stream) / len(stream)
+    print(
+        f"{len(stream)} messages ({len(samples)} distinct, avg {size:.0f} bytes),"
+        f" {consumed} for managed devices"
+    )
+    print(f"  full decode:   {len(stream) / full_time:10.0f} msg/s")
+    print(f"  header-first:  {len(stream) / lazy_time:10.0f} msg/s  ({full_time / lazy_time:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+Benchmark meross_lan's handling of received messages by replaying traces.
+
+Loads one or more meross_lan trace files (the tab separated files saved by the
+device diagnostics tracing, optionally gzipped), builds the device out of the
+descriptor saved in the trace (the HEADER row config or, when missing, the
+Appliance.System.All/Ability replies) and replays every received (RX) message
+through Device._receive, i.e. the same chain used for HTTP and MQTT replies:
+namespace dispatch, NamespaceHandler and entity parsers.
+
+Devices run on a Home Assistant core instance living in a temporary config
+directory: nothing is set up (no platforms, no network, no polling) so the
+entities are never added to the state machine and only the meross_lan side of
+message handling is being measured.
+
+Reports the overall messages/second, the time spent per namespace and, in a
+separate (slower) pass under tracemalloc, the memory allocated per message.
+Payloads already seen for the same channel are skipped by the handlers
+fingerprinting (as they are at runtime): use --parse-all to disable that and
+always exercise the parsers.
+
+Without --trace a small built-in mss310-like device and traffic is used.
+
+Run from the repository root, in a Home Assistant development environment:
+
+    python benchmarks/meross_lan_replay.py [--trace FILE ...] [--repeat 5] [--parse-all]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import gzip
+import inspect
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant import config_entries  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import device_registry as dr  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+
+from custom_components.meross_lan import const as mlc  # noqa: E402
+from custom_components.meross_lan.helpers.component_api import ComponentApi  # noqa: E402
+from custom_components.meross_lan.merossclient import json_dumps  # noqa: E402
+from custom_components.meross_lan.merossclient.protocol import const as mc  # noqa: E402
+from custom_components.meross_lan.merossclient.protocol import namespaces as mn  # noqa: E402
+from custom_components.meross_lan.merossclient.protocol.message import (  # noqa: E402
+    MerossResponse,
+    build_message,
+)
+
+UUID = "0" * 31 + "1"
+KEY = "benchmark"
+
+# payload of an mss310-like device used when no trace is given
+DESCRIPTOR = {
+    mc.KEY_ALL: {
+        mc.KEY_SYSTEM: {
+            mc.KEY_HARDWARE: {
+                mc.KEY_TYPE: "mss310",
+                "subType": "us",
+                mc.KEY_VERSION: "6.0.0",
+                "chipType": "rtl8710cf",
+                mc.KEY_UUID: UUID,
+                mc.KEY_MACADDRESS: "48:e1:e9:00:00:01",
+            },
+            mc.KEY_FIRMWARE: {
+                mc.KEY_VERSION: "6.1.8",
+                "compileTime": "2022/04/22-10:00:00",
+                "server": "mqtt-eu.meross.com",
+                "port": 443,
+                mc.KEY_INNERIP: "192.168.1.10",
+                mc.KEY_USERID: 1000000,
+            },
+            mc.KEY_TIME: {mc.KEY_TIMESTAMP: 0, mc.KEY_TIMEZONE: "", mc.KEY_TIMERULE: []},
+            mc.KEY_ONLINE: {mc.KEY_STATUS: 1},
+        },
+        mc.KEY_DIGEST: {
+            mc.KEY_TOGGLEX: [{mc.KEY_CHANNEL: 0, mc.KEY_ONOFF: 1, "lmTime": 0}],
+            "triggerx": [],
+            "timerx": [],
+        },
+    },
+    mc.KEY_ABILITY: {
+        mn.Appliance_System_All.name: {},
+        mn.Appliance_System_Ability.name: {},
+        mn.Appliance_System_Runtime.name: {},
+        mn.Appliance_Control_ToggleX.name: {},
+        mn.Appliance_Control_Electricity.name: {},
+        mn.Appliance_Control_ConsumptionX.name: {},
+    },
+}
+
+# (method, namespace, payload) used when no trace is given
+SAMPLES = [
+    (
+        mc.METHOD_PUSH,
+        mn.Appliance_Control_ToggleX.name,
+        {mc.KEY_TOGGLEX: [{mc.KEY_CHANNEL: 0, mc.KEY_ONOFF: onoff, "lmTime": 0}]},
+    )
+    for onoff in (0, 1)
+] + [
+    (
+        mc.METHOD_GETACK,
+        mn.Appliance_Control_Electricity.name,
+        {
+            mc.KEY_ELECTRICITY: {
+                mc.KEY_CHANNEL: 0,
+                mc.KEY_CURRENT: 1234 + index,
+                mc.KEY_VOLTAGE: 2301 - index,
+                mc.KEY_POWER: 250000 + index * 100,
+            }
+        },
+    )
+    for index in range(10)
+] + [
+    (
+        mc.METHOD_GETACK,
+        mn.Appliance_Control_ConsumptionX.name,
+        {
+            mc.KEY_CONSUMPTIONX: [
+                {"date": f"2024-01-{day:02}", mc.KEY_TIME: 1704067200 + day * 86400, mc.KEY_VALUE: day * 37}
+                for day in range(1, 31)
+            ]
+        },
+    ),
+    (
+        mc.METHOD_GETACK,
+        mn.Appliance_System_Runtime.name,
+        {mc.KEY_RUNTIME: {mc.KEY_SIGNAL: 76}},
+    ),
+    (
+        mc.METHOD_GETACK,
+        mn.Appliance_System_All.name,
+        DESCRIPTOR,
+    ),
+]
+
+
+def read_trace(path: str):
+    """Return (descriptor payload or None, [(method, namespace, payload)]) from a trace file."""
+    opener = gzip.open if path.endswith(".gz") else open
+    descriptor = None
+    p_all = p_ability = None
+    samples = []
+    with opener(path, "rt", encoding="utf-8", newline="") as file:
+        for row in csv.reader(file, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(row) != 6:
+                continue
+            _time, rxtx, _protocol, method, namespace, data = row
+            if method == "HEADER":
+                try:
+                    descriptor = json.loads(data)["config"][mlc.CONF_PAYLOAD]
+                except (ValueError, KeyError, TypeError):
+                    pass
+                continue
+            if rxtx != "RX" or (method not in (mc.METHOD_GETACK, mc.METHOD_SETACK, mc.METHOD_PUSH)):
+                continue
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(payload, dict):
+                continue
+            if method == mc.METHOD_GETACK:
+                if namespace == mn.Appliance_System_All.name:
+                    p_all = payload.get(mc.KEY_ALL)
+                elif namespace == mn.Appliance_System_Ability.name:
+                    p_ability = payload.get(mc.KEY_ABILITY)
+            samples.append((method, namespace, payload))
+    if not descriptor and p_all and p_ability:
+        descriptor = {mc.KEY_ALL: p_all, mc.KEY_ABILITY: p_ability}
+    return descriptor, samples
+
+
+def create_config_entry(hass: HomeAssistant, descriptor: dict, index: int):
+    device_id = descriptor[mc.KEY_ALL][mc.KEY_SYSTEM][mc.KEY_HARDWARE][mc.KEY_UUID]
+    # ConfigEntry signature changes across HA versions: only pass what it takes
+    kwargs = {
+        "data": {mlc.CONF_DEVICE_ID: device_id, mlc.CONF_PAYLOAD: descriptor, mlc.CONF_KEY: KEY},
+        "discovery_keys": {},
+        "domain": mlc.DOMAIN,
+        "entry_id": f"benchmark{index}",
+        "minor_version": 1,
+        "options": {},
+        "source": config_entries.SOURCE_USER,
+        "subentries_data": None,
+        "title": f"benchmark {index}",
+        "unique_id": device_id,
+        "version": 1,
+    }
+    parameters = inspect.signature(config_entries.ConfigEntry).parameters
+    config_entry = config_entries.ConfigEntry(**{key: value for key, value in kwargs.items() if key in parameters})
+    # like MockConfigEntry.add_to_hass: register without setting it up
+    hass.config_entries._entries[config_entry.entry_id] = config_entry  # noqa: SLF001
+    return device_id, config_entry
+
+
+async def async_create_hass(config_dir: str):
+    hass = HomeAssistant(config_dir)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    return hass
+
+
+def build_stream(device_id: str, samples: list, count: int):
+    """Serialize the samples (cycling them up to count) as received messages."""
+    stream = []
+    for index in range(count):
+        method, namespace, payload = samples[index % len(samples)]
+        message = build_message(namespace, method, payload, f"{index:032x}", KEY, f"/appliance/{device_id}/publish")
+        stream.append((namespace, json_dumps(message)))
+    return stream
+
+
+def replay(device, stream: list, timings: dict[str, list]):
+    receive = device._receive  # noqa: SLF001
+    perf_counter = time.perf_counter
+    messages = [(namespace, MerossResponse(json_str)) for namespace, json_str in stream]
+    epoch = time.time()
+    start = perf_counter()
+    for namespace, message in messages:
+        t = perf_counter()
+        receive(epoch, message)
+        timing = timings[namespace]
+        timing[0] += 1
+        timing[1] += perf_counter() - t
+    return perf_counter() - start
+
+
+def replay_allocations(device, stream: list):
+    """Average (peak) bytes allocated per message and namespace."""
+    receive = device._receive  # noqa: SLF001
+    messages = [(namespace, MerossResponse(json_str)) for namespace, json_str in stream]
+    allocations: dict[str, list] = defaultdict(lambda: [0, 0])
+    epoch = time.time()
+    tracemalloc.start()
+    try:
+        for namespace, message in messages:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            receive(epoch, message)
+            allocation = allocations[namespace]
+            allocation[0] += 1
+            allocation[1] += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return {namespace: size / count for namespace, (count, size) in allocations.items()}
+
+
+async def async_main(args) -> int:
+    if args.trace:
+        workloads = []
+        for path in args.trace:
+            descriptor, samples = read_trace(path)
+            if not descriptor or not samples:
+                print(f"Skipping {path}: no device descriptor or no RX messages found")
+                continue
+            workloads.append((Path(path).name, descriptor, samples))
+    else:
+        workloads = [("built-in mss310", DESCRIPTOR, SAMPLES)]
+    if not workloads:
+        return 1
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_create_hass(config_dir)
+        api = ComponentApi.get(hass)
+        for index, (name, descriptor, samples) in enumerate(workloads):
+            device_id, config_entry = create_config_entry(hass, descriptor, index)
+            device = await api.async_build_device(device_id, config_entry)
+            await device.async_init()
+            if args.parse_all:
+                for handler in device.namespace_handlers.values():
+                    handler.fingerprints = None
+            stream = build_stream(device_id, samples, args.messages)
+
+            timings: dict[str, list] = defaultdict(lambda: [0, 0.0])
+            replay(device, stream, defaultdict(lambda: [0, 0.0]))  # warm-up
+            best = min(replay(device, stream, timings) for _ in range(args.repeat))
+            allocations = replay_allocations(device, stream) if args.allocations else {}
+
+            print(f"{name}: {device.__class__.__name__} ({len(samples)} distinct messages)")
+            print(f"  {len(stream) / best:10.0f} msg/s ({len(stream)} messages, best of {args.repeat})")
+            print(
+                f"  {'namespace':<48}{'count':>8}{'us/msg':>10}{'share':>8}"
+                + (f"{'bytes/msg':>12}" if allocations else "")
+            )
+            total = sum(timing[1] for timing in timings.values())
+            for namespace, (count, elapsed) in sorted(timings.items(), key=lambda item: -item[1][1]):
+                allocation = allocations.get(namespace)
+                print(
+                    f"  {namespace:<48}{count // args.repeat:>8}{elapsed / count * 1e6:>10.1f}"
+                    f"{elapsed / total:>8.1%}"
+                    + (f"{allocation:>12.0f}" if allocation is not None else "")
+                )
+            await device.async_shutdown()
+
+        # this will also terminate the ComponentApi
+        await hass.async_stop(force=True)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", action="append", default=[], help="meross_lan trace file (repeatable)")
+    parser.add_argument("--messages", type=int, default=5000, help="messages replayed per round")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--parse-all", action="store_true", help="disable the handlers payload fingerprinting")
+    parser.add_argument("--no-allocations", dest="allocations", action="store_false", help="skip the tracemalloc pass")
+    return asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Benchmark the xiaomi_home prop refresh from the cloud.
+
+MIoTClient used to refresh props from the cloud in fixed batches of 150
+every REFRESH_PROPS_DELAY: a failing batch was put back as a whole and,
+after three failed cycles, the whole refresh list was dropped. Now
+MIoTHttpClient.get_props_async splits failing requests to isolate the
+props making them fail and feeds an AIMD controller (props_aimd) giving
+the batch size and interval of the next requests.
+
+This runs a real MIoTHttpClient whose API posts are answered by a simulated
+cloud (--latency-ms plus --per-prop-ms per prop, a whole request failing
+when it carries a prop of one of the --bad devices, a --timeouts share of
+the requests timing out whatever they carry) and refreshes
+--devices x --props props with the legacy cycles and with the current
+ones, reporting the time needed, the requests made and the props refreshed
+or lost.
+
+Run from the repository root:
+
+    python benchmarks/xiaomi_home_cloud_refresh.py [--devices 200] [--props 10] [--bad 2] [--timeouts 0.05]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.xiaomi_home.miot.miot_client import (  # noqa: E402
+    REFRESH_PROPS_DELAY,
+    REFRESH_PROPS_RETRY_DELAY,
+)
+from custom_components.xiaomi_home.miot.miot_cloud import MIoTHttpClient  # noqa: E402
+from custom_components.xiaomi_home.miot.miot_error import MIoTErrorCode, MIoTHttpError  # noqa: E402
+
+
+class Cloud:
+    """Answers the MIoTHttpClient posts in place of the MiHome API."""
+
+    def __init__(self, latency: float, per_prop: float, bad_dids: set[str], timeouts: float) -> None:
+        self.latency = latency
+        self.per_prop = per_prop
+        self.bad_dids = bad_dids
+        self.timeouts = timeouts
+        self.rng = random.Random(1)
+        self.requests = 0
+        self.failures = 0
+
+    async def post_async(self, url_path: str, data: dict, timeout: int = 30) -> dict:
+        params = data["params"]
+        self.requests += 1
+        await asyncio.sleep(self.latency + self.per_prop * len(params))
+        if self.rng.random() < self.timeouts:
+            self.failures += 1
+            raise asyncio.TimeoutError()
+        if any(param["did"] in self.bad_dids for param in params):
+            self.failures += 1
+            # As __mihome_api_post_async reports a reply with an error code
+            raise MIoTHttpError("invalid response code, -8, invalid did", MIoTErrorCode.CODE_HTTP_INVALID_RESPONSE)
+        return {"code": 0, "result": [{**param, "code": 0, "value": 1} for param in params]}
+
+
+async def refresh_legacy(cloud: Cloud, pending: dict[str, dict], fresh: set) -> None:
+    """MIoTClient.__refresh_props_from_cloud/handler (cloud only) as they were,
+    get_props_async being a single post."""
+    retry_count = 0
+    while pending:
+        if len(pending) < 150:
+            request_list = pending.copy()
+            pending.clear()
+        else:
+            request_list = dict(pending.popitem() for _ in range(150))
+        try:
+            results = await cloud.post_async(
+                url_path="/app/v2/miotspec/prop/get", data={"datasource": 1, "params": list(request_list.values())}
+            )
+            for result in results["result"]:
+                fresh.add(f'{result["did"]}|{result["siid"]}|{result["piid"]}')
+            retry_count = 0
+            await asyncio.sleep(REFRESH_PROPS_DELAY)
+        except (MIoTHttpError, asyncio.TimeoutError):
+            pending.update(request_list)
+            if retry_count >= 3:
+                pending.clear()
+                return
+            retry_count += 1
+            await asyncio.sleep(REFRESH_PROPS_RETRY_DELAY)
+
+
+async def refresh_current(http: MIoTHttpClient, pending: dict[str, dict], fresh: set) -> None:
+    """MIoTClient.__refresh_props_from_cloud/handler (cloud only)."""
+    retry_count = 0
+    while pending:
+        patch_len = http.props_aimd.batch_size
+        if len(pending) < patch_len:
+            request_list = pending.copy()
+            pending.clear()
+        else:
+            request_list = dict(pending.popitem() for _ in range(patch_len))
+        try:
+            unread: list[dict] = []
+            results = await http.get_props_async(params=list(request_list.values()), unread=unread)
+            for param in unread:
+                key = f'{param["did"]}|{param["siid"]}|{param["piid"]}'
+                pending[key] = request_list.pop(key)
+            if not results:
+                raise MIoTHttpError("get_props_async failed")
+            for result in results:
+                fresh.add(f'{result["did"]}|{result["siid"]}|{result["piid"]}')
+            retry_count = 0
+            await asyncio.sleep(max(REFRESH_PROPS_DELAY, http.props_aimd.interval))
+        except (MIoTHttpError, asyncio.TimeoutError):
+            pending.update(request_list)
+            if retry_count >= 3:
+                pending.clear()
+                return
+            retry_count += 1
+            await asyncio.sleep(REFRESH_PROPS_RETRY_DELAY)
+
+
+async def run(mode: str, args: argparse.Namespace, bad_dids: set[str]):
+    http = MIoTHttpClient(cloud_server="cn", client_id="benchmark", access_token="benchmark")
+    cloud = Cloud(args.latency_ms / 1000, args.per_prop_ms / 1000, bad_dids, args.timeouts)
+    http._MIoTHttpClient__mihome_api_post_async = cloud.post_async  # type: ignore[attr-defined]
+    pending = {}
+    for index in range(args.devices):
+        did = str(100000000 + index)
+        for piid in range(args.props):
+            pending[f"{did}|2|{piid}"] = {"did": did, "siid": 2, "piid": piid}
+    good = {key for key, param in pending.items() if param["did"] not in bad_dids}
+    fresh: set[str] = set()
+    start = time.perf_counter()
+    try:
+        if mode == "legacy":
+            await refresh_legacy(cloud, pending, fresh)
+        else:
+            await refresh_current(http, pending, fresh)
+    finally:
+        await http.deinit_async()
+    return time.perf_counter() - start, cloud, len(fresh & good), len(good)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=200, help="devices refreshed")
+    parser.add_argument("--props", type=int, default=10, help="props per device")
+    parser.add_argument("--bad", type=int, default=2, help="devices making a whole request fail")
+    parser.add_argument("--timeouts", type=float, default=0.05, help="share of requests timing out")
+    parser.add_argument("--latency-ms", type=float, default=50, help="cloud reply latency")
+    parser.add_argument("--per-prop-ms", type=float, default=2, help="cloud reply latency per prop")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    bad_dids = {str(100000000 + index) for index in rng.sample(range(args.devices), args.bad)}
+    print(f"{args.devices} devices x {args.props} props, {args.bad} bad devices, {args.timeouts:.0%} timeouts")
+    failed = False
+    for mode in ("legacy", "current"):
+        elapsed, cloud, refreshed, good = asyncio.run(run(mode, args, bad_dids))
+        failed |= mode == "current" and refreshed != good
+        print(
+            f"  {mode:<8} {elapsed:6.2f}s  {cloud.requests:4} requests ({cloud.failures} failed)"
+            f"  {refreshed}/{good} good props refreshed"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
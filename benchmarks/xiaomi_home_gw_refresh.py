@@ -0,0 +1,155 @@
+"""
+Benchmark the xiaomi_home prop refresh through the central hub gateway.
+
+MIoTClient used to refresh gateway props one per device per cycle: every
+cycle read a prop of each device (proxy/get) and the next one started
+REFRESH_PROPS_DELAY after the slowest of them replied, so that a device
+with N props needed N cycles. MipsLocalClient.get_props_multi_async reads
+all the pending props of a device with a single get_properties rpc (or
+proxy/get one after the other when the gateway doesn't support it), still
+one request in flight per device, with GET_PROPS_CONCURRENCY devices at a
+time.
+
+This runs a real MipsLocalClient (not connected) whose requests are answered
+by a simulated gateway (--latency-ms per request) and measures the time
+needed to get --devices x --props props fresh (time-to-all-props-fresh),
+with the legacy cycles and the current path, with and without the gateway
+supporting get_properties. The simulated gateway checks a device never has
+two requests in flight.
+
+Run from the repository root:
+
+    python benchmarks/xiaomi_home_gw_refresh.py [--devices 50] [--props 10] [--latency-ms 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.xiaomi_home.miot.miot_client import REFRESH_PROPS_DELAY  # noqa: E402
+from custom_components.xiaomi_home.miot.miot_mips import MipsLocalClient  # noqa: E402
+
+
+class Gateway:
+    """Answers the MipsLocalClient requests in place of a central hub."""
+
+    def __init__(self, latency: float, batch: bool) -> None:
+        self.latency = latency
+        self.batch = batch
+        self.requests = 0
+        self.in_flight: set[str] = set()
+        self.in_flight_max = 0
+        self.violations = 0
+
+    async def request_async(self, topic: str, payload: str, timeout_ms: int = 10000) -> dict:
+        msg = json.loads(payload)
+        did = msg["did"]
+        if topic == "proxy/rpcReq" and not self.batch:
+            return {"error": {"code": -1, "message": "unsupported"}}
+        self.requests += 1
+        if did in self.in_flight:
+            self.violations += 1
+        self.in_flight.add(did)
+        self.in_flight_max = max(self.in_flight_max, len(self.in_flight))
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight.discard(did)
+        if topic == "proxy/get":
+            return {"did": did, "siid": msg["siid"], "piid": msg["piid"], "value": msg["piid"]}
+        return {
+            "result": [
+                {"did": did, "siid": p["siid"], "piid": p["piid"], "code": 0, "value": p["piid"]}
+                for p in msg["rpc"]["params"]
+            ]
+        }
+
+
+async def refresh_legacy(client: MipsLocalClient, pending: dict[str, dict], fresh: set) -> None:
+    """MIoTClient.__refresh_props_from_gw cycles as they were."""
+    while pending:
+        request_list = {}
+        for key in list(pending.keys()):
+            did = key.split("|")[0]
+            if did in request_list:
+                continue
+            params = pending.pop(key)
+            request_list[did] = {
+                **params,
+                "fut": client.get_prop_async(did=did, siid=params["siid"], piid=params["piid"], timeout_ms=6000),
+            }
+        results = await asyncio.gather(*[v["fut"] for v in request_list.values()])
+        for (did, param), result in zip(request_list.items(), results):
+            if result is not None:
+                fresh.add(f'{did}|{param["siid"]}|{param["piid"]}')
+        if pending:
+            await asyncio.sleep(REFRESH_PROPS_DELAY)
+
+
+async def refresh_current(client: MipsLocalClient, pending: dict[str, dict], fresh: set) -> None:
+    while pending:
+        params = list(pending.values())
+        pending.clear()
+        results, skipped = await client.get_props_multi_async(params=params, timeout_ms=6000)
+        for result in results:
+            fresh.add(f'{result["did"]}|{result["siid"]}|{result["piid"]}')
+        for param in skipped:
+            pending[f'{param["did"]}|{param["siid"]}|{param["piid"]}'] = param
+        if pending:
+            await asyncio.sleep(REFRESH_PROPS_DELAY)
+
+
+async def run(mode: str, batch: bool, devices: int, props: int, latency: float):
+    client = MipsLocalClient(
+        did="gateway", host="127.0.0.1", group_id="group", ca_file="", cert_file="", key_file=""
+    )
+    gateway = Gateway(latency, batch)
+    client._MipsLocalClient__request_async = gateway.request_async  # type: ignore[attr-defined]
+    pending = {}
+    for index in range(devices):
+        did = str(100000000 + index)
+        for piid in range(props):
+            pending[f"{did}|2|{piid}"] = {"did": did, "siid": 2, "piid": piid}
+    expected = set(pending.keys())
+    fresh: set[str] = set()
+    start = time.perf_counter()
+    await (refresh_legacy if mode == "legacy" else refresh_current)(client, pending, fresh)
+    elapsed = time.perf_counter() - start
+    return elapsed, gateway, fresh == expected
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=50, help="gateway devices")
+    parser.add_argument("--props", type=int, default=10, help="props refreshed per device")
+    parser.add_argument("--latency-ms", type=float, default=30, help="gateway reply latency")
+    args = parser.parse_args()
+
+    print(f"{args.devices} devices x {args.props} props, {args.latency_ms:.0f} ms gateway latency")
+    failed = False
+    for batch in (True, False):
+        print(f"  gateway {'with' if batch else 'without'} get_properties")
+        for mode in ("legacy", "current"):
+            elapsed, gateway, complete = asyncio.run(
+                run(mode, batch, args.devices, args.props, args.latency_ms / 1000)
+            )
+            ok = complete and not gateway.violations
+            failed |= not ok
+            print(
+                f"    {mode:<8} all props fresh in {elapsed:6.2f}s  {gateway.requests:5} requests"
+                f"  {gateway.in_flight_max:3} max in flight"
+                f"  {'ok' if ok else 'FAILED'}"
+                f"{f' ({gateway.violations} concurrent requests per device)' if gateway.violations else ''}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark the xiaomi_home handoff of property updates to the HA loop.
+
+MIoTLan and the MIPS clients decode messages on their own thread/loop and
+used to hand every matched (subscriber, property) over to the main loop with
+its own call_soon_threadsafe, i.e. a write to the main loop self-pipe (a
+wakeup) each. MIoTHandoffQueue queues them and wakes the main loop only once
+per pending drain.
+
+This replays properties_changed messages (--params properties each) from an
+internal thread to a main loop while the latter is kept busy with unrelated
+work (--busy-us per iteration) like the HA loop would be, counting the main
+loop self-pipe writes per 1000 property updates and the time needed to
+deliver them all, for the direct call_soon_threadsafe handoff versus the
+queue. Per-subscriber ordering is checked for both.
+
+Run from the repository root:
+
+    python benchmarks/xiaomi_home_handoff.py [--updates 100000] [--params 10] [--subscribers 2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.xiaomi_home.miot.common import MIoTHandoffQueue  # noqa: E402
+
+
+class Subscriber:
+    def __init__(self) -> None:
+        self.received: list[int] = []
+
+    def handler(self, param: dict, ctx) -> None:
+        self.received.append(param["value"])
+
+
+def run(mode: str, updates: int, params: int, subscribers: int, busy_us: float):
+    main_loop = asyncio.new_event_loop()
+    wakeups = 0
+    write_to_self = main_loop._write_to_self  # noqa: SLF001
+
+    def _write_to_self() -> None:
+        nonlocal wakeups
+        wakeups += 1
+        write_to_self()
+
+    main_loop._write_to_self = _write_to_self  # noqa: SLF001
+    handoff = MIoTHandoffQueue(main_loop)
+    subs = [Subscriber() for _ in range(subscribers)]
+    done = asyncio.Event()
+    messages = updates // params
+
+    def internal_thread() -> None:
+        # like MIoTLan.__message_handler for a properties_changed message
+        value = 0
+        for _ in range(messages):
+            for _ in range(params):
+                param = {"siid": 2, "piid": 1, "value": value}
+                value += 1
+                for sub in subs:
+                    if mode == "direct":
+                        main_loop.call_soon_threadsafe(sub.handler, param, None)
+                    else:
+                        handoff.put(sub.handler, param, None)
+        main_loop.call_soon_threadsafe(done.set)
+
+    async def busy() -> None:
+        # unrelated main loop work (entities, other integrations...)
+        while not done.is_set():
+            end = time.perf_counter() + busy_us / 1e6
+            while time.perf_counter() < end:
+                pass
+            await asyncio.sleep(0)
+
+    async def main() -> float:
+        busy_task = main_loop.create_task(busy())
+        thread = threading.Thread(target=internal_thread)
+        start = time.perf_counter()
+        thread.start()
+        await done.wait()
+        # let the last drain run
+        while sum(len(sub.received) for sub in subs) < messages * params * subscribers:
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - start
+        thread.join()
+        await busy_task
+        return elapsed
+
+    try:
+        elapsed = main_loop.run_until_complete(main())
+    finally:
+        main_loop.close()
+    expected = list(range(messages * params))
+    ordered = all(sub.received == expected for sub in subs)
+    return wakeups, elapsed, ordered
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=100000, help="property updates replayed")
+    parser.add_argument("--params", type=int, default=10, help="properties per properties_changed message")
+    parser.add_argument("--subscribers", type=int, default=2, help="subscribers matching each property")
+    parser.add_argument("--busy-us", type=float, default=50, help="main loop unrelated work per iteration")
+    args = parser.parse_args()
+
+    updates = args.updates // args.params * args.params
+    print(f"{updates} property updates ({args.params} per message, {args.subscribers} subscribers)")
+    for mode in ("direct", "handoff"):
+        wakeups, elapsed, ordered = run(mode, updates, args.params, args.subscribers, args.busy_us)
+        print(
+            f"  {mode:<8} {wakeups * 1000 / updates:8.1f} wakeups/1000 updates"
+            f"  {updates / elapsed:10.0f} updates/s  ordering {'ok' if ordered else 'BROKEN'}"
+        )
+        if not ordered:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
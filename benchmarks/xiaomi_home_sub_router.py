@@ -0,0 +1,105 @@
+"""
+Benchmark the xiaomi_home property subscription lookup.
+
+MIoTClient (entity subscriptions, one per property) and MIoTLan (MIoTClient
+subscriptions, one '#' per device) used to resolve every property change by
+formatting a '{did}/p/{siid}/{piid}' topic and walking the MIoTMatcher trie.
+MIoTSubRouter looks the (did, kind, siid, iid) tuple up in a dict instead,
+plus a small table for the whole device subscriptions.
+
+This subscribes --devices x --props properties, either one by one ('exact',
+like MIoTClient) or with a wildcard per device ('wildcard', like MIoTLan) or
+both, then resolves --lookups random property changes with the legacy
+matcher and with the router, reporting lookups/s and checking both return
+the same subscribers.
+
+Run from the repository root:
+
+    python benchmarks/xiaomi_home_sub_router.py [--devices 100] [--props 20] [--lookups 500000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.xiaomi_home.miot.common import MIoTMatcher, MIoTSubRouter  # noqa: E402
+
+
+def build(devices: int, props: int, mode: str):
+    matcher = MIoTMatcher()
+    router = MIoTSubRouter()
+    for index in range(devices):
+        did = str(100000000 + index)
+        if mode in ("wildcard", "both"):
+            sub = (did, "#")
+            matcher[f"{did}/p/#"] = sub
+            router.set(did, "p", None, None, sub)
+        if mode in ("exact", "both"):
+            for piid in range(props):
+                siid = 2 + piid // 8
+                sub = (did, siid, piid)
+                matcher[f"{did}/p/{siid}/{piid}"] = sub
+                router.set(did, "p", siid, piid, sub)
+    return matcher, router
+
+
+def run_matcher(matcher: MIoTMatcher, messages: list[dict]):
+    result = []
+    start = time.perf_counter()
+    for params in messages:
+        result.append(list(matcher.iter_match(f'{params["did"]}/p/{params["siid"]}/{params["piid"]}')))
+    return time.perf_counter() - start, result
+
+
+def run_router(router: MIoTSubRouter, messages: list[dict]):
+    result = []
+    start = time.perf_counter()
+    for params in messages:
+        result.append(router.match(params["did"], "p", params["siid"], params["piid"]))
+    return time.perf_counter() - start, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=100, help="subscribed devices")
+    parser.add_argument("--props", type=int, default=20, help="subscribed properties per device")
+    parser.add_argument("--lookups", type=int, default=500000, help="property changes resolved per run")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    messages = []
+    for _ in range(args.lookups):
+        piid = rng.randrange(args.props + 2)  # a few unsubscribed ones too
+        messages.append(
+            {
+                "did": str(100000000 + rng.randrange(args.devices)),
+                "siid": 2 + piid // 8,
+                "piid": piid,
+                "value": 0,
+            }
+        )
+
+    print(f"{args.devices} devices x {args.props} properties, {args.lookups} lookups")
+    failed = False
+    for mode in ("exact", "wildcard", "both"):
+        matcher, router = build(args.devices, args.props, mode)
+        matcher_elapsed, matcher_result = run_matcher(matcher, messages)
+        router_elapsed, router_result = run_router(router, messages)
+        match = matcher_result == router_result
+        failed |= not match
+        print(
+            f"  {mode:<8} ({len(router):5} subs)  matcher {args.lookups / matcher_elapsed:10.0f}/s"
+            f"  router {args.lookups / router_elapsed:10.0f}/s"
+            f"  x{matcher_elapsed / router_elapsed:.1f}  results {'match' if match else 'MISMATCH'}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,6 +31,7 @@ from .const import (
 )
 
 # from .const import _LOGGER_SPAM_LESS
+from .bermuda_history import BermudaHistory
 from .util import clean_charbuf, rssi_to_metres
 
 if TYPE_CHECKING:
@@ -45,7 +46,7 @@ if TYPE_CHECKING:
 # ruff: noqa: PLR1730
 
 
-class BermudaAdvert(dict):
+class BermudaAdvert:
     """
     Represents details from a scanner relevant to a specific device.
 
@@ -60,8 +61,45 @@ class BermudaAdvert(dict):
     A BermudaDevice's "adverts" property will contain one of these for each
     scanner that has "seen" it.
 
+    There's one of these for every device/scanner pair, so like BermudaDevice
+    they use __slots__ and any new attribute needs adding to the list below.
     """
 
+    __slots__ = (
+        "scanner_address",
+        "device_address",
+        "_device",
+        "ref_power",
+        "options",
+        "stamp",
+        "new_stamp",
+        "rssi",
+        "tx_power",
+        "rssi_distance",
+        "rssi_distance_raw",
+        "stale_update_count",
+        "conf_rssi_offset",
+        "conf_ref_power",
+        "conf_attenuation",
+        "conf_max_velocity",
+        "conf_smoothing_samples",
+        "hist_stamp",
+        "hist_rssi",
+        "hist_distance",
+        "hist_distance_by_interval",
+        "hist_interval",
+        "hist_velocity",
+        "local_name",
+        "manufacturer_data",
+        "service_data",
+        "service_uuids",
+        "name",
+        "scanner_device",
+        "area_id",
+        "area_name",
+        "scanner_sends_stamps",
+    )
+
     def __hash__(self) -> int:
         """The device-mac / scanner mac uniquely identifies a received advertisement pair."""
         return hash((self.device_address, self.scanner_address))
@@ -88,17 +126,18 @@ class BermudaAdvert(dict):
         self.rssi_distance: float | None = None
         self.rssi_distance_raw: float
         self.stale_update_count = 0  # How many times we did an update but no new stamps were found.
-        self.hist_stamp: list[float] = []
-        self.hist_rssi: list[int] = []
-        self.hist_distance: list[float] = []
-        self.hist_distance_by_interval: list[float] = []  # updated per-interval
-        self.hist_interval = []  # WARNING: This is actually "age of ad when we polled"
-        self.hist_velocity: list[float] = []  # Effective velocity versus previous stamped reading
         self.conf_rssi_offset = self.options.get(CONF_RSSI_OFFSETS, {}).get(self.scanner_address, 0)
         self.conf_ref_power = self.options.get(CONF_REF_POWER)
         self.conf_attenuation = self.options.get(CONF_ATTENUATION)
         self.conf_max_velocity = self.options.get(CONF_MAX_VELOCITY)
         self.conf_smoothing_samples = self.options.get(CONF_SMOOTHING_SAMPLES)
+        # Histories are newest-first ring buffers, so they never need trimming.
+        self.hist_stamp = BermudaHistory(HIST_KEEP_COUNT)
+        self.hist_rssi = BermudaHistory(HIST_KEEP_COUNT)
+        self.hist_distance = BermudaHistory(HIST_KEEP_COUNT)
+        self.hist_distance_by_interval = BermudaHistory(self.conf_smoothing_samples)  # updated per-interval
+        self.hist_interval = BermudaHistory(HIST_KEEP_COUNT)  # WARNING: This is actually "age of ad when we polled"
+        self.hist_velocity = BermudaHistory(HIST_KEEP_COUNT)  # Effective velocity versus previous stamped reading
         self.local_name: list[tuple[str, bytes]] = []
         self.manufacturer_data: list[dict[int, bytes]] = []
         self.service_data: list[dict[str, bytes]] = []
@@ -181,7 +220,7 @@ class BermudaAdvert(dict):
             # and calculate the distance.
 
             self.rssi = advertisementdata.rssi
-            self.hist_rssi.insert(0, self.rssi)
+            self.hist_rssi.push(self.rssi)
 
             self._update_raw_distance(reading_is_new=True)
 
@@ -198,10 +237,10 @@ class BermudaAdvert(dict):
                 _interval = new_stamp - self.stamp
             else:
                 _interval = None
-            self.hist_interval.insert(0, _interval)
+            self.hist_interval.push(_interval)
 
             self.stamp = new_stamp or 0
-            self.hist_stamp.insert(0, self.stamp)
+            self.hist_stamp.push(self.stamp)
 
         # if self.tx_power is not None and scandata.advertisement.tx_power != self.tx_power:
         #     # Not really an erorr, we just don't account for this happening -
@@ -284,7 +323,7 @@ class BermudaAdvert(dict):
         self.rssi_distance_raw = distance
         if reading_is_new:
             # Add a new historical reading
-            self.hist_distance.insert(0, distance)
+            self.hist_distance.push(distance)
             # don't insert into hist_distance_by_interval, that's done by the caller.
         elif self.rssi_distance is not None:
             # We are over-riding readings between cycles.
@@ -296,7 +335,7 @@ class BermudaAdvert(dict):
             if len(self.hist_distance) > 0:
                 self.hist_distance[0] = distance
             else:
-                self.hist_distance.append(distance)
+                self.hist_distance.push(distance)
             if len(self.hist_distance_by_interval) > 0:
                 self.hist_distance_by_interval[0] = distance
             # We don't else because we don't want to *add* a hist-by-interval reading, only
@@ -365,6 +404,21 @@ class BermudaAdvert(dict):
         is how we decide how long to wait, and should accommodate for dropped
         packets and for temporary occlusion (dogs' bodies etc)
         """
+        if self.calculate_data_prepare(monotonic_time_coarse()):
+            self.apply_velocity(self.calculate_velocity())
+            self.apply_smoothed_distance(self.calculate_movavg())
+
+    # The stages below make up calculate_data(). The two pure calculations
+    # (velocity and moving average) are kept apart from the state handling
+    # around them.
+
+    def calculate_data_prepare(self, nowstamp: float) -> bool:
+        """
+        Consume new_stamp and handle the arrival / away cases.
+
+        Returns True if the reading needs the velocity check and smoothing
+        applied (ie, the device is neither newly arrived nor away).
+        """
         new_stamp = self.new_stamp  # should have been set by update()
         self.new_stamp = None  # Clear so we know if an update is missed next cycle
 
@@ -379,125 +433,139 @@ class BermudaAdvert(dict):
                 # clear tends to be more efficient than re-creating
                 # and might have fewer side-effects.
                 self.hist_distance_by_interval.clear()
-                self.hist_distance_by_interval.append(self.rssi_distance_raw)
+                self.hist_distance_by_interval.push(self.rssi_distance_raw)
+            return False
 
-        elif new_stamp is None and (self.stamp is None or self.stamp < monotonic_time_coarse() - DISTANCE_TIMEOUT):
+        if new_stamp is None and (self.stamp is None or self.stamp < nowstamp - DISTANCE_TIMEOUT):
             # DEVICE IS AWAY!
             # Last distance reading is stale, mark device distance as unknown.
             self.rssi_distance = None
             # Clear the smoothing history
             if len(self.hist_distance_by_interval) > 0:
                 self.hist_distance_by_interval.clear()
+            return False
 
-        else:
-            # Add the current reading (whether new or old) to
-            # a historical log that is evenly spaced by update_interval.
-
-            # Verify the new reading is vaguely sensible. If it isn't, we
-            # ignore it by duplicating the last cycle's reading.
-            if len(self.hist_stamp) > 1:
-                # How far (away) did it travel in how long?
-                # we check this reading against the recent readings to find
-                # the peak average velocity we are alleged to have reached.
-                velo_newdistance = self.hist_distance[0]
-                velo_newstamp = self.hist_stamp[0]
-                peak_velocity = 0
-                # walk through the history of distances/stamps, and find
-                # the peak
-                delta_t = velo_newstamp - self.hist_stamp[1]
-                delta_d = velo_newdistance - self.hist_distance[1]
-                if delta_t > 0:
-                    peak_velocity = delta_d / delta_t
-                # if our initial reading is an approach, we are done here
-                if peak_velocity >= 0:
-                    for old_distance, old_stamp in zip(self.hist_distance[2:], self.hist_stamp[2:], strict=False):
-                        if old_stamp is None:
-                            continue  # Skip this iteration if hist_stamp[i] is None
-
-                        delta_t = velo_newstamp - old_stamp
-                        if delta_t <= 0:
-                            # Additionally, skip if delta_t is zero or negative
-                            # to avoid division by zero
-                            continue
-                        delta_d = velo_newdistance - old_distance
-
-                        velocity = delta_d / delta_t
-
-                        # Don't use max() as it's slower.
-                        if velocity > peak_velocity:  # noqa: RUF100, PLR1730
-                            # but on subsequent comparisons we only care if they're faster retreats
-                            peak_velocity = velocity
-                # we've been through the history and have peak velo retreat, or the most recent
-                # approach velo.
-                velocity = peak_velocity
-            else:
-                # There's no history, so no velocity
-                velocity = 0
-
-            self.hist_velocity.insert(0, velocity)
-
-            if velocity > self.conf_max_velocity:
-                if self._device.create_sensor:
-                    _LOGGER.debug(
-                        "This sparrow %s flies too fast (%2fm/s), ignoring",
-                        self._device.name,
-                        velocity,
-                    )
-
-                # Discard the bogus reading by duplicating the last
-                if len(self.hist_distance_by_interval) > 0:
-                    self.hist_distance_by_interval.insert(0, self.hist_distance_by_interval[0])
-                else:
-                    # If nothing to duplicate, just plug in the raw distance.
-                    self.hist_distance_by_interval.insert(0, self.rssi_distance_raw)
-            else:
-                self.hist_distance_by_interval.insert(0, self.rssi_distance_raw)
-
-            # trim the log to length
-            if len(self.hist_distance_by_interval) > self.conf_smoothing_samples:
-                del self.hist_distance_by_interval[self.conf_smoothing_samples :]
-
-            # Calculate a moving-window average, that only includes
-            # historical values if they're "closer" (ie more reliable).
-            #
-            # This might be improved by weighting the values by age, but
-            # already does a fairly reasonable job of hugging the bottom
-            # of the noisy rssi data. A better way to control the maximum
-            # slope angle (other than increasing bucket count) might be
-            # helpful, but probably dependent on use-case.
-            #
-            dist_total: float = 0
-            local_min: float = self.rssi_distance_raw or DISTANCE_INFINITE
-            for distance in self.hist_distance_by_interval:
-                if distance is not None and distance <= local_min:
-                    local_min = distance
-                dist_total += local_min
-
-            if (_hist_dist_len := len(self.hist_distance_by_interval)) > 0:
-                movavg = dist_total / _hist_dist_len
-            else:
-                movavg = local_min
+        # Add the current reading (whether new or old) to
+        # a historical log that is evenly spaced by update_interval.
+        return True
+
+    def calculate_velocity(self) -> float:
+        """
+        Return the peak velocity implied by the newest reading.
 
-            # Finally, set the new, smoothed rssi_distance value.
-            # The average is only helpful if it's lower than the actual reading.
-            if self.rssi_distance_raw is None or movavg < self.rssi_distance_raw:
-                self.rssi_distance = movavg
+        Verify the new reading is vaguely sensible. If it isn't, the caller
+        ignores it by duplicating the last cycle's reading.
+        """
+        if len(self.hist_stamp) > 1:
+            # How far (away) did it travel in how long?
+            # we check this reading against the recent readings to find
+            # the peak average velocity we are alleged to have reached.
+            velo_newdistance = self.hist_distance[0]
+            velo_newstamp = self.hist_stamp[0]
+            peak_velocity = 0
+            # walk through the history of distances/stamps, and find
+            # the peak
+            delta_t = velo_newstamp - self.hist_stamp[1]
+            delta_d = velo_newdistance - self.hist_distance[1]
+            if delta_t > 0:
+                peak_velocity = delta_d / delta_t
+            # if our initial reading is an approach, we are done here
+            if peak_velocity >= 0:
+                for old_distance, old_stamp in zip(
+                    self.hist_distance.iter_newest(2), self.hist_stamp.iter_newest(2), strict=False
+                ):
+                    if old_stamp is None:
+                        continue  # Skip this iteration if hist_stamp[i] is None
+
+                    delta_t = velo_newstamp - old_stamp
+                    if delta_t <= 0:
+                        # Additionally, skip if delta_t is zero or negative
+                        # to avoid division by zero
+                        continue
+                    delta_d = velo_newdistance - old_distance
+
+                    velocity = delta_d / delta_t
+
+                    # Don't use max() as it's slower.
+                    if velocity > peak_velocity:  # noqa: RUF100, PLR1730
+                        # but on subsequent comparisons we only care if they're faster retreats
+                        peak_velocity = velocity
+            # we've been through the history and have peak velo retreat, or the most recent
+            # approach velo.
+            return peak_velocity
+        # There's no history, so no velocity
+        return 0
+
+    def apply_velocity(self, velocity: float):
+        """Record the velocity and add this cycle's reading to hist_distance_by_interval."""
+        self.hist_velocity.push(velocity)
+
+        if velocity > self.conf_max_velocity:
+            if self._device.create_sensor:
+                _LOGGER.debug(
+                    "This sparrow %s flies too fast (%2fm/s), ignoring",
+                    self._device.name,
+                    velocity,
+                )
+
+            # Discard the bogus reading by duplicating the last
+            if len(self.hist_distance_by_interval) > 0:
+                self.hist_distance_by_interval.push(self.hist_distance_by_interval[0])
             else:
-                self.rssi_distance = self.rssi_distance_raw
+                # If nothing to duplicate, just plug in the raw distance.
+                self.hist_distance_by_interval.push(self.rssi_distance_raw)
+        else:
+            self.hist_distance_by_interval.push(self.rssi_distance_raw)
+        # (the ring is sized to conf_smoothing_samples, so no trimming required)
+
+    def calculate_movavg(self) -> float:
+        """
+        Calculate a moving-window average, that only includes
+        historical values if they're "closer" (ie more reliable).
+
+        This might be improved by weighting the values by age, but
+        already does a fairly reasonable job of hugging the bottom
+        of the noisy rssi data. A better way to control the maximum
+        slope angle (other than increasing bucket count) might be
+        helpful, but probably dependent on use-case.
+        """
+        dist_total: float = 0
+        local_min: float = self.rssi_distance_raw or DISTANCE_INFINITE
+        for distance in self.hist_distance_by_interval:
+            if distance is not None and distance <= local_min:
+                local_min = distance
+            dist_total += local_min
+
+        if (_hist_dist_len := len(self.hist_distance_by_interval)) > 0:
+            return dist_total / _hist_dist_len
+        return local_min
+
+    def apply_smoothed_distance(self, movavg: float):
+        """Finally, set the new, smoothed rssi_distance value."""
+        # The average is only helpful if it's lower than the actual reading.
+        if self.rssi_distance_raw is None or movavg < self.rssi_distance_raw:
+            self.rssi_distance = movavg
+        else:
+            self.rssi_distance = self.rssi_distance_raw
 
-        # Trim our history lists
-        del self.hist_distance[HIST_KEEP_COUNT:]
-        del self.hist_interval[HIST_KEEP_COUNT:]
-        del self.hist_rssi[HIST_KEEP_COUNT:]
-        del self.hist_stamp[HIST_KEEP_COUNT:]
-        del self.hist_velocity[HIST_KEEP_COUNT:]
+    def published_state(self) -> tuple:
+        """The values the per-scanner entities publish for this advert, for change tracking."""
+        return (self.rssi_distance, self.rssi_distance_raw, self.area_id)
 
     def to_dict(self):
-        """Convert class to serialisable dict for dump_devices."""
+        """
+        Convert class to serialisable dict for dump_devices.
+
+        Only built on request (diagnostics and the dump_devices service).
+        """
         # using "is" comparisons instead of string matching means
         # linting and typing can catch errors.
         out = {}
-        for var, val in vars(self).items():
+        for var in self.__slots__:
+            if not hasattr(self, var):
+                # Declared but not yet set (eg rssi_distance_raw before the first reading).
+                continue
+            val = getattr(self, var)
             if val in [self.options]:
                 # skip certain vars that we don't want in the dump output.
                 continue
@@ -528,7 +596,7 @@ class BermudaAdvert(dict):
             if isinstance(val, float):
                 out[var] = round(val, 4)
                 continue
-            if isinstance(val, list):
+            if isinstance(val, list | BermudaHistory):
                 out[var] = []
                 for row in val:
                     if isinstance(row, float):
@@ -540,5 +608,5 @@ class BermudaAdvert(dict):
         return out
 
     def __repr__(self) -> str:
-        """Help debugging by giving it a clear name instead of empty dict."""
+        """Help debugging by giving it a clear name."""
         return f"{self.device_address}__{self.scanner_device.name}"
@@ -14,7 +14,7 @@ from __future__ import annotations
 
 import binascii
 import re
-from typing import TYPE_CHECKING, Final
+from typing import TYPE_CHECKING, Any, Final
 
 from bluetooth_data_tools import monotonic_time_coarse
 from homeassistant.components.bluetooth import (
@@ -24,7 +24,7 @@ from homeassistant.components.bluetooth import (
     BluetoothServiceInfoBleak,
 )
 from homeassistant.components.private_ble_device import coordinator as pble_coordinator
-from homeassistant.const import STATE_HOME, STATE_NOT_HOME
+from homeassistant.const import STATE_HOME, STATE_NOT_HOME, STATE_UNAVAILABLE
 from homeassistant.core import callback
 from homeassistant.helpers import area_registry as ar
 from homeassistant.helpers import floor_registry as fr
@@ -60,7 +60,7 @@ if TYPE_CHECKING:
     from .coordinator import BermudaDataUpdateCoordinator
 
 
-class BermudaDevice(dict):
+class BermudaDevice:
     """
     This class is to represent a single bluetooth "device" tracked by Bermuda.
 
@@ -70,8 +70,70 @@ class BermudaDevice(dict):
 
     We're not storing this as an Entity because we don't want all devices to
     become entities in homeassistant, since there might be a _lot_ of them.
+    We keep up to PRUNE_MAX_COUNT of them for up to a day, so they use
+    __slots__ rather than a per-instance __dict__. Any new attribute needs
+    adding to the list below.
     """
 
+    __slots__ = (
+        "name",
+        "name_bt_serviceinfo",
+        "name_bt_local_name",
+        "name_devreg",
+        "name_by_user",
+        "address",
+        "address_ble_mac",
+        "address_wifi_mac",
+        "_coordinator",
+        "ref_power",
+        "ref_power_changed",
+        "options",
+        "unique_id",
+        "address_type",
+        "ar",
+        "fr",
+        "area",
+        "area_id",
+        "area_name",
+        "area_icon",
+        "area_last_seen",
+        "area_last_seen_id",
+        "area_last_seen_icon",
+        "area_distance",
+        "area_rssi",
+        "area_advert",
+        "floor",
+        "floor_id",
+        "floor_name",
+        "floor_icon",
+        "floor_level",
+        "zone",
+        "manufacturer",
+        "_hascanner",
+        "_is_scanner",
+        "_is_remote_scanner",
+        "stamps",
+        "metadevice_type",
+        "metadevice_sources",
+        "beacon_unique_id",
+        "beacon_uuid",
+        "beacon_major",
+        "beacon_minor",
+        "beacon_power",
+        "entry_id",
+        "create_sensor",
+        "create_sensor_done",
+        "create_tracker_done",
+        "create_number_done",
+        "create_button_done",
+        "create_all_done",
+        "last_seen",
+        "diag_area_switch",
+        "changed",
+        "_published",
+        "adverts",
+    )
+
     def __hash__(self) -> int:
         """A BermudaDevice can be uniquely identified by the address used."""
         return hash(self.address)
@@ -139,6 +201,8 @@ class BermudaDevice(dict):
         self.create_all_done: bool = False  # All platform entities are done and ready.
         self.last_seen: float = 0  # stamp from most recent scanner spotting. monotonic_time_coarse
         self.diag_area_switch: str | None = None  # saves output of AreaTests
+        self.changed: set[str] = set()  # Keys of published_state() that changed in the last update
+        self._published: dict[str, Any] = {}  # published_state() as at the last update_changed()
         self.adverts: dict[
             tuple[str, str], BermudaAdvert
         ] = {}  # str will be a scanner address OR a deviceaddress__scanneraddress
@@ -211,7 +275,8 @@ class BermudaDevice(dict):
                 elif top_bits & 0b01:  # Addresses where the first char will be 4,5,6 or 7
                     _LOGGER.debug("Identified Resolvable Private (potential IRK source) Address on %s", self.address)
                     self.address_type = BDADDR_TYPE_RANDOM_RESOLVABLE
-                    self._coordinator.irk_manager.check_mac(self.address)
+                    # Checked against the known IRKs in a batch, once this cycle's adverts are in.
+                    self._coordinator.irk_manager.queue_mac(self.address)
                 elif top_bits & 0b10:
                     self.address_type = "reserved"
                     _LOGGER.debug("Hey, got one of those reserved MACs, %s", self.address)
@@ -557,8 +622,7 @@ class BermudaDevice(dict):
         for this IRK.
         """
         address = mac_norm(service_info.address)
-        if address not in self.metadevice_sources:
-            self.metadevice_sources.insert(0, address)
+        if self._coordinator.add_metadevice_source(self, address):
             _LOGGER.debug("Got %s callback for new IRK address on %s of %s", change, self.name, address)
             # Add the new mac/irk pair to our internal tracker so we don't spend
             # time calculating it on the update. Be wary of causing a loop here, should
@@ -620,6 +684,9 @@ class BermudaDevice(dict):
             # Update the stamp so that the BermudaEntity can clear the cache and show the
             # new measurement(s) immediately.
             self.ref_power_changed = monotonic_time_coarse()
+            if self.metadevice_sources and not self._is_scanner:
+                # Our sources need the new ref_power too.
+                self._coordinator.mark_metadevice_changed(self)
 
     def apply_scanner_selection(self, bermuda_advert: BermudaAdvert | None):
         """
@@ -688,7 +755,15 @@ class BermudaDevice(dict):
                 _LOGGER_SPAM_LESS.error(
                     "scanner_not_instance", "Scanner device is not a BermudaDevice instance, skipping."
                 )
+        self.calculate_device_state()
+
+    def calculate_device_state(self):
+        """
+        Update the device-level (not per-advert) state for this cycle.
 
+        Called by calculate_data() once the adverts are done, or directly by the
+        batch calculator which does the adverts itself.
+        """
         # Update whether this device has been seen recently, for device_tracker:
         if (
             self.last_seen is not None
@@ -703,6 +778,75 @@ class BermudaDevice(dict):
             # We are a device we track. Flag for set-up:
             self.create_sensor = True
 
+    @property
+    def current_mac(self) -> str:
+        """
+        The address this device is currently advertising from.
+
+        For metadevices (iBeacons, Private BLE Devices) that's the source address
+        of the most recent advert, otherwise it's just our own address.
+        """
+        if self.address_type not in [
+            ADDR_TYPE_IBEACON,
+            ADDR_TYPE_PRIVATE_BLE_DEVICE,
+        ]:
+            return self.address
+        # Check the current sources and find the latest
+        current_mac: str = STATE_UNAVAILABLE
+        _best_stamp = 0
+        for source_ad in self.adverts.values():
+            if source_ad.stamp > _best_stamp:  # It's a valid ad
+                current_mac = source_ad.device_address
+                _best_stamp = source_ad.stamp
+        return current_mac
+
+    def published_state(self) -> dict[str, Any]:
+        """
+        Return the values our entities publish to HA, keyed by the names used in self.changed.
+
+        Entities declare which of these keys they show (see BermudaEntity.bermuda_watched),
+        so anything an entity reads from the device for its state or attributes needs to be
+        covered here, otherwise it won't be written out when only that value changes.
+        """
+        state: dict[str, Any] = {
+            "name": self.name,
+            "area": (self.area_id, self.area_name, self.area_icon),
+            "area_last_seen": (self.area_last_seen, self.area_last_seen_icon),
+            "area_distance": self.area_distance,
+            "area_rssi": self.area_rssi,
+            "area_scanner": self.area_advert.scanner_address if self.area_advert is not None else None,
+            "floor": (self.floor_id, self.floor_name, self.floor_icon, self.floor_level),
+            "zone": self.zone,
+            "ref_power": self.ref_power,
+            "current_mac": self.current_mac,
+            "diag_area_switch": self.diag_area_switch,
+        }
+        # Per-scanner values, using the same advert that get_scanner() would pick.
+        latest: dict[str, BermudaAdvert] = {}
+        for advert in self.adverts.values():
+            found = latest.get(advert.scanner_address)
+            _stamp = (found.stamp or 0) if found is not None else 0
+            if _stamp == 0 or (advert.stamp is not None and advert.stamp > _stamp):
+                latest[advert.scanner_address] = advert
+        for scanner_address, advert in latest.items():
+            state[f"scanner:{scanner_address}"] = advert.published_state()
+        return state
+
+    def update_changed(self) -> set[str]:
+        """
+        Work out which published values have changed since the last call.
+
+        Called by the coordinator at the end of each update cycle. The result is kept
+        in self.changed so that entities can skip writing their state to HA when nothing
+        they show has changed, which saves a lot of work for the recorder.
+        """
+        state = self.published_state()
+        published = self._published
+        self.changed = {key for key, value in state.items() if key not in published or published[key] != value}
+        self.changed.update(published.keys() - state.keys())
+        self._published = state
+        return self.changed
+
     def process_advertisement(self, scanner_device: BermudaDevice, advertisementdata: AdvertisementData):
         """
         Add/Update a scanner/advert entry pair on this device, indicating a received advertisement.
@@ -807,9 +951,17 @@ class BermudaDevice(dict):
                         self._coordinator.register_ibeacon_source(self)
 
     def to_dict(self):
-        """Convert class to serialisable dict for dump_devices."""
+        """
+        Convert class to serialisable dict for dump_devices.
+
+        Only built on request (diagnostics and the dump_devices service).
+        """
         out = {}
-        for var, val in vars(self).items():
+        for var in self.__slots__:
+            if not hasattr(self, var):
+                # Declared but not yet set.
+                continue
+            val = getattr(self, var)
             if val is None:
                 # Catch the Nones first, as otherwise they might match some other objects below if
                 # they are None (like self._hascanner), which will prevent them showing at all.
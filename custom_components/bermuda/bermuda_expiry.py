@@ -0,0 +1,79 @@
+"""
+Expiry index for pruning Bermuda devices.
+
+prune_devices() needs the devices that have gone longest without being seen.
+Rather than walking (and sorting) every device on each prune, the coordinator
+keeps them in BermudaExpiryIndex heaps ordered by last_seen, so only the
+stalest entries are ever looked at.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class BermudaExpiryIndex:
+    """
+    A min-heap of (last_seen, address), holding one entry per address.
+
+    Devices update last_seen on every advert, and pushing a new heap entry
+    each time would be wasteful. Instead the entries are re-keyed lazily:
+    whenever the oldest entry is looked at, its device's current last_seen is
+    fetched (via the get_stamp callable), and if it has moved on the entry is
+    pushed back with the new value. So the cost of a prune is proportional to
+    the entries older than its cutoff, not to the number of devices.
+    """
+
+    __slots__ = ("_get_stamp", "_heap", "_members")
+
+    def __init__(self, get_stamp: Callable[[str], float | None]) -> None:
+        # get_stamp returns an address's current last_seen, or None if it's gone.
+        self._get_stamp = get_stamp
+        self._heap: list[tuple[float, str]] = []
+        self._members: set[str] = set()
+
+    def add(self, address: str, stamp: float) -> None:
+        """Add an address to the index. Does nothing if it's already in."""
+        if address not in self._members:
+            self._members.add(address)
+            heapq.heappush(self._heap, (stamp, address))
+
+    def discard(self, address: str) -> None:
+        """Remove an address from the index (its heap entry is dropped lazily)."""
+        self._members.discard(address)
+
+    def peek(self) -> tuple[float, str] | None:
+        """Return the stalest (last_seen, address) without removing it, or None if empty."""
+        heap = self._heap
+        while heap:
+            stamp, address = heap[0]
+            if address not in self._members:
+                # Discarded since it was pushed.
+                heapq.heappop(heap)
+                continue
+            current = self._get_stamp(address)
+            if current is None:
+                # The device is gone.
+                heapq.heappop(heap)
+                self._members.discard(address)
+                continue
+            if current > stamp:
+                # Seen since this entry was pushed, re-key it.
+                heapq.heapreplace(heap, (current, address))
+                continue
+            return stamp, address
+        return None
+
+    def pop(self) -> tuple[float, str] | None:
+        """Remove and return the stalest (last_seen, address), or None if empty."""
+        if (found := self.peek()) is not None:
+            heapq.heappop(self._heap)
+            self._members.discard(found[1])
+        return found
+
+    def __len__(self) -> int:
+        return len(self._members)
@@ -0,0 +1,114 @@
+"""
+Fixed-capacity history storage for Bermuda adverts.
+
+Each BermudaAdvert keeps short histories of stamps, rssi, distances etc, with
+the newest reading at index 0. These used to be plain lists that were grown
+with insert(0, ...) and trimmed with del lst[n:] on every cycle, which shifts
+the whole list each time. BermudaHistory stores the same data in a
+pre-allocated ring, so pushing a reading is O(1) and nothing is re-allocated.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class BermudaHistory:
+    """
+    A newest-first ring buffer of fixed capacity.
+
+    Behaves like the list it replaces for the operations Bermuda uses:
+    len(), iteration (newest first), indexing (0 is the newest) and
+    assignment to an existing index. New readings are added with push(),
+    which silently drops the oldest entry once the buffer is full.
+    """
+
+    __slots__ = ("_buf", "_capacity", "_head", "_len")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            capacity = 1
+        self._capacity: int = capacity
+        self._buf: list[Any] = [None] * capacity
+        self._head: int = 0  # index in _buf of the newest entry
+        self._len: int = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def push(self, value: Any) -> None:
+        """Add a new (newest) reading, discarding the oldest if full."""
+        head = self._head - 1
+        if head < 0:
+            head = self._capacity - 1
+        self._buf[head] = value
+        self._head = head
+        if self._len < self._capacity:
+            self._len += 1
+
+    def clear(self) -> None:
+        """Empty the history. The backing storage is kept for re-use."""
+        self._len = 0
+
+    def storage(self) -> tuple[list[Any], int, int]:
+        """
+        Return the backing list, the position of the newest entry and the length.
+
+        For readers which copy the whole ring in one go and rotate it themselves.
+        Entries past the length are stale and must be ignored. The list must not
+        be modified.
+        """
+        return self._buf, self._head, self._len
+
+    def _index(self, index: int) -> int:
+        """Convert a newest-first index into a position in the backing list."""
+        if index < 0:
+            index += self._len
+        if index < 0 or index >= self._len:
+            raise IndexError("history index out of range")
+        pos = self._head + index
+        if pos >= self._capacity:
+            pos -= self._capacity
+        return pos
+
+    def __getitem__(self, index: int) -> Any:
+        return self._buf[self._index(index)]
+
+    def __setitem__(self, index: int, value: Any) -> None:
+        self._buf[self._index(index)] = value
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.iter_newest()
+
+    def iter_newest(self, start: int = 0, stop: int | None = None) -> Iterator[Any]:
+        """
+        Iterate newest-first over entries start..stop without copying.
+
+        Equivalent to iterating hist[start:stop] on a list, but walks the
+        ring in place.
+        """
+        if stop is None or stop > self._len:
+            stop = self._len
+        if start >= stop:
+            return
+        buf = self._buf
+        capacity = self._capacity
+        pos = self._head + start
+        if pos >= capacity:
+            pos -= capacity
+        for _ in range(stop - start):
+            yield buf[pos]
+            pos += 1
+            if pos == capacity:
+                pos = 0
+
+    def __repr__(self) -> str:
+        """Show the contents newest-first, like the list this replaces."""
+        return f"BermudaHistory({list(self.iter_newest())!r}, capacity={self._capacity})"
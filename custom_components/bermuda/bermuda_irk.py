@@ -2,24 +2,29 @@
 
 from __future__ import annotations
 
+import binascii
 from collections.abc import Callable
 from math import floor
+from time import perf_counter
 from typing import TYPE_CHECKING, NamedTuple
 
 from bleak.backends.device import BLEDevice
-from bluetooth_data_tools import get_cipher_for_irk, monotonic_time_coarse, resolve_private_address
+from bluetooth_data_tools import get_cipher_for_irk, monotonic_time_coarse
 from habluetooth import BluetoothServiceInfoBleak
 from homeassistant.components.bluetooth import BluetoothChange
 from homeassistant.const import MAJOR_VERSION, MINOR_VERSION
 
-from .const import _LOGGER, DOMAIN, PRUNE_TIME_KNOWN_IRK, IrkTypes
+from .const import _LOGGER, DOMAIN, PRUNE_TIME_KNOWN_IRK, PRUNE_TIME_UNKNOWN_IRK, IrkTypes
 
 if TYPE_CHECKING:
-    from cryptography.hazmat.primitives.ciphers import Cipher
+    from cryptography.hazmat.primitives.ciphers import Cipher, CipherContext
     from homeassistant.components.bluetooth import BluetoothCallback
 
 type Cancellable = Callable[[], None]
 
+# The RPA hash is the low 24 bits of AES(irk, 13 zero bytes + prand)
+_RPA_PADDING: bytes = b"\x00" * 13
+
 
 class ResolvableMAC(NamedTuple):
     """Stores a mac address along with its IRK and expiry time."""
@@ -35,12 +40,24 @@ class BermudaIrkManager:
 
     - add_irk() as each IRK is learned
     - check_mac() whenever (results are cached)
+    - queue_mac() and resolve_pending() to check a batch of MACs at once
+
+    Each IRK keeps a single AES-ECB encryptor for its lifetime (ECB carries no state
+    between blocks, so one context can encrypt any number of them), and a batch of
+    MACs is checked against an IRK with one call covering all of their blocks.
     """
 
     def __init__(self) -> None:
         self._irks: dict[bytes, Cipher] = {}
+        self._encryptors: dict[bytes, CipherContext] = {}
         self._macs: dict[str, ResolvableMAC] = {}
+        self._pending: set[str] = set()
         self._irk_callbacks: dict[bytes, list[BluetoothCallback]] = {}
+        # Resolver timings, for diagnostics.
+        self._stats_batches: int = 0
+        self._stats_checks: int = 0  # MAC x IRK combinations tested
+        self._stats_time_total: float = 0
+        self._stats_time_max: float = 0
 
     def add_irk(self, irk: bytes) -> list[str]:
         """Adds an IRK to the internal list. Returns matching MACs, if any."""
@@ -48,16 +65,10 @@ class BermudaIrkManager:
         if irk not in self._irks:
             # Save new irk and cipher
             self._irks[irk] = cipher = get_cipher_for_irk(irk)
+            self._encryptors[irk] = cipher.encryptor()
             # Check any previously unknown MACs for matches and update them.
-
-            macs.extend(
-                macirk.mac
-                for macirk in self._macs.values()
-                if (
-                    macirk.irk in IrkTypes.unresolved()
-                    and self._validate_mac_irk(macirk.mac, irk, cipher) not in IrkTypes.unresolved()
-                )
-            )
+            unresolved = [macirk.mac for macirk in self._macs.values() if macirk.irk in IrkTypes.unresolved()]
+            macs.extend(self._resolve_batch(unresolved, [irk]))
 
             _LOGGER.debug("New IRK %s... matches %d of %d existing MACs", irk.hex()[:4], len(macs), len(self._macs))
         return macs
@@ -80,6 +91,8 @@ class BermudaIrkManager:
 
         We cannot know if an old MAC will return, so we keep them around for the
         max permissable time (according to the Bluetooth spec), then let them go.
+        MACs that didn't match any IRK are only kept for PRUNE_TIME_UNKNOWN_IRK,
+        the same as the devices they belong to.
         """
         nowstamp = monotonic_time_coarse()
         expired = [macirk.mac for macirk in self._macs.values() if macirk.expires < nowstamp]
@@ -100,6 +113,19 @@ class BermudaIrkManager:
         # Do the math
         return self._validate_mac(address)
 
+    def queue_mac(self, address: str) -> None:
+        """Queue a MAC to be checked against the known IRKs at the next resolve_pending()."""
+        if address not in self._macs:
+            self._pending.add(address)
+
+    def resolve_pending(self) -> list[str]:
+        """Check all the queued MACs against all known IRKs in one go. Returns the matching MACs."""
+        if not self._pending:
+            return []
+        pending = [address for address in self._pending if address not in self._macs]
+        self._pending.clear()
+        return self._resolve_batch(pending, list(self._irks))
+
     def add_macirk(self, address: str, irk: bytes) -> bytes:
         """Insert a new IRK and MAC that have already been validated."""
         self.add_irk(irk)
@@ -119,45 +145,74 @@ class BermudaIrkManager:
 
         Returns the IRK if found, otherwise an IrkType
         """
-        for irk, cipher in self._irks.items():
-            result = self._validate_mac_irk(address, irk, cipher)
-            if result == irk:
-                return irk
-        # Failed to match anything, we should save it so we know.
-        return self._update_saved_mac(address, IrkTypes.NO_KNOWN_IRK_MATCH.value)
-
-    def _validate_mac_irk(self, address: str, irk: bytes, cipher: Cipher | None) -> bytes:
+        self._pending.discard(address)
+        self._resolve_batch([address], list(self._irks))
+        return self._macs[address].irk
+
+    def _resolve_batch(self, addresses: list[str], irks: list[bytes]) -> list[str]:
         """
-        Checks address against a given IRK.
+        Check each of the addresses against each of the given IRKs, and save the results.
 
-        Returns the matching IRK on success, or an IrkType
+        Addresses that match fire the IRK's callbacks, the rest are saved as an IrkType
+        so that we don't test them again (until a new IRK arrives). Returns the matching
+        addresses.
         """
-        if not cipher:
-            cipher = self._irks.get(irk, get_cipher_for_irk(irk))
-            if cipher is None:
-                _LOGGER.error(
-                    "_validate_mac_irk called without prepared cipher for %s %s - this is a bug", address, irk.hex()
-                )
-        if resolve_private_address(cipher, address):
-            _LOGGER.debug(
-                "######======---- Found new valid MAC for irk %s - %s. Sending callbacks", irk.hex()[:4], address
-            )
-            result = self._update_saved_mac(address, irk)
-            if result != irk:
-                _LOGGER.error("Something went wrong saving macirk: %s %s is not irk %s", address, result, irk)
-            self.fire_callbacks(irk, address)
-            return result
-        if int(address[0], 16) & 0x04:
-            _LOGGER.debug("IRK does not resolve %s with %s", address, irk.hex()[:4])
-            return self._update_saved_mac(address, IrkTypes.NO_KNOWN_IRK_MATCH.value)
-        else:
-            return self._update_saved_mac(address, IrkTypes.NOT_RESOLVABLE_ADDRESS.value)
+        if not addresses:
+            return []
+        _start = perf_counter()
+
+        # Split each RPA into its prand (padded into an AES block) and hash parts.
+        candidates: list[str] = []
+        blocks: list[bytes] = []
+        hashes: list[bytes] = []
+        for address in addresses:
+            rpa = binascii.unhexlify(address.replace(":", ""))
+            if rpa[0] & 0xC0 != 0x40:
+                # Not an RPA
+                self._update_saved_mac(address, IrkTypes.NOT_RESOLVABLE_ADDRESS.value)
+                continue
+            candidates.append(address)
+            blocks.append(_RPA_PADDING + rpa[:3])
+            hashes.append(rpa[3:])
+
+        matched: dict[str, bytes] = {}
+        if candidates:
+            plaintext = b"".join(blocks)
+            for irk in irks:
+                if (encryptor := self._encryptors.get(irk)) is None:
+                    _LOGGER.error("_resolve_batch called for unknown irk %s - this is a bug", irk.hex()[:4])
+                    continue
+                ciphertext = encryptor.update(plaintext)
+                self._stats_checks += len(candidates)
+                for index, address in enumerate(candidates):
+                    if address not in matched and ciphertext[index * 16 + 13 : index * 16 + 16] == hashes[index]:
+                        matched[address] = irk
+
+            for address in candidates:
+                if (irk := matched.get(address)) is not None:
+                    _LOGGER.debug(
+                        "######======---- Found new valid MAC for irk %s - %s. Sending callbacks",
+                        irk.hex()[:4],
+                        address,
+                    )
+                    self._update_saved_mac(address, irk)
+                    self.fire_callbacks(irk, address)
+                else:
+                    self._update_saved_mac(address, IrkTypes.NO_KNOWN_IRK_MATCH.value)
+
+        _elapsed = perf_counter() - _start
+        self._stats_batches += 1
+        self._stats_time_total += _elapsed
+        self._stats_time_max = max(self._stats_time_max, _elapsed)
+        return list(matched)
 
     def _update_saved_mac(self, address: str, irk: bytes) -> bytes:
         """Save an IRK result against the given MAC."""
+        # Unresolved MACs only need remembering for as long as their device is kept.
+        lifetime = PRUNE_TIME_UNKNOWN_IRK if irk in IrkTypes.unresolved() else PRUNE_TIME_KNOWN_IRK
         if (macirk := self._macs.get(address, None)) is None:
             # No existing, save anew.
-            expiry = floor(monotonic_time_coarse() + PRUNE_TIME_KNOWN_IRK)
+            expiry = floor(monotonic_time_coarse() + lifetime)
             self._macs[address] = ResolvableMAC(address, expiry, irk)
             _LOGGER.debug("Saved NEW Macirk pair: %s %s", address, irk.hex())
             return irk
@@ -166,8 +221,9 @@ class BermudaIrkManager:
             _LOGGER.debug(
                 "RE-saving macirk for mac %s, old irk %s, new irk %s", address, macirk.irk.hex()[:4], irk.hex()[:4]
             )
-            # Replace the entry with a new macirk.
-            self._macs[address] = ResolvableMAC(address, macirk.expires, irk)
+            # Replace the entry with a new macirk, which may have a longer lifetime now.
+            expiry = max(macirk.expires, floor(monotonic_time_coarse() + lifetime))
+            self._macs[address] = ResolvableMAC(address, expiry, irk)
             return irk
         else:
             _LOGGER.debug("No change to macirk %s %s", macirk.mac, macirk.irk.hex()[:4])
@@ -242,4 +298,11 @@ class BermudaIrkManager:
         return {
             "irks": [irk.hex() for irk in self._irks],
             "macs": macs,
+            "resolver": {
+                "pending": len(self._pending),
+                "batches": self._stats_batches,
+                "checks": self._stats_checks,
+                "time_total_ms": round(self._stats_time_total * 1000, 3),
+                "time_max_ms": round(self._stats_time_max * 1000, 3),
+            },
         }
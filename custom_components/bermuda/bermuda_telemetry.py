@@ -0,0 +1,204 @@
+"""
+Streaming telemetry export, for calibrating ref_power and attenuation offline.
+
+While enabled (by the bermuda.telemetry service) the coordinator hands each
+update cycle's fresh readings to a BermudaTelemetryWriter, which appends them
+to a compact binary file from an executor thread, so the event loop never
+waits on the disk. The file is rotated when it reaches its size limit, and if
+the writer falls behind, the oldest queued rows are dropped rather than
+letting the queue grow without bound.
+
+File format: MAGIC, then a series of records, each starting with a tag byte:
+
+- b"N" a name: <H id><B length>, then the UTF-8 address. Ids are assigned in
+  order of first use within each file, so every file (including rotated
+  ones) can be read on its own.
+- b"R" a reading: <d timestamp><H device id><H scanner id><f rssi>
+  <f raw distance><f smoothed distance>. The timestamp is unix time, and NaN
+  stands in for missing values.
+
+read_telemetry() turns a file back into rows.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import struct
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, BinaryIO
+
+from .const import _LOGGER, _LOGGER_SPAM_LESS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# (timestamp, device address, scanner address, rssi, raw distance, smoothed distance)
+type TelemetryRow = tuple[float, str, str, float | None, float | None, float | None]
+
+MAGIC = b"BERMUDA-TELEMETRY-1\n"
+_TAG_NAME = b"N"
+_TAG_ROW = b"R"
+_NAME = struct.Struct("<cHB")
+_ROW = struct.Struct("<cdHHfff")
+_MAX_NAMES = 0xFFFF  # Ids are 16 bit, so start a new file before running out.
+
+
+def _nan(value: float | None) -> float:
+    return math.nan if value is None else value
+
+
+def _none(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+class BermudaTelemetryWriter:
+    """
+    Appends telemetry rows to a size-bounded, rotating file.
+
+    submit() just queues the rows, and is cheap enough to call from the event
+    loop. flush() does the packing and writing, and blocks, so it belongs in
+    an executor. Each writer starts a fresh file, rotating out any left over
+    from a previous run.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int, max_queued: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self._queue: deque[TelemetryRow] = deque(maxlen=max_queued)
+        self._lock = threading.Lock()  # Only one flush() at a time.
+        self._file: BinaryIO | None = None
+        self._size = 0
+        self._names: dict[str, int] = {}
+
+    def submit(self, rows: list[TelemetryRow]) -> None:
+        """Queue rows for the next flush(), dropping the oldest if the queue is full."""
+        overflow = len(self._queue) + len(rows) - (self._queue.maxlen or 0)
+        if overflow > 0:
+            self.rows_dropped += overflow
+        self._queue.extend(rows)
+
+    @property
+    def pending(self) -> int:
+        """Number of rows waiting for a flush()."""
+        return len(self._queue)
+
+    def flush(self) -> None:
+        """Write out everything queued so far."""
+        with self._lock:
+            try:
+                self._flush()
+            except OSError as err:
+                _LOGGER_SPAM_LESS.error(
+                    "telemetry_write_failed", "Failed writing telemetry to %s, dropping rows: %s", self.path, err
+                )
+                self.rows_dropped += len(self._queue)
+                self._queue.clear()
+                self._close()
+
+    def close(self) -> None:
+        """Flush anything still queued and close the file."""
+        self.flush()
+        with self._lock:
+            self._close()
+
+    def _flush(self) -> None:
+        queue = self._queue
+        buffer = bytearray()
+        written = 0
+        while queue:
+            # Only flush() takes from the queue, so it can't empty under us.
+            timestamp, device, scanner, rssi, raw, smoothed = queue.popleft()
+            if (
+                self._file is None
+                or self._size + len(buffer) >= self.max_bytes
+                or len(self._names) >= _MAX_NAMES - 1
+            ):
+                self._write(buffer)
+                buffer.clear()
+                self._open()
+            device_id = self._name_id(device, buffer)
+            scanner_id = self._name_id(scanner, buffer)
+            buffer += _ROW.pack(_TAG_ROW, timestamp, device_id, scanner_id, _nan(rssi), _nan(raw), _nan(smoothed))
+            written += 1
+        if buffer:
+            self._write(buffer)
+            self._file.flush()  # type: ignore[union-attr]
+        self.rows_written += written
+
+    def _name_id(self, name: str, buffer: bytearray) -> int:
+        """Return the id for name in the current file, adding a name record to buffer if it's new."""
+        if (name_id := self._names.get(name)) is None:
+            encoded = name.encode()[:255]
+            name_id = self._names[name] = len(self._names)
+            buffer += _NAME.pack(_TAG_NAME, name_id, len(encoded))
+            buffer += encoded
+        return name_id
+
+    def _write(self, buffer: bytearray) -> None:
+        if buffer and self._file is not None:
+            self._file.write(buffer)
+            self._size += len(buffer)
+
+    def _open(self) -> None:
+        """Start a new file, rotating out the current one (or one from a previous run)."""
+        self._close()
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            self._rotate()
+        self._file = open(self.path, "wb")  # noqa: SIM115 - held open across flushes
+        self._file.write(MAGIC)
+        self._size = len(MAGIC)
+        self._names = {}
+        _LOGGER.debug("Started telemetry file %s", self.path)
+
+    def _rotate(self) -> None:
+        """Shift path -> path.1 -> path.2 ..., discarding the oldest, like logging's RotatingFileHandler."""
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+def read_telemetry(path: str) -> Iterator[TelemetryRow]:
+    """Read back the rows of a telemetry file, for offline analysis."""
+    with open(path, "rb") as file:
+        data = file.read()
+    if not data.startswith(MAGIC):
+        msg = f"{path} is not a Bermuda telemetry file"
+        raise ValueError(msg)
+    names: list[str] = []
+    offset = len(MAGIC)
+    while offset < len(data):
+        tag = data[offset : offset + 1]
+        if tag == _TAG_ROW:
+            if offset + _ROW.size > len(data):
+                break  # Truncated by a crash or a copy mid-write.
+            _tag, timestamp, device_id, scanner_id, rssi, raw, smoothed = _ROW.unpack_from(data, offset)
+            offset += _ROW.size
+            yield timestamp, names[device_id], names[scanner_id], _none(rssi), _none(raw), _none(smoothed)
+        elif tag == _TAG_NAME:
+            if offset + _NAME.size > len(data):
+                break
+            _tag, _name_id, length = _NAME.unpack_from(data, offset)
+            offset += _NAME.size
+            names.append(data[offset : offset + length].decode())
+            offset += length
+        else:
+            msg = f"Unexpected record {tag!r} at offset {offset} in {path}"
+            raise ValueError(msg)
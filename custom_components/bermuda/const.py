@@ -58,6 +58,21 @@ UPDATE_INTERVAL = 1.05  # Seconds between bluetooth data processing cycles
 # the smoothing algo's easier. But sensor updates should bear in mind how
 # much data it generates for databases and browser traffic.
 
+INCREMENTAL_ADVERTS: Final = True  # Only fetch adverts that are new since the last cycle.
+# Rather than pulling every scanner's whole advert cache each cycle and then discarding the
+# stale entries, use the scanner's timestamps (plus any adverts flagged by the bluetooth
+# callback) to pick out the fresh ones and fetch just those. Scanners that don't provide
+# timestamps (local adapters) are always swept in full.
+ADVERT_RECONCILE_INTERVAL: Final = 60  # Seconds between full sweeps of every scanner's adverts.
+# Catches anything the incremental path might have missed.
+
+TELEMETRY_FILENAME: Final = "bermuda_telemetry.bin"  # In the HA config directory.
+# The bermuda.telemetry service streams each cycle's readings to this file, for
+# calibration - see bermuda_telemetry.py for the format and read_telemetry().
+TELEMETRY_MAX_BYTES: Final = 10 * 1024 * 1024  # Size at which the file is rotated.
+TELEMETRY_BACKUP_COUNT: Final = 3  # How many rotated files to keep.
+TELEMETRY_MAX_QUEUED: Final = 100_000  # Rows held for the writer before dropping the oldest.
+
 LOGSPAM_INTERVAL = 22
 # Some warnings, like not having an area assigned to a scanner, are important for
 # users to see and act on, but we don't want to spam them on every update. This
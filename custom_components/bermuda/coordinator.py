@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import re
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from itertools import chain
 from typing import TYPE_CHECKING, cast
 
 import aiofiles
@@ -53,11 +55,14 @@ from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util.dt import get_age, now
 
 from .bermuda_device import BermudaDevice
+from .bermuda_expiry import BermudaExpiryIndex
 from .bermuda_irk import BermudaIrkManager
+from .bermuda_telemetry import BermudaTelemetryWriter
 from .const import (
     _LOGGER,
     _LOGGER_SPAM_LESS,
     ADDR_TYPE_PRIVATE_BLE_DEVICE,
+    ADVERT_RECONCILE_INTERVAL,
     AREA_MAX_AD_AGE,
     BDADDR_TYPE_NOT_MAC48,
     BDADDR_TYPE_RANDOM_RESOLVABLE,
@@ -79,6 +84,7 @@ from .const import (
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
     DOMAIN_PRIVATE_BLE_DEVICE,
+    INCREMENTAL_ADVERTS,
     METADEVICE_IBEACON_DEVICE,
     METADEVICE_TYPE_IBEACON_SOURCE,
     METADEVICE_TYPE_PRIVATE_BLE_SOURCE,
@@ -92,11 +98,20 @@ from .const import (
     SAVEOUT_COOLDOWN,
     SIGNAL_DEVICE_NEW,
     SIGNAL_SCANNERS_CHANGED,
+    TELEMETRY_BACKUP_COUNT,
+    TELEMETRY_FILENAME,
+    TELEMETRY_MAX_BYTES,
+    TELEMETRY_MAX_QUEUED,
     UPDATE_INTERVAL,
 )
 from .util import mac_explode_formats, mac_norm
 
 if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Iterable
+
+    from bleak.backends.device import BLEDevice
+    from bleak.backends.scanner import AdvertisementData
     from habluetooth import BluetoothServiceInfoBleak
     from homeassistant.components.bluetooth import (
         BluetoothChange,
@@ -105,6 +120,7 @@ if TYPE_CHECKING:
 
     from . import BermudaConfigEntry
     from .bermuda_advert import BermudaAdvert
+    from .bermuda_telemetry import TelemetryRow
 
 Cancellable = Callable[[], None]
 
@@ -168,6 +184,18 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
         self.stamp_last_update_started: float = 0
         self.stamp_last_prune: float = 0  # When we last pruned device list
 
+        # How many entity state writes we have done, or skipped because nothing changed.
+        self.stats_state_writes: int = 0
+        self.stats_state_writes_skipped: int = 0
+        # Adverts passed to devices vs skipped as stale, in the last update cycle.
+        self.stats_adverts_ingested: int = 0
+        self.stats_adverts_skipped: int = 0
+
+        # (scanner source, device address) pairs flagged by the bluetooth callback
+        # since the last update, see _async_gather_advert_data.
+        self._pending_adverts: set[tuple[str, str]] = set()
+        self.stamp_last_reconcile: float = 0  # Last full sweep of all scanners' adverts
+
         self.member_uuids = {}
         self.company_uuids = {}
 
@@ -267,6 +295,22 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                     self.options[key] = val
 
         self.devices: dict[str, BermudaDevice] = {}
+        # Devices ordered by last_seen, so prune_devices() only looks at the stalest.
+        # Resolvable private addresses are kept apart as they expire on a shorter time.
+        self._expiry_rpa = BermudaExpiryIndex(self._get_last_seen)
+        self._expiry_other = BermudaExpiryIndex(self._get_last_seen)
+        # Source address -> addresses of the metadevices it is a source for.
+        self._metadevice_source_index: dict[str, set[str]] = {}
+        # Sources that got fresh adverts since the last update_metadevices(), and
+        # metadevices that need all of their sources applied again.
+        self._changed_sources: set[str] = set()
+        self._changed_metadevices: set[str] = set()
+
+        # Telemetry export, while turned on by the telemetry service.
+        self.telemetry: BermudaTelemetryWriter | None = None
+        self._telemetry_addresses: set[str] | None = None  # None for all configured devices
+        self._telemetry_stamps: dict[tuple[str, str], float] = {}  # Last stamp exported per device/scanner
+        self._telemetry_flush: asyncio.Future | None = None
         # self.updaters: dict[str, BermudaPBDUCoordinator] = {}
 
         # Register the dump_devices service
@@ -284,6 +328,22 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
             SupportsResponse.ONLY,
         )
 
+        # Register the telemetry service
+        hass.services.async_register(
+            DOMAIN,
+            "telemetry",
+            self.service_telemetry,
+            vol.Schema(
+                {
+                    vol.Required("enable"): cv.boolean,
+                    vol.Optional("addresses"): cv.string,
+                }
+            ),
+            SupportsResponse.OPTIONAL,
+        )
+        if self.config_entry is not None:
+            self.config_entry.async_on_unload(self.async_stop_telemetry)
+
         # Register for newly discovered / changed BLE devices
         if self.config_entry is not None:
             self.config_entry.async_on_unload(
@@ -441,12 +501,9 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                         for ident_type, ident_id in device_entry.identifiers:
                             if ident_type == DOMAIN:
                                 # One of our sensor devices!
-                                try:
-                                    if _device := self.devices[ident_id.lower()]:
-                                        _device.name_by_user = device_entry.name_by_user
-                                        _device.make_name()
-                                except KeyError:
-                                    pass
+                                if (_device := self.devices.get(ident_id.lower())) is not None:
+                                    _device.name_by_user = device_entry.name_by_user
+                                    _device.make_name()
                         # might be a scanner, so let's refresh those
                         _LOGGER.debug("Trigger updating of Scanner Listings")
                         self._scanner_init_pending = True
@@ -505,6 +562,9 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
         #     service_info,
         # )
 
+        # Make sure the next update picks this one up, even when not doing a full sweep.
+        self._pending_adverts.add((service_info.source, service_info.address))
+
         # If there are no active entities created after Bermuda's
         # initial setup, then no updates will be triggered on the co-ordinator.
         # So let's check if we haven't updated recently, and do so...
@@ -612,6 +672,10 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
             return self.devices[mac]
         except KeyError:
             self.devices[mac] = device = BermudaDevice(mac, self)
+            if device.address_type == BDADDR_TYPE_RANDOM_RESOLVABLE:
+                self._expiry_rpa.add(mac, device.last_seen)
+            else:
+                self._expiry_other.add(mac, device.last_seen)
             return device
 
     async def _async_update_data(self):
@@ -649,6 +713,9 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
             # The main "get all adverts from the backend" part.
             result_gather_adverts = self._async_gather_advert_data()
 
+            # Resolve any new random addresses against our IRKs, all in one batch.
+            self.irk_manager.resolve_pending()
+
             self.update_metadevices()
 
             # Calculate per-device data
@@ -661,6 +728,9 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
 
             self._refresh_areas_by_min_distance()
 
+            if self.telemetry is not None:
+                self._export_telemetry()
+
             # We might need to freshen deliberately on first start if no new scanners
             # were discovered in the first scan update. This is likely if nothing has changed
             # since the last time we booted.
@@ -698,6 +768,12 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                         # called by _run in events.py, so pretty sure we are "in the event loop".
                         async_dispatcher_send(self.hass, SIGNAL_DEVICE_NEW, address)
 
+            # Note which published values changed, so entities only write state when they need to.
+            # Scanners too, since the per-scanner range sensors show the scanner's name and area.
+            for device in self.devices.values():
+                if device.create_sensor or device.is_scanner:
+                    device.update_changed()
+
             # Device Pruning (only runs periodically)
             self.prune_devices()
 
@@ -711,7 +787,13 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
         return result_gather_adverts
 
     def _async_gather_advert_data(self):
-        """Perform the gathering of backend Bluetooth Data and updating scanners and devices."""
+        """
+        Perform the gathering of backend Bluetooth Data and updating scanners and devices.
+
+        With INCREMENTAL_ADVERTS, scanners that provide timestamps only have their fresh
+        adverts fetched (plus any flagged in _pending_adverts). Every
+        ADVERT_RECONCILE_INTERVAL all scanners get a full sweep of their advert cache.
+        """
         nowstamp = monotonic_time_coarse()
         _timestamp_cutoff = nowstamp - min(PRUNE_TIME_DEFAULT, PRUNE_TIME_UNKNOWN_IRK)
 
@@ -719,6 +801,19 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
         if self._scanner_init_pending:
             self._refresh_scanners(force=True)
 
+        reconcile = not INCREMENTAL_ADVERTS or self.stamp_last_reconcile < nowstamp - ADVERT_RECONCILE_INTERVAL
+        if reconcile:
+            self.stamp_last_reconcile = nowstamp
+
+        # Group the pending adverts by scanner
+        pending: dict[str, set[str]] = {}
+        for source, address in self._pending_adverts:
+            pending.setdefault(source, set()).add(address)
+        self._pending_adverts.clear()
+
+        self.stats_adverts_ingested = 0
+        self.stats_adverts_skipped = 0
+
         for ha_scanner in self._hascanners:
             # Create / Get the BermudaDevice for this scanner
             scanner_device = self._get_device(ha_scanner.source)
@@ -742,22 +837,72 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
 
             scanner_device.async_as_scanner_update(ha_scanner)
 
-            # Now go through the scanner's adverts and send them to our device objects.
-            for bledevice, advertisementdata in ha_scanner.discovered_devices_and_advertisement_data.values():
-                if adstamp := scanner_device.async_as_scanner_get_stamp(bledevice.address):
-                    if adstamp < self.stamp_last_update_started - 3:
-                        # skip older adverts that should already have been processed
-                        continue
-                if advertisementdata.rssi == -127:
-                    # BlueZ is pushing bogus adverts for paired but absent devices.
-                    continue
-
-                device = self._get_or_create_device(bledevice.address)
-                device.process_advertisement(scanner_device, advertisementdata)
+            get_advert = getattr(ha_scanner, "get_discovered_device_advertisement_data", None)
+            if reconcile or not scanner_device.is_remote_scanner or get_advert is None:
+                self._gather_scanner_sweep(ha_scanner, scanner_device)
+            else:
+                self._gather_scanner_incremental(
+                    scanner_device, get_advert, pending.get(ha_scanner.source, set())
+                )
 
         # end of for ha_scanner loop
         return True
 
+    def _gather_scanner_sweep(self, ha_scanner: BaseHaScanner, scanner_device: BermudaDevice):
+        """Go through all of a scanner's adverts and send the fresh ones to our device objects."""
+        for bledevice, advertisementdata in ha_scanner.discovered_devices_and_advertisement_data.values():
+            if adstamp := scanner_device.async_as_scanner_get_stamp(bledevice.address):
+                if adstamp < self.stamp_last_update_started - 3:
+                    # skip older adverts that should already have been processed
+                    self.stats_adverts_skipped += 1
+                    continue
+            if advertisementdata.rssi == -127:
+                # BlueZ is pushing bogus adverts for paired but absent devices.
+                self.stats_adverts_skipped += 1
+                continue
+
+            device = self._get_or_create_device(bledevice.address)
+            device.process_advertisement(scanner_device, advertisementdata)
+            if device.address in self._metadevice_source_index:
+                self._changed_sources.add(device.address)
+            self.stats_adverts_ingested += 1
+
+    def _gather_scanner_incremental(
+        self,
+        scanner_device: BermudaDevice,
+        get_advert: Callable[[str], tuple[BLEDevice, AdvertisementData] | None],
+        pending: set[str],
+    ):
+        """
+        Send only a scanner's fresh adverts to our device objects.
+
+        Selects the same adverts as _gather_scanner_sweep() would, but from the scanner's
+        timestamps (already fetched by async_as_scanner_update) rather than its whole cache,
+        so the work done scales with the traffic instead of the number of known devices.
+        """
+        cutoff = self.stamp_last_update_started - 3
+        stamps = scanner_device.stamps or {}
+        fresh = [address for address, adstamp in stamps.items() if adstamp >= cutoff]
+        self.stats_adverts_skipped += len(stamps) - len(fresh)
+        if pending:
+            # These are already in fresh, unless they went stale in the meantime.
+            fresh.extend(pending.difference(fresh))
+
+        for address in fresh:
+            if (found := get_advert(address)) is None:
+                continue
+            bledevice, advertisementdata = found
+            if advertisementdata.rssi == -127:
+                # BlueZ is pushing bogus adverts for paired but absent devices.
+                self.stats_adverts_skipped += 1
+                continue
+
+            device = self._get_or_create_device(bledevice.address)
+            device.process_advertisement(scanner_device, advertisementdata)
+            if device.address in self._metadevice_source_index:
+                self._changed_sources.add(device.address)
+            self.stats_adverts_ingested += 1
+
     def prune_devices(self, force_pruning=False):
         """
         Scan through all collected devices, and remove those that meet Pruning criteria.
@@ -771,7 +916,6 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
         # stamp the run.
         nowstamp = self.stamp_last_prune = monotonic_time_coarse()
         stamp_known_irk = nowstamp - PRUNE_TIME_KNOWN_IRK
-        stamp_unknown_irk = nowstamp - PRUNE_TIME_UNKNOWN_IRK
 
         # Prune redaction data
         if self.stamp_redactions_expiry is not None and self.stamp_redactions_expiry < nowstamp:
@@ -784,7 +928,6 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
 
         # Prune devices.
         prune_list: list[str] = []  # list of addresses to be pruned
-        prunable_stamps: dict[str, float] = {}  # dict of potential prunees if we need to be more aggressive.
 
         metadevice_source_keepers = set()
         for metadevice in self.metadevices.values():
@@ -794,7 +937,7 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                 # the spec lifetime but are going stale because they're away for a bit.
                 _first = True
                 for address in metadevice.metadevice_sources:
-                    if _device := self._get_device(address):
+                    if (_device := self._get_device(address)) is not None:
                         if _first or _device.last_seen > stamp_known_irk:
                             # The source has been seen within the spec's limits, keep it.
                             metadevice_source_keepers.add(address)
@@ -804,93 +947,85 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                             # so let's be rid of it.
                             prune_list.append(address)
 
-        for device_address, device in self.devices.items():
-            # Prune any devices that haven't been heard from for too long, but only
-            # if we aren't actively tracking them and it's a traditional MAC address.
-            # We just collect the addresses first, and do the pruning after exiting this iterator
-            #
-            # Reduced selection criteria - basically if if's not:
-            # - a scanner (beacuse we need those!)
-            # - any metadevice less than 15 minutes old (PRUNE_TIME_KNOWN_IRK)
-            # - a private_ble device (because they will re-create anyway, plus we auto-sensor them
-            # - create_sensor
-            # then it should be up for pruning. A stale iBeacon that we don't actually track
-            # should totally be pruned if it's no longer around.
-            if (
-                device_address not in metadevice_source_keepers
-                and device not in self.metadevices
-                and device_address not in self.scanner_list
-                and (not device.create_sensor)  # Not if we track the device
-                and (not device.is_scanner)  # redundant, but whatevs.
-                and device.address_type != BDADDR_TYPE_NOT_MAC48
-            ):
-                if device.address_type == BDADDR_TYPE_RANDOM_RESOLVABLE:
-                    # This is an *UNKNOWN* IRK source address, or a known one which is
-                    # well and truly stale (ie, not in keepers).
-                    # We prune unknown irk's aggressively because they pile up quickly
-                    # in high-density situations, and *we* don't need to hang on to new
-                    # enrollments because we'll seed them from PBLE.
-                    if device.last_seen < stamp_unknown_irk:
-                        _LOGGER.debug(
-                            "Marking stale (%ds) Unknown IRK address for pruning: [%s] %s",
-                            nowstamp - device.last_seen,
-                            device_address,
-                            device.name,
-                        )
-                        prune_list.append(device_address)
-                    elif device.last_seen < nowstamp - 200:  # BlueZ cache time
-                        # It's not stale, but we will prune it if we can't make our
-                        # quota of PRUNE_MAX_COUNT we'll shave these off too.
-
-                        # Note that because BlueZ doesn't give us timestamps, we guess them
-                        # based on whether the rssi has changed. If we delete our existing
-                        # device we have nothing to compare too and will forever churn them.
-                        # This can change if we drop support for BlueZ or we find a way to
-                        # make stamps (we could also just keep a separate list but meh)
-                        prunable_stamps[device_address] = device.last_seen
-
-                elif device.last_seen < nowstamp - PRUNE_TIME_DEFAULT:
-                    # It's a static address, and stale.
+        # Entries we pop from the expiry indexes but don't prune go back in at the end.
+        kept: list[tuple[BermudaExpiryIndex, float, str]] = []
+
+        # Work through the stalest devices until we reach ones that are still in date.
+        # We prune unknown irk's aggressively because they pile up quickly
+        # in high-density situations, and *we* don't need to hang on to new
+        # enrollments because we'll seed them from PBLE.
+        for index, max_age in (
+            (self._expiry_rpa, PRUNE_TIME_UNKNOWN_IRK),
+            (self._expiry_other, PRUNE_TIME_DEFAULT),
+        ):
+            while (oldest := index.peek()) is not None and oldest[0] < nowstamp - max_age:
+                index.pop()
+                _stamp, device_address = oldest
+                device = self.devices[device_address]
+                if self._device_is_prunable(device, metadevice_source_keepers):
                     _LOGGER.debug(
-                        "Marking old device entry for pruning: %s",
+                        "Marking stale (%ds) device entry for pruning: [%s] %s",
+                        nowstamp - _stamp,
+                        device_address,
                         device.name,
                     )
                     prune_list.append(device_address)
                 else:
-                    # Device is static, not tracked, not so old, but we might have to prune it anyway
-                    prunable_stamps[device_address] = device.last_seen
-
-            # Do nothing else at this level without excluding the keepers first.
+                    kept.append((index, _stamp, device_address))
 
+        prune_list = list(dict.fromkeys(prune_list))  # The keepers loop might have doubled some up.
         prune_quota_shortfall = len(self.devices) - len(prune_list) - PRUNE_MAX_COUNT
         if prune_quota_shortfall > 0:
             # We need to find more addresses to prune. Perhaps we live
             # in a busy train station, or are under some sort of BLE-MAC
-            # DOS-attack.
-            if len(prunable_stamps) > 0:
-                # Sort the prunables by timestamp ascending
-                sorted_addresses = sorted([(v, k) for k, v in prunable_stamps.items()])
-                cutoff_index = min(len(sorted_addresses), prune_quota_shortfall)
+            # DOS-attack. Take the stalest prunable devices from either index.
+            extra_pruned = 0
+            _stamp = nowstamp
+            while extra_pruned < prune_quota_shortfall:
+                oldest_rpa = self._expiry_rpa.peek()
+                if oldest_rpa is not None and oldest_rpa[0] >= nowstamp - 200:  # BlueZ cache time
+                    # Note that because BlueZ doesn't give us timestamps, we guess them
+                    # based on whether the rssi has changed. If we delete our existing
+                    # device we have nothing to compare too and will forever churn them.
+                    # This can change if we drop support for BlueZ or we find a way to
+                    # make stamps (we could also just keep a separate list but meh)
+                    oldest_rpa = None
+                oldest_other = self._expiry_other.peek()
+                if oldest_rpa is None and oldest_other is None:
+                    break
+                if oldest_other is None or (oldest_rpa is not None and oldest_rpa < oldest_other):
+                    index = self._expiry_rpa
+                else:
+                    index = self._expiry_other
+                _stamp, device_address = index.pop()  # type: ignore[misc]
+                if device_address not in prune_list and self._device_is_prunable(
+                    self.devices[device_address], metadevice_source_keepers
+                ):
+                    prune_list.append(device_address)
+                    extra_pruned += 1
+                else:
+                    kept.append((index, _stamp, device_address))
 
+            if extra_pruned > 0:
                 _LOGGER.debug(
                     "Prune quota short by %d. Pruning %d extra devices (down to age %0.2f seconds)",
                     prune_quota_shortfall,
-                    cutoff_index,
-                    nowstamp - sorted_addresses[prune_quota_shortfall - 1][0],
+                    extra_pruned,
+                    nowstamp - _stamp,
                 )
-                # pylint: disable-next=unused-variable
-                for _stamp, address in sorted_addresses[: prune_quota_shortfall - 1]:
-                    prune_list.append(address)
-            else:
+            if extra_pruned < prune_quota_shortfall:
                 _LOGGER.warning(
                     "Need to prune another %s devices to make quota, but no extra prunables available",
-                    prune_quota_shortfall,
+                    prune_quota_shortfall - extra_pruned,
                 )
         else:
             _LOGGER.debug(
                 "Pruning %d available MACs, we are inside quota by %d.", len(prune_list), prune_quota_shortfall * -1
             )
 
+        for index, _stamp, device_address in kept:
+            index.add(device_address, _stamp)
+
         # ###############################################
         # Prune_list is now ready to action. It contains no keepers, and is already
         # expanded if necessary to meet quota, as much as we can.
@@ -900,33 +1035,59 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.debug("Acting on prune list for %s", device_address)
             del self.devices[device_address]
 
-        # Clean out the scanners dicts in metadevices and scanners
-        # (scanners will have entries if they are also beacons, although
-        # their addresses should never get stale, but one day someone will
-        # have a beacon that uses randomised source addresses for some reason.
-        #
-        # Just brute-force all devices, because it was getting a bit hairy
-        # ensuring we hit the right ones, and the cost is fairly low and periodic.
-        for device in self.devices.values():
-            # if (
-            #     device.is_scanner
-            #     or METADEVICE_PRIVATE_BLE_DEVICE in device.metadevice_type
-            #     or METADEVICE_IBEACON_DEVICE in device.metadevice_type
-            # ):
-            # clean out the metadevice_sources field
-            for address in prune_list:
-                if address in device.metadevice_sources:
-                    device.metadevice_sources.remove(address)
-
-            # clean out the device/scanner advert pairs
-            for advert_tuple in list(device.adverts.keys()):
-                if device.adverts[advert_tuple].device_address in prune_list:
+        # Clean out the references to them. Only metadevices hold copies of other
+        # devices' adverts, and only they and scanners have metadevice_sources.
+        pruned = set(prune_list)
+        self._changed_sources.difference_update(pruned)
+        for device_address in prune_list:
+            for holder_address in self._metadevice_source_index.pop(device_address, ()):
+                if (holder := self.devices.get(holder_address)) is None:
+                    continue
+                for advert_tuple in [key for key in holder.adverts if key[0] == device_address]:
                     _LOGGER.debug(
                         "Pruning metadevice advert %s aged %ds",
                         advert_tuple,
-                        nowstamp - device.adverts[advert_tuple].stamp,
+                        nowstamp - holder.adverts[advert_tuple].stamp,
                     )
-                    del device.adverts[advert_tuple]
+                    del holder.adverts[advert_tuple]
+
+        for device in chain(self.metadevices.values(), self._scanners):
+            if not pruned.isdisjoint(device.metadevice_sources):
+                device.metadevice_sources[:] = [
+                    address for address in device.metadevice_sources if address not in pruned
+                ]
+
+        if pruned and self._telemetry_stamps:
+            # Forget the export stamps of pruned devices (and of pruned scanners, should that ever happen).
+            for key in [key for key in self._telemetry_stamps if key[0] in pruned or key[1] in pruned]:
+                del self._telemetry_stamps[key]
+
+    def _device_is_prunable(self, device: BermudaDevice, metadevice_source_keepers: set[str]) -> bool:
+        """
+        Return True if the device may be pruned (once it's old enough).
+
+        Reduced selection criteria - basically if if's not:
+        - a scanner (beacuse we need those!)
+        - any metadevice less than 15 minutes old (PRUNE_TIME_KNOWN_IRK)
+        - a private_ble device (because they will re-create anyway, plus we auto-sensor them
+        - create_sensor
+        then it should be up for pruning. A stale iBeacon that we don't actually track
+        should totally be pruned if it's no longer around.
+        """
+        return (
+            device.address not in metadevice_source_keepers
+            and device.address not in self.metadevices
+            and device.address not in self.scanner_list
+            and (not device.create_sensor)  # Not if we track the device
+            and (not device.is_scanner)  # redundant, but whatevs.
+            and device.address_type != BDADDR_TYPE_NOT_MAC48
+        )
+
+    def _get_last_seen(self, address: str) -> float | None:
+        """Return the device's last_seen, or None if it no longer exists. For the expiry indexes."""
+        if (device := self.devices.get(address)) is not None:
+            return device.last_seen
+        return None
 
     def discover_private_ble_metadevices(self):
         """
@@ -1007,8 +1168,7 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                             source_device.metadevice_type.add(METADEVICE_TYPE_PRIVATE_BLE_SOURCE)
 
                             # Add source address. Don't remove anything, as pruning takes care of that.
-                            if pb_source_address not in metadevice.metadevice_sources:
-                                metadevice.metadevice_sources.insert(0, pb_source_address)
+                            self.add_metadevice_source(metadevice, pb_source_address)
 
                             # Update state_sources so we can track when it changes
                             self.pb_state_sources[pb_entity.entity_id] = pb_source_address
@@ -1063,15 +1223,30 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
             # #### EXISTING METADEVICE ####
             # (only do things that might have to change when MAC address cycles etc)
 
-            if source_device.address not in metadevice.metadevice_sources:
-                # We have a *new* source device.
-                # insert this device as a known source
-                metadevice.metadevice_sources.insert(0, source_device.address)
-
+            if self.add_metadevice_source(metadevice, source_device.address):
+                # We have a *new* source device, now inserted as a known source.
                 # If we have a new / better name, use that..
                 metadevice.name_bt_serviceinfo = metadevice.name_bt_serviceinfo or source_device.name_bt_serviceinfo
                 metadevice.name_bt_local_name = metadevice.name_bt_local_name or source_device.name_bt_local_name
 
+    def add_metadevice_source(self, metadevice: BermudaDevice, source_address: str) -> bool:
+        """
+        Insert source_address as the newest of metadevice's sources, if it isn't one already.
+
+        Returns True if it was added. Sources must be added through here (rather than
+        directly to metadevice_sources) so that update_metadevices() picks them up.
+        """
+        if source_address in metadevice.metadevice_sources:
+            return False
+        metadevice.metadevice_sources.insert(0, source_address)
+        self._metadevice_source_index.setdefault(source_address, set()).add(metadevice.address)
+        self._changed_sources.add(source_address)
+        return True
+
+    def mark_metadevice_changed(self, metadevice: BermudaDevice) -> None:
+        """Have the next update_metadevices() apply all of this metadevice's sources."""
+        self._changed_metadevices.add(metadevice.address)
+
     def update_metadevices(self):
         """
         Create or update iBeacon, Private_BLE and other meta-devices from
@@ -1093,14 +1268,26 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
         # iBeacon devices should already have their metadevices created, so nothing more to
         # set up for them.
 
-        for metadevice in self.metadevices.values():
-            # Find every known source device and copy their adverts in.
+        # Only metadevices with a source that has fresh adverts need updating, and then
+        # only from those sources. Map each to the sources to apply, None meaning all.
+        dirty: dict[str, set[str] | None] = dict.fromkeys(self._changed_metadevices)
+        for source_address in self._changed_sources:
+            for metadevice_address in self._metadevice_source_index.get(source_address, ()):
+                if (sources := dirty.setdefault(metadevice_address, set())) is not None:
+                    sources.add(source_address)
+        self._changed_metadevices.clear()
+        self._changed_sources.clear()
+
+        for metadevice_address, changed_sources in dirty.items():
+            if (metadevice := self.metadevices.get(metadevice_address)) is None:
+                continue
+            # Find every changed source device and copy their adverts in.
 
-            # Keep track of whether we want to recalculate the name fields at the end.
-            _want_name_update = False
             _sources_to_remove = []
 
             for source_address in metadevice.metadevice_sources:
+                if changed_sources is not None and source_address not in changed_sources:
+                    continue
                 # Get the BermudaDevice holding those adverts
                 # TODO: Verify it's OK to not create here. Problem is that if we do create,
                 # it causes a binge/purge cycle during pruning since it has no adverts on it.
@@ -1145,9 +1332,11 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                         _sources_to_remove.append(source_device.address)
                     continue  # to next metadevice_source
 
-                # Copy every ADVERT_TUPLE into our metadevice
-                for advert_tuple in source_device.adverts:
-                    metadevice.adverts[advert_tuple] = source_device.adverts[advert_tuple]
+                # Copy every ADVERT_TUPLE into our metadevice. The adverts are shared, not
+                # copied, so only the ones from scanners new to this source need adding.
+                for advert_tuple, advert in source_device.adverts.items():
+                    if advert_tuple not in metadevice.adverts:
+                        metadevice.adverts[advert_tuple] = advert
 
                 # Update last_seen if the source is newer.
                 if metadevice.last_seen < source_device.last_seen:
@@ -1172,41 +1361,13 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                 if source_device.ref_power != metadevice.ref_power:
                     source_device.set_ref_power(metadevice.ref_power)
 
-                # anything that isn't already set to something interesting, overwrite
-                # it with the new device's data.
-                for key, val in source_device.items():
-                    if val is any(
-                        [
-                            source_device.name_bt_local_name,
-                            source_device.name_bt_serviceinfo,
-                            source_device.manufacturer,
-                        ]
-                    ) and metadevice[key] in [None, False]:
-                        metadevice[key] = val
-                        _want_name_update = True
-
-                if _want_name_update:
-                    metadevice.make_name()
-
-                # Anything that's VERY interesting, overwrite it regardless of what's already there:
-                # INTERESTING:
-                for key, val in source_device.items():
-                    if val is any(
-                        [
-                            source_device.beacon_major,
-                            source_device.beacon_minor,
-                            source_device.beacon_power,
-                            source_device.beacon_unique_id,
-                            source_device.beacon_uuid,
-                        ]
-                    ):
-                        metadevice[key] = val
-                        # _want_name_update = True
+                # The beacon attributes and names are copied over from the source
+                # device by register_ibeacon_source(), when it's first seen.
+
             # Done iterating sources, remove any to be dropped
             for source in _sources_to_remove:
                 metadevice.metadevice_sources.remove(source)
-            if _want_name_update:
-                metadevice.make_name()
+                self._metadevice_source_index.get(source, set()).discard(metadevice.address)
 
     def dt_mono_to_datetime(self, stamp) -> datetime:
         """Given a monotonic timestamp, convert to datetime object."""
@@ -1302,6 +1463,28 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                     out += f"{val}\n"
             return out
 
+    @staticmethod
+    def _area_contenders(device: BermudaDevice) -> Iterable[BermudaAdvert]:
+        """
+        Return the adverts that could possibly take the area from the device's current one.
+
+        A challenger can only win if it is at least as close as the incumbent, and every
+        win moves the bar closer still, so anything further away than the incumbent can
+        be skipped without changing the result. Most cycles the incumbent is still the
+        closest and there's nothing to test at all. If the incumbent is invalid any advert
+        can win, so they all go through. Order is preserved, since it affects the result
+        (and the incumbent stays in the list, as it can win back its place on a tie).
+        """
+        incumbent = device.area_advert
+        if incumbent is None or incumbent.rssi_distance is None or incumbent.area_id is None:
+            return device.adverts.values()
+        _bar = incumbent.rssi_distance
+        return [
+            advert
+            for advert in device.adverts.values()
+            if advert.rssi_distance is not None and advert.rssi_distance <= _bar
+        ]
+
     def _refresh_area_by_min_distance(self, device: BermudaDevice):
         """Very basic Area setting by finding closest proxy to a given device."""
         # The current area_scanner (which might be None) is the one to beat.
@@ -1310,14 +1493,14 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
         _max_radius = self.options.get(CONF_MAX_RADIUS, DEFAULT_MAX_RADIUS)
         nowstamp = monotonic_time_coarse()
 
-        tests = self.AreaTests()
-        tests.device = device.name
+        # Only built if there's an actual contest, which most cycles there isn't.
+        tests: BermudaDataUpdateCoordinator.AreaTests | None = None
 
         _superchatty = False  # Set to true for very verbose logging about area wins
         # if device.name in ("Ash Pixel IRK", "Garage", "Melinda iPhone"):
         #     _superchatty = True
 
-        for advert in device.adverts.values():
+        for advert in self._area_contenders(device):
             # Check each scanner and any time one is found to be closer / better than
             # the existing closest_scanner, replace it. At the end we should have the
             # right one. In theory.
@@ -1388,6 +1571,9 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                 # we are not even closer!
                 continue
 
+            if tests is None:
+                tests = self.AreaTests()
+                tests.device = device.name
             tests.reason = None  # ensure we don't trigger logging if no decision was made.
             tests.same_area = closest_advert.area_id == advert.area_id
             tests.areas = (closest_advert.area_name or "", advert.area_name or "")
@@ -1466,8 +1652,8 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
             max_seconds = 5
             if len(advert.hist_distance_by_interval) > min_seconds:
                 tests.hist_min_max = (
-                    min(closest_advert.hist_distance_by_interval[:max_seconds]),  # Oldest min
-                    max(advert.hist_distance_by_interval[:max_seconds]),  # Newest max
+                    min(closest_advert.hist_distance_by_interval.iter_newest(0, max_seconds)),  # Oldest min
+                    max(advert.hist_distance_by_interval.iter_newest(0, max_seconds)),  # Newest max
                 )
                 if (
                     tests.hist_min_max[1] < tests.hist_min_max[0]
@@ -1488,7 +1674,7 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
 
             closest_advert = advert
 
-        if _superchatty and tests.reason is not None:
+        if _superchatty and tests is not None and tests.reason is not None:
             _LOGGER.info(
                 "***************\n**************** %s *******************\n%s",
                 tests.reason,
@@ -1497,7 +1683,7 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
 
         _superchatty = False
 
-        if device.area_advert != closest_advert and tests.reason is not None:
+        if device.area_advert != closest_advert and tests is not None and tests.reason is not None:
             device.diag_area_switch = tests.sensortext()
 
         # Apply the newly-found closest scanner (or apply None if we didn't find one)
@@ -1650,6 +1836,76 @@ class BermudaDataUpdateCoordinator(DataUpdateCoordinator):
                 _LOGGER.debug("Dump devices redaction took %2f seconds", _stamp_redact_elapsed)
         return out
 
+    async def service_telemetry(self, call: ServiceCall) -> ServiceResponse:
+        """Start or stop streaming per-advert readings to the telemetry file."""
+        if call.data["enable"]:
+            addresses_input = call.data.get("addresses", "")
+            self._telemetry_addresses = set(addresses_input.lower().split()) or None
+            if self.telemetry is None:
+                self._telemetry_stamps.clear()
+                self.telemetry = BermudaTelemetryWriter(
+                    self.hass.config.path(TELEMETRY_FILENAME),
+                    TELEMETRY_MAX_BYTES,
+                    TELEMETRY_BACKUP_COUNT,
+                    TELEMETRY_MAX_QUEUED,
+                )
+                _LOGGER.info("Exporting telemetry to %s", self.telemetry.path)
+            writer = self.telemetry
+        else:
+            writer = self.telemetry
+            await self.async_stop_telemetry()
+        if writer is None:
+            return None
+        return {
+            "path": writer.path,
+            "rows_written": writer.rows_written,
+            "rows_dropped": writer.rows_dropped,
+        }
+
+    async def async_stop_telemetry(self) -> None:
+        """Stop the telemetry export, if running, writing out whatever is still queued."""
+        if (writer := self.telemetry) is None:
+            return
+        self.telemetry = None
+        self._telemetry_stamps.clear()
+        await self.hass.async_add_executor_job(writer.close)
+        _LOGGER.info(
+            "Stopped telemetry export to %s (%d rows written, %d dropped)",
+            writer.path,
+            writer.rows_written,
+            writer.rows_dropped,
+        )
+
+    def _export_telemetry(self):
+        """Queue this cycle's fresh readings for the telemetry writer, and start it if it's idle."""
+        writer = cast("BermudaTelemetryWriter", self.telemetry)
+        addresses = self._telemetry_addresses
+        last_stamps = self._telemetry_stamps
+        # Adverts are stamped with monotonic time, but unix time is more use offline.
+        offset = time.time() - monotonic_time_coarse()
+        rows: list[TelemetryRow] = []
+        for device in self.devices.values():
+            if (not device.create_sensor) if addresses is None else (device.address not in addresses):
+                continue
+            for advert in device.adverts.values():
+                key = (device.address, advert.scanner_address)
+                if advert.stamp > last_stamps.get(key, 0):
+                    last_stamps[key] = advert.stamp
+                    rows.append(
+                        (
+                            advert.stamp + offset,
+                            device.address,
+                            advert.scanner_address,
+                            advert.rssi,
+                            advert.rssi_distance_raw,
+                            advert.rssi_distance,
+                        )
+                    )
+        if rows:
+            writer.submit(rows)
+        if writer.pending and (self._telemetry_flush is None or self._telemetry_flush.done()):
+            self._telemetry_flush = self.hass.async_add_executor_job(writer.flush)
+
     def redaction_list_update(self):
         """
         Freshen or create the list of match/replace pairs that we use to
@@ -71,6 +71,8 @@ class BermudaDeviceTracker(BermudaEntity, BaseTrackerEntity):
     _attr_has_entity_name = True
     _attr_name = "Bermuda Tracker"
 
+    bermuda_watched = ("name", "zone", "area", "area_scanner")
+
     @property
     def unique_id(self):
         """
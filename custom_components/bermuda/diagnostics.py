@@ -28,6 +28,14 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: Bermuda
     data: dict[str, Any] = {
         "active_devices": f"{coordinator.count_active_devices()}/{len(coordinator.devices)}",
         "active_scanners": f"{coordinator.count_active_scanners()}/{len(coordinator.scanner_list)}",
+        "state_writes": {
+            "written": coordinator.stats_state_writes,
+            "skipped": coordinator.stats_state_writes_skipped,
+        },
+        "adverts_last_update": {
+            "ingested": coordinator.stats_adverts_ingested,
+            "skipped": coordinator.stats_adverts_skipped,
+        },
         "irk_manager": coordinator.redact_data(coordinator.irk_manager.async_diagnostics_no_redactions()),
         "devices": await coordinator.service_dump_devices(call),
         "bt_manager": coordinator.redact_data(bt_diags),
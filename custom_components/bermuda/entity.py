@@ -34,6 +34,13 @@ class BermudaEntity(CoordinatorEntity):
     distances etc.
     """
 
+    # The keys of BermudaDevice.published_state() that this entity shows. State is only
+    # written to HA when one of these has changed (or a rate-limited value is due),
+    # None means write on every update.
+    bermuda_watched: tuple[str, ...] | None = None
+    # Changes to a numeric value smaller than this are not published, see _cached_ratelimit
+    bermuda_min_delta: float | None = None
+
     def __init__(
         self,
         coordinator: BermudaDataUpdateCoordinator,
@@ -53,8 +60,12 @@ class BermudaEntity(CoordinatorEntity):
         self.bermuda_update_interval = config_entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
         self.bermuda_last_state: Any = 0
         self.bermuda_last_stamp: float = 0
+        self.bermuda_ratelimit_pending: bool = False  # A newer value is being held back by the cache
+        self.bermuda_last_available: bool | None = None  # self.available as at our last state write
 
-    def _cached_ratelimit(self, statevalue: Any, fast_falling=True, fast_rising=False, interval=None):
+    def _cached_ratelimit(
+        self, statevalue: Any, fast_falling=True, fast_rising=False, interval=None, min_delta=None
+    ):
         """
         Uses the CONF_UPDATE_INTERVAL and other logic to return either the given statevalue
         or an older, cached value. Helps to reduce excess sensor churn without compromising latency.
@@ -62,27 +73,55 @@ class BermudaEntity(CoordinatorEntity):
         Mostly suitable for MEASUREMENTS, but should work with strings, too.
         If interval is specified the cache will use that (in seconds), otherwise the deafult is
         the CONF_UPPDATE_INTERVAL (typically suitable for fast-close slow-far sensors)
+        If min_delta (or the class's bermuda_min_delta) is set, numeric changes smaller than
+        that are never published, no matter how stale the cache is.
         """
         if interval is not None:
             self.bermuda_update_interval = interval
+        if min_delta is None:
+            min_delta = self.bermuda_min_delta
 
         nowstamp = monotonic_time_coarse()
         if (
-            (self.bermuda_last_stamp < nowstamp - self.bermuda_update_interval)  # Cache is stale
-            or (self._device.ref_power_changed > nowstamp + 2)  # ref power changed in last 2sec
+            (self._device.ref_power_changed > nowstamp + 2)  # ref power changed in last 2sec
             or (self.bermuda_last_state is None)  # Nothing compares to you.
             or (statevalue is None)  # or you.
+        ):
+            # Always publish, skipping the min_delta check.
+            pass
+        elif min_delta is not None and round(abs(statevalue - self.bermuda_last_state), 6) < min_delta:
+            # Too small a change to be worth publishing (rounded, so 0.3 - 0.2 counts as 0.1)
+            self.bermuda_ratelimit_pending = False
+            return self.bermuda_last_state
+        elif not (
+            (self.bermuda_last_stamp < nowstamp - self.bermuda_update_interval)  # Cache is stale
             or (fast_falling and statevalue < self.bermuda_last_state)  # (like Distance)
             or (fast_rising and statevalue > self.bermuda_last_state)  # (like RSSI)
         ):
-            # Publish the new value and update cache
-            self.bermuda_last_stamp = nowstamp
-            self.bermuda_last_state = statevalue
-            return statevalue
-        else:
             # Send the cached value, don't update cache
+            self.bermuda_ratelimit_pending = statevalue != self.bermuda_last_state
             return self.bermuda_last_state
 
+        # Publish the new value and update cache
+        self.bermuda_last_stamp = nowstamp
+        self.bermuda_last_state = statevalue
+        self.bermuda_ratelimit_pending = False
+        return statevalue
+
+    def _bermuda_state_changed(self) -> bool:
+        """Return True if the state we show in HA may have changed since we last wrote it."""
+        if self.bermuda_watched is None:
+            return True
+        if self.available != self.bermuda_last_available:
+            return True
+        if (
+            self.bermuda_ratelimit_pending
+            and self.bermuda_last_stamp < monotonic_time_coarse() - self.bermuda_update_interval
+        ):
+            # A value held back by _cached_ratelimit is now due.
+            return True
+        return not self._device.changed.isdisjoint(self.bermuda_watched)
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """
@@ -98,7 +137,12 @@ class BermudaEntity(CoordinatorEntity):
             if self.device_entry:
                 # We have a new name locally, so let's update the device registry.
                 self.dr.async_update_device(self.device_entry.id, name=self._device.name)
-        self.async_write_ha_state()
+        if self._bermuda_state_changed():
+            self.coordinator.stats_state_writes += 1
+            self.bermuda_last_available = self.available
+            self.async_write_ha_state()
+        else:
+            self.coordinator.stats_state_writes_skipped += 1
 
     @property
     def unique_id(self):
@@ -197,9 +241,13 @@ class BermudaGlobalEntity(CoordinatorEntity):
         """
         Handle updated data from the co-ordinator.
 
-        (we don't need to implement this, but if we want to do anything special we can)
+        Our values are rate-limited anyway, so only write them out once they are due.
         """
-        self.async_write_ha_state()
+        if monotonic_time_coarse() > self._cache_ratelimit_stamp + self._cache_ratelimit_interval:
+            self.coordinator.stats_state_writes += 1
+            self.async_write_ha_state()
+        else:
+            self.coordinator.stats_state_writes_skipped += 1
 
     def _cached_ratelimit(self, statevalue: Any, interval: int | None = None):
         """A simple way to rate-limit sensor updates."""
@@ -82,6 +82,8 @@ class BermudaNumber(BermudaEntity, RestoreNumber):
     _attr_native_unit_of_measurement = SIGNAL_STRENGTH_DECIBELS_MILLIWATT
     _attr_mode = NumberMode.BOX
 
+    bermuda_watched = ("name", "ref_power")
+
     def __init__(
         self,
         coordinator: BermudaDataUpdateCoordinator,
@@ -8,7 +8,6 @@ from homeassistant.components.sensor import RestoreSensor, SensorEntity
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
-    STATE_UNAVAILABLE,
     EntityCategory,
     UnitOfLength,
 )
@@ -17,8 +16,6 @@ from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import (
     _LOGGER,
-    ADDR_TYPE_IBEACON,
-    ADDR_TYPE_PRIVATE_BLE_DEVICE,
     SIGNAL_DEVICE_NEW,
     SIGNAL_SCANNERS_CHANGED,
 )
@@ -149,6 +146,8 @@ async def async_setup_entry(
 class BermudaSensor(BermudaEntity, SensorEntity):
     """bermuda Sensor class."""
 
+    bermuda_watched = ("name", "area", "floor", "current_mac")
+
     @property
     def unique_id(self):
         """
@@ -206,20 +205,7 @@ class BermudaSensor(BermudaEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> Mapping[str, Any] | None:
         """Provide state_attributes for the sensor entity."""
-        # By default, it's the device's MAC
-        current_mac = self._device.address
-        # But metadevices have source_devices
-        if self._device.address_type in [
-            ADDR_TYPE_IBEACON,
-            ADDR_TYPE_PRIVATE_BLE_DEVICE,
-        ]:
-            # Check the current sources and find the latest
-            current_mac: str = STATE_UNAVAILABLE
-            _best_stamp = 0
-            for source_ad in self._device.adverts.values():
-                if source_ad.stamp > _best_stamp:  # It's a valid ad
-                    current_mac = source_ad.device_address
-                    _best_stamp = source_ad.stamp
+        current_mac = self._device.current_mac
 
         # Limit how many attributes we list - prefer new sensors instead
         # since oft-changing attribs cause more db writes than sensors
@@ -258,6 +244,8 @@ class BermudaSensorFloor(BermudaSensor):
 class BermudaSensorScanner(BermudaSensor):
     """Sensor for name of nearest detected scanner."""
 
+    bermuda_watched = ("name", "area_scanner", "current_mac")
+
     @property
     def unique_id(self):
         return f"{self._device.unique_id}_scanner"
@@ -279,6 +267,8 @@ class BermudaSensorScanner(BermudaSensor):
 class BermudaSensorRssi(BermudaSensor):
     """Sensor for RSSI of closest scanner."""
 
+    bermuda_watched = ("name", "area_rssi", "current_mac")
+
     @property
     def unique_id(self):
         """Return unique id for the entity."""
@@ -309,6 +299,8 @@ class BermudaSensorRssi(BermudaSensor):
 class BermudaSensorRange(BermudaSensor):
     """Extra sensor for range-to-closest-area."""
 
+    bermuda_watched = ("name", "area_distance", "current_mac")
+
     @property
     def unique_id(self):
         """
@@ -347,6 +339,10 @@ class BermudaSensorRange(BermudaSensor):
 class BermudaSensorScannerRange(BermudaSensorRange):
     """Create sensors for range to each scanner. Extends closest-range class."""
 
+    bermuda_watched = ("name",)  # plus our scanner, see __init__
+    bermuda_watched_scanner = ("name", "area")  # the scanner's own, shown in our attributes
+    bermuda_min_delta = 0.1  # metres, the raw per-scanner distances are quite noisy
+
     def __init__(
         self,
         coordinator: BermudaDataUpdateCoordinator,
@@ -359,6 +355,13 @@ class BermudaSensorScannerRange(BermudaSensorRange):
         self.config_entry = config_entry
         self._device = coordinator.devices[address]
         self._scanner = coordinator.devices[scanner_address]
+        self.bermuda_watched = (*self.bermuda_watched, f"scanner:{scanner_address}")
+
+    def _bermuda_state_changed(self) -> bool:
+        """Also write our state when the scanner we measure against is renamed or moves area."""
+        return super()._bermuda_state_changed() or not self._scanner.changed.isdisjoint(
+            self.bermuda_watched_scanner
+        )
 
     @property
     def unique_id(self):
@@ -429,6 +432,8 @@ class BermudaSensorScannerRangeRaw(BermudaSensorScannerRange):
 class BermudaSensorAreaSwitchReason(BermudaSensor):
     """Sensor for area switch reason."""
 
+    bermuda_watched = ("name", "diag_area_switch", "current_mac")
+
     # _attr_entity_registry_enabled_default = False
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
@@ -455,6 +460,8 @@ class BermudaSensorAreaSwitchReason(BermudaSensor):
 class BermudaSensorAreaLastSeen(BermudaSensor, RestoreSensor):
     """Sensor for name of last seen area."""
 
+    bermuda_watched = ("name", "area_last_seen", "current_mac")
+
     @property
     def unique_id(self):
         return f"{self._device.unique_id}_area_last_seen"
@@ -1135,6 +1135,7 @@ class OptionsFlow(MerossFlowHandlerMixin, ce.OptionsFlow):
             )
             config[mlc.CONF_OBFUSCATE] = user_input[mlc.CONF_OBFUSCATE]
             config[mlc.CONF_TRACE_TIMEOUT] = user_input.get(mlc.CONF_TRACE_TIMEOUT)
+            config[mlc.CONF_TRACE_COMPRESS] = user_input.get(mlc.CONF_TRACE_COMPRESS)
             if user_input[mlc.CONF_TRACE]:
                 # only reload and start tracing if the user wish so
                 state = self.api.managers_transient_state.setdefault(
@@ -1171,6 +1172,7 @@ class OptionsFlow(MerossFlowHandlerMixin, ce.OptionsFlow):
             _optional(
                 mlc.CONF_TRACE_TIMEOUT, config, mlc.CONF_TRACE_TIMEOUT_DEFAULT
             ): cv.positive_int,
+            _required(mlc.CONF_TRACE_COMPRESS, config, False): bool,
         }
         return self.async_show_form(
             step_id="diagnostics", data_schema=vol.Schema(config_schema)
@@ -49,6 +49,8 @@ CONF_TRACE: Final = "trace"
 CONF_TRACE_TIMEOUT: Final = "trace_timeout"
 CONF_TRACE_TIMEOUT_DEFAULT: Final = 600
 CONF_TRACE_MAXSIZE: Final = 262144  # or when MAXSIZE exceeded
+# gzip the trace files
+CONF_TRACE_COMPRESS: Final = "trace_compress"
 # folder where to store traces
 CONF_TRACE_DIRECTORY: Final = "traces"
 # versioning
@@ -76,6 +78,8 @@ class ManagerConfigType(TypedDict):
     """obfuscate sensitive data when logging/tracing"""
     trace_timeout: NotRequired[int | None]
     """duration of the tracing feature when activated"""
+    trace_compress: NotRequired[bool]
+    """gzip the trace files"""
 
 
 #####################################################
@@ -122,6 +126,10 @@ CONF_POLLING_PERIOD_MIN: Final = 5
 CONF_POLLING_PERIOD_DEFAULT: Final = 30
 # enable/disable Appliance.Control.Multiple
 CONF_DISABLE_MULTIPLE: Final = "disable_multiple"
+# enable coalescing of PUSH bursts (see PushCoalescer)
+CONF_PUSH_COALESCE: Final = "push_coalesce"
+# when protocol is 'auto' prefer the transport measured faster (see ProtocolStats)
+CONF_PROTOCOL_FASTEST: Final = "protocol_fastest"
 # this is a 'fake' conf used to force-flush
 CONF_TIMESTAMP: Final = mc.KEY_TIMESTAMP
 
@@ -250,6 +258,33 @@ PARAM_CLOUDPROFILE_QUERY_LATESTVERSION_TIMEOUT = 604800  # 1 week
 """timeout for querying cloud api latestVersion endpoint"""
 PARAM_CLOUDPROFILE_DELAYED_SAVE_TIMEOUT = 30
 """used to delay updated profile data to storage"""
+PARAM_RESPONSE_SIZE_DELAYED_SAVE_TIMEOUT = 300
+"""used to delay updated (learned) response sizes to storage"""
+PARAM_RESPONSE_SIZE_CALIBRATION_SAMPLES = 3
+"""responses (per namespace/channels) measured for learning their size after
+start or after an ns_multiple overflow"""
+PARAM_POLLING_SCHEDULER_TICK = 1
+"""devices polling callbacks are (re)scheduled with this granularity (seconds)"""
+PARAM_POLLING_SCHEDULER_BURST = 4
+"""maximum number of devices polling callbacks started in the same tick"""
+PARAM_PUSH_COALESCE_WINDOW = 0.5
+"""time window (seconds) in which consecutive PUSHes get coalesced (when enabled)"""
+PARAM_PROTOCOL_STATS_SAMPLES = 50
+"""number of (latest) requests kept in the per protocol rolling stats"""
+PARAM_PROTOCOL_STATS_SAMPLES_MIN = 5
+"""minimum number of samples before comparing protocols performance"""
+PARAM_PROTOCOL_STATS_FAILURE_RATE_MAX = 0.2
+"""failure rate above which a protocol is not considered healthy"""
+PARAM_PROTOCOL_FASTEST_HYSTERESIS = 0.3
+"""relative rtt improvement needed to switch to the faster protocol"""
+PARAM_PROTOCOL_FASTEST_DWELL = 600
+"""minimum time (seconds) between consecutive 'fastest' protocol switches"""
+PARAM_TRACE_FLUSH_DELAY = 1
+"""trace rows are buffered for this time (seconds) before being written"""
+PARAM_TRACE_BUFFER_MAX = 10000
+"""maximum number of buffered trace rows: exceeding ones are dropped"""
+PARAM_TRACE_FILES_MAX = 4
+"""a trace is split in files of CONF_TRACE_MAXSIZE up to this number"""
 PARAM_HEADER_SIZE = 300
 """(rough) estimate of the header part of any response"""
 PARAM_RESPONSE_SIZE_MAX = 3000
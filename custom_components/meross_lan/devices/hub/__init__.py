@@ -641,11 +641,18 @@ class SubDevice(NamespaceParser, BaseDevice):
     def get_type(self) -> mlc.DeviceType:
         return mlc.DeviceType.SUBDEVICE
 
+    def _set_offline(self):
+        super()._set_offline()
+        self.fingerprints_reset()
+
     def _get_internal_name(self) -> str:
         return get_productnameuuid(self.model, self.id)
 
     def _set_online(self):
         super()._set_online()
+        # our channel(s) in the hub handlers were likely fingerprinted while
+        # we were offline: parse them again
+        self.fingerprints_reset()
         # force a re-poll even on MQTT
         self.hub.namespace_handlers[
             (
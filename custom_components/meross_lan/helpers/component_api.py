@@ -30,6 +30,8 @@ from ..merossclient.protocol.message import (
 from .device import Device
 from .manager import ConfigEntryManager
 from .mqtt_profile import MQTTConnection, MQTTProfile
+from .polling_scheduler import PollingScheduler
+from .response_size import ResponseSizeModel
 
 if typing.TYPE_CHECKING:
 
@@ -346,6 +348,9 @@ class ComponentApi(MQTTProfile):
 
         _deviceclasses: Final[dict[str, type[Device]]]
         _zoneinfo: Final[dict[str, zoneinfo.ZoneInfo]]
+        _response_size_model: ResponseSizeModel | None
+        _response_size_model_lock: Final[asyncio.Lock]
+        polling_scheduler: Final[PollingScheduler]
 
     __slots__ = (
         "devices",
@@ -358,6 +363,9 @@ class ComponentApi(MQTTProfile):
         "_zoneinfo",
         "_import_module_lock",
         "_import_module_cache",
+        "_response_size_model",
+        "_response_size_model_lock",
+        "polling_scheduler",
     )
 
     @staticmethod
@@ -410,6 +418,9 @@ class ComponentApi(MQTTProfile):
         self._zoneinfo = {}
         self._import_module_lock = asyncio.Lock()
         self._import_module_cache = {}
+        self._response_size_model = None
+        self._response_size_model_lock = asyncio.Lock()
+        self.polling_scheduler = PollingScheduler(hass.loop)
         for config_entry in hass.config_entries.async_entries(mlc.DOMAIN):
             match ConfigEntryType.get_type_and_id(config_entry.unique_id):
                 case (ConfigEntryType.DEVICE, device_id):
@@ -569,6 +580,7 @@ class ComponentApi(MQTTProfile):
             await device.async_shutdown()
         for profile in self.active_profiles():
             await profile.async_shutdown()
+        self.polling_scheduler.shutdown()
         await super().async_shutdown()
         await MerossHttpClient.async_shutdown_session()
         self._mqtt_connection = None
@@ -660,6 +672,17 @@ class ComponentApi(MQTTProfile):
             )
             return tz
 
+    async def async_get_response_size_model(self):
+        """Returns the (shared) learned response size model, loading it on first use."""
+        if self._response_size_model:
+            return self._response_size_model
+        async with self._response_size_model_lock:
+            if not self._response_size_model:
+                model = ResponseSizeModel(self.hass)
+                await model.async_load()
+                self._response_size_model = model
+            return self._response_size_model
+
     async def async_import_module(self, name: str):
         try:
             return self._import_module_cache[name]
@@ -48,6 +48,8 @@ from ..sensor import ProtocolSensor
 from ..update import MLUpdate
 from .manager import ConfigEntryManager, EntityManager
 from .namespaces import NamespaceHandler, mc, mn
+from .protocol_stats import ProtocolStats
+from .push_coalescer import PushCoalescer
 
 if TYPE_CHECKING:
     from asyncio import Future, TimerHandle
@@ -81,8 +83,13 @@ if TYPE_CHECKING:
     from .entity import MLEntity
     from .mqtt_profile import MQTTConnection, MQTTProfile
     from .namespaces import NamespaceParser
+    from .polling_scheduler import PollingHandle
+    from .response_size import ResponseSizeEntryType, ResponseSizeModel
 
     type DigestParseFunc = Callable[[dict], None] | Callable[[list], None]
+    # a queued poll: the handler, its request and expected response size as they
+    # were when queued (chunked handlers change them for every chunk)
+    type PollRequestType = tuple[NamespaceHandler, MerossRequestType, int]
     type DigestInitReturnType = tuple[DigestParseFunc, Iterable[NamespaceHandler]]
     type DigestInitFunc = Callable[["Device", Any], DigestInitReturnType]
     type NamespaceInitFunc = Callable[["Device"], None]
@@ -94,6 +101,46 @@ if TYPE_CHECKING:
 TIMEZONES_SET = None
 
 
+def pack_multiple_requests(
+    requests: "Iterable[PollRequestType]",
+    lazypoll_requests: "Iterable[PollRequestType]",
+    multiple_max: int,
+    response_size_max: int,
+):
+    """
+    Pack the poll requests of a cycle into (as few as possible) ns_multiple messages.
+    Returns a list of (poll requests, expected response size) for each message.
+    'requests' must all be sent and are packed 'first fit decreasing' on their
+    expected response size (so big ones don't get stranded at the end in
+    a message of their own). 'lazypoll_requests' (ordered by priority) are then
+    used to fill the room left in those messages but never get one of their own.
+    Every message stays within multiple_max requests and response_size_max.
+    """
+    multiple_max = multiple_max or 1
+    packs: list[list[PollRequestType]] = []
+    sizes: list[int] = []
+
+    def _fit(poll_request: "PollRequestType"):
+        size = poll_request[2]
+        for i, pack in enumerate(packs):
+            if (len(pack) < multiple_max) and (sizes[i] + size <= response_size_max):
+                pack.append(poll_request)
+                sizes[i] += size
+                return True
+        return False
+
+    for poll_request in sorted(
+        requests, key=lambda _poll_request: _poll_request[2], reverse=True
+    ):
+        if not _fit(poll_request):
+            packs.append([poll_request])
+            sizes.append(PARAM_HEADER_SIZE + poll_request[2])
+    if packs:
+        for poll_request in lazypoll_requests:
+            _fit(poll_request)
+    return list(zip(packs, sizes))
+
+
 class BaseDevice(EntityManager):
     """
     Abstract base class for Device and SubDevice (from hub)
@@ -276,15 +323,28 @@ class Device(BaseDevice, ConfigEntryManager):
         _http_active: MerossHttpClient | None
         _http_lastrequest: float
         _http_lastresponse: float
+        protocol_stats: dict[str, ProtocolStats]
+        _protocol_fastest: bool
+        _protocol_fastest_epoch: float
+        _protocol_stats_epoch: float
         namespace_handlers: dict[str, NamespaceHandler]
         digest_handlers: dict[str, DigestParseFunc]
         digest_pollers: set[NamespaceHandler]
         _lazypoll_requests: list[NamespaceHandler]
         _polling_epoch: float
-        _polling_callback_unsub: TimerHandle | None
+        _polling_callback_unsub: PollingHandle | None
         _polling_callback_shutdown: Future | None
         _queued_cloudpoll_requests: int
         multiple_max: int
+        _multiple_requests: list[PollRequestType] | None
+        _multiple_response_size: int
+        polling_cycle_messages: int
+        polling_cycle_requests: int
+        multiple_overflow_retries: int
+        _push_coalescer: PushCoalescer | None
+        _response_size_model: ResponseSizeModel | None
+        _response_size_entry: ResponseSizeEntryType
+        _response_size_samples: dict[str, int]
         _timezone_next_check: float
         _trace_ability_callback_unsub: TimerHandle | None
         _diagnostics_build: bool
@@ -435,6 +495,10 @@ class Device(BaseDevice, ConfigEntryManager):
         "_http_active",  # HTTP is 'online' i.e. reachable
         "_http_lastrequest",
         "_http_lastresponse",
+        "protocol_stats",
+        "_protocol_fastest",
+        "_protocol_fastest_epoch",  # last 'fastest' protocol switch
+        "_protocol_stats_epoch",  # last evaluation/sensor update of protocol_stats
         "namespace_handlers",
         "digest_handlers",
         "digest_pollers",
@@ -446,6 +510,13 @@ class Device(BaseDevice, ConfigEntryManager):
         "multiple_max",
         "_multiple_requests",
         "_multiple_response_size",
+        "polling_cycle_messages",  # messages sent in the (last) polling cycle
+        "polling_cycle_requests",  # requests carried by those messages
+        "multiple_overflow_retries",  # ns_multiple partly/not answered and re-issued
+        "_push_coalescer",
+        "_response_size_model",
+        "_response_size_entry",  # learned sizes for our type/hw/fw
+        "_response_size_samples",  # responses learned (this session) per size key
         "_timezone_next_check",
         "_trace_ability_callback_unsub",
         "_diagnostics_build",
@@ -493,6 +564,13 @@ class Device(BaseDevice, ConfigEntryManager):
         self._http_active = None
         self._http_lastrequest = 0
         self._http_lastresponse = 0
+        self.protocol_stats = {
+            CONF_PROTOCOL_HTTP: ProtocolStats(),
+            CONF_PROTOCOL_MQTT: ProtocolStats(),
+        }
+        self._protocol_fastest = False
+        self._protocol_fastest_epoch = 0.0
+        self._protocol_stats_epoch = 0.0
         self.namespace_handlers = {}
         self.digest_handlers = {}
         self.digest_pollers = set()
@@ -503,6 +581,13 @@ class Device(BaseDevice, ConfigEntryManager):
         self._polling_callback_shutdown = None
         self._queued_cloudpoll_requests = 0
         self.multiple_max = 0
+        self.polling_cycle_messages = 0
+        self.polling_cycle_requests = 0
+        self.multiple_overflow_retries = 0
+        self._push_coalescer = None
+        self._response_size_model = None
+        self._response_size_entry = {"sizes": {}}
+        self._response_size_samples = {}
         self._timezone_next_check = (
             0
             if mn.Appliance_System_Time.name in descriptor.ability
@@ -561,6 +646,14 @@ class Device(BaseDevice, ConfigEntryManager):
         api = self.api
         descriptor = self.descriptor
 
+        with self.exception_warning("loading the response size model"):
+            model = await api.async_get_response_size_model()
+            self._response_size_model = model
+            self._response_size_entry = model.device_entry(descriptor)
+            if limits := self._response_size_entry.get("limits"):
+                # start out with what we've learned the last time(s)
+                self.device_response_size_min, self.device_response_size_max = limits
+
         if tzname := descriptor.timezone:
             # self.tz defaults to UTC on init
             with self.exception_warning(
@@ -645,9 +738,7 @@ class Device(BaseDevice, ConfigEntryManager):
         # here we'll register mqtt listening (in case) and start polling after
         # the states have been eventually restored (some entities need this)
         self._check_protocol_ext()
-        self._polling_callback_unsub = self.schedule_async_callback(
-            0, self._async_polling_callback, None
-        )
+        self._polling_callback_unsub = self._schedule_polling_callback(0, None)
 
     # interface: ConfigEntryManager
     async def entry_update_listener(
@@ -847,6 +938,17 @@ class Device(BaseDevice, ConfigEntryManager):
             "polling_period": self.polling_period,
             "device_response_size_min": self.device_response_size_min,
             "device_response_size_max": self.device_response_size_max,
+            # shared by all the devices: these are not ours only
+            "polling_scheduler_global": self.api.polling_scheduler.get_diagnostics(),
+            "multiple": {
+                "multiple_max": self.multiple_max,
+                "polling_cycle_messages": self.polling_cycle_messages,
+                "polling_cycle_requests": self.polling_cycle_requests,
+                "overflow_retries": self.multiple_overflow_retries,
+            },
+            "push_coalesce": (
+                self._push_coalescer.get_diagnostics() if self._push_coalescer else None
+            ),
             "MQTT": {
                 "cloud_profile": (
                     self._profile.is_cloud_profile if self._profile else None
@@ -860,6 +962,13 @@ class Device(BaseDevice, ConfigEntryManager):
             "HTTP": {
                 "http": bool(self._http),
                 "http_active": bool(self._http_active),
+                "connection": (
+                    self._http.get_connection_stats() if self._http else None
+                ),
+            },
+            "protocol_stats": {
+                protocol: stats.get_diagnostics()
+                for protocol, stats in self.protocol_stats.items()
             },
             "namespace_handlers": {
                 handler.ns.name: {
@@ -907,6 +1016,9 @@ class Device(BaseDevice, ConfigEntryManager):
             self._http = None
 
         await self._async_polling_stop()
+        if self._push_coalescer:
+            self._push_coalescer.shutdown()
+            self._push_coalescer = None
         await super().async_shutdown()
         self.namespace_handlers = None  # type: ignore
         self.digest_handlers = None  # type: ignore
@@ -1018,6 +1130,7 @@ class Device(BaseDevice, ConfigEntryManager):
         self.device_debug = None
         for handler in self.namespace_handlers.values():
             handler.polling_epoch_next = 0.0
+            handler.fingerprints_reset()
 
     def get_type(self) -> mlc.DeviceType:
         return mlc.DeviceType.DEVICE
@@ -1185,6 +1298,26 @@ class Device(BaseDevice, ConfigEntryManager):
                 )
             ] = bool
 
+        config_schema[
+            vol.Optional(
+                mlc.CONF_PUSH_COALESCE,
+                default=False,
+                description={
+                    "suggested_value": self.config.get(mlc.CONF_PUSH_COALESCE)
+                },
+            )
+        ] = bool
+
+        config_schema[
+            vol.Optional(
+                mlc.CONF_PROTOCOL_FASTEST,
+                default=False,
+                description={
+                    "suggested_value": self.config.get(mlc.CONF_PROTOCOL_FASTEST)
+                },
+            )
+        ] = bool
+
         if mn.Appliance_System_Time.name in self.descriptor.ability:
             global TIMEZONES_SET
             if TIMEZONES_SET is None:
@@ -1324,42 +1457,45 @@ class Device(BaseDevice, ConfigEntryManager):
             return multiple_response[mc.KEY_PAYLOAD][mc.KEY_MULTIPLE]
 
     async def _async_multiple_requests_flush(self):
+        """Send the poll requests queued in this cycle, packed in as few messages as
+        possible, and topped up with lazy pollers where there's room left."""
         assert self._multiple_requests
-        multiple_requests = self._multiple_requests
-        multiple_response_size = self._multiple_response_size
+        lazypoll_requests = self._lazypoll_requests
+        packs = pack_multiple_requests(
+            self._multiple_requests,
+            [self._poll_request(handler) for handler in lazypoll_requests],
+            self.multiple_max,
+            self.device_response_size_max,
+        )
         self._multiple_requests = []
         self._multiple_response_size = PARAM_HEADER_SIZE
 
+        for poll_requests, multiple_response_size in packs:
+            if not self.online:
+                break
+            for handler, _, _ in poll_requests:
+                if handler.lastrequest != self._polling_epoch:
+                    # a lazy poller which made it in
+                    handler.lastrequest = self._polling_epoch
+                    handler.polling_epoch_next = (
+                        handler.lastrequest + handler.polling_period
+                    )
+                    lazypoll_requests.remove(handler)
+            await self._async_multiple_requests_send(
+                [poll_request[1] for poll_request in poll_requests],
+                multiple_response_size,
+            )
+
+    async def _async_multiple_requests_send(
+        self, multiple_requests: "list[MerossRequestType]", multiple_response_size: int
+    ):
         requests_len = len(multiple_requests)
+        self.polling_cycle_requests += requests_len
         while self.online and requests_len:
-            lazypoll_requests = self._lazypoll_requests
-            while (requests_len < self.multiple_max) and lazypoll_requests:
-                # we have space available in current ns_multiple and lazy pollers are waiting
-                for handler in lazypoll_requests:
-                    # lazy pollers are ordered by 'oldest polled first' so
-                    # the first is the one which hasn't been polled since longer
-                    # we then decide to add to the current ns_multiple the first that would fit in
-                    if (
-                        handler.polling_response_size + multiple_response_size
-                    ) < self.device_response_size_max:
-                        handler.lastrequest = self._polling_epoch
-                        handler.polling_epoch_next = (
-                            handler.lastrequest + handler.polling_period
-                        )
-                        multiple_requests.append(handler.polling_request)
-                        lazypoll_requests.remove(handler)
-                        multiple_response_size += handler.polling_response_size
-                        requests_len += 1
-                        # check if we can add more
-                        break  # for
-                else:
-                    # no lazy_poller could match..break out of while
-                    break  # while
-
+            self.polling_cycle_messages += 1
             if requests_len == 1:
                 await self.async_request(*multiple_requests[0])
                 return
-
             if not (
                 response := await self.async_request_ack(
                     mn.Appliance_Control_Multiple.name,
@@ -1406,7 +1542,11 @@ class Device(BaseDevice, ConfigEntryManager):
                         "Updating device_response_size_max:%d",
                         self.device_response_size_max,
                     )
+                    self._learn_response_size_limits()
+                    self.multiple_overflow_retries += 1
+                    self._response_size_recalibrate()
                     for request in multiple_requests:
+                        self.polling_cycle_messages += 1
                         await self.async_request(*request)
                         if not self.online:
                             break
@@ -1424,6 +1564,25 @@ class Device(BaseDevice, ConfigEntryManager):
                     len(response.json()),
                 )
             message: "MerossMessageType"
+            if self._response_size_model:
+                # sub-messages come decoded so measuring them means re-serializing:
+                # we only do that for the first few responses of every key and
+                # again after an overflow (see _response_size_recalibrate)
+                samples = self._response_size_samples
+                for message in multiple_responses:
+                    m_header = message[mc.KEY_HEADER]
+                    if (m_header[mc.KEY_METHOD] == mc.METHOD_GETACK) and (
+                        handler := self.namespace_handlers.get(
+                            m_header[mc.KEY_NAMESPACE]
+                        )
+                    ):
+                        key = self._response_size_key(
+                            handler.ns, message[mc.KEY_PAYLOAD]
+                        )
+                        count = samples.get(key, 0)
+                        if count < mlc.PARAM_RESPONSE_SIZE_CALIBRATION_SAMPLES:
+                            samples[key] = count + 1
+                            self._learn_response_size(key, len(json_dumps(message)))
             if responses_len == requests_len:
                 # faster shortcut
                 for message in multiple_responses:
@@ -1450,6 +1609,8 @@ class Device(BaseDevice, ConfigEntryManager):
                 # and re-issue the missing ones
                 requests_len = len(multiple_requests)
                 multiple_response_size = -1  # logging purpose
+                self.multiple_overflow_retries += 1
+                self._response_size_recalibrate()
                 continue
             else:
                 # no response at all..this is pathological but we have
@@ -1461,7 +1622,10 @@ class Device(BaseDevice, ConfigEntryManager):
                     multiple_response_size,
                     timeout=14400,
                 )
+                self.multiple_overflow_retries += 1
+                self._response_size_recalibrate()
                 for request in multiple_requests:
+                    self.polling_cycle_messages += 1
                     await self.async_request(*request)
                     if not self.online:
                         break
@@ -1480,16 +1644,23 @@ class Device(BaseDevice, ConfigEntryManager):
                 "Attempting to use async_mqtt_request with no publishing profile",
             )
             return None
-        self._mqtt_lastrequest = time()
+        self._mqtt_lastrequest = epoch = time()
         self._trace_or_log(
-            self._mqtt_lastrequest,
+            epoch,
             request,
             CONF_PROTOCOL_MQTT,
             ConfigEntryManager.TRACE_TX,
         )
         if _mqtt_publish.is_cloud_connection:
             self._queued_cloudpoll_requests += 1
-        return await _mqtt_publish.async_mqtt_publish(self.id, request)
+        response = await _mqtt_publish.async_mqtt_publish(self.id, request)
+        if request.method in mc.METHOD_ACK_MAP:
+            # only these are expecting a reply
+            if response:
+                self.protocol_stats[CONF_PROTOCOL_MQTT].record(time() - epoch)
+            else:
+                self.protocol_stats[CONF_PROTOCOL_MQTT].record_failure()
+        return response
 
     async def async_mqtt_request(
         self,
@@ -1526,9 +1697,9 @@ class Device(BaseDevice, ConfigEntryManager):
             )
             return None
 
-        self._http_lastrequest = time()
+        self._http_lastrequest = request_epoch = time()
         self._trace_or_log(
-            self._http_lastrequest,
+            request_epoch,
             request,
             CONF_PROTOCOL_HTTP,
             ConfigEntryManager.TRACE_TX,
@@ -1564,6 +1735,7 @@ class Device(BaseDevice, ConfigEntryManager):
                 self.device_response_size_min,
                 self.device_response_size_max,
             )
+            self._learn_response_size_limits()
             if request.namespace is not mn.Appliance_Control_Multiple.name:
                 return None
             # try to recover NS_MULTIPLE by discarding the incomplete
@@ -1585,6 +1757,7 @@ class Device(BaseDevice, ConfigEntryManager):
                 exception.__class__.__name__,
                 str(exception),
             )
+            self.protocol_stats[CONF_PROTOCOL_HTTP].record_failure()
             if not self.online:
                 return None
 
@@ -1600,6 +1773,9 @@ class Device(BaseDevice, ConfigEntryManager):
 
             return None
 
+        # the device lock queues our requests: only account for the actual
+        # round trip or we'd penalize http when polling bursts
+        self.protocol_stats[CONF_PROTOCOL_HTTP].record(http.last_latency)
         epoch = time()
         self._trace_or_log(epoch, response, CONF_PROTOCOL_HTTP, self.TRACE_RX)
         # add a sanity check here since we have some issues (#341)
@@ -1640,33 +1816,69 @@ class Device(BaseDevice, ConfigEntryManager):
     async def async_request_poll(self, handler: NamespaceHandler):
         handler.lastrequest = self._polling_epoch
         handler.polling_epoch_next = handler.lastrequest + handler.polling_period
+        poll_request = self._poll_request(handler)
         if (self._multiple_requests is None) or (
-            handler.polling_response_size >= self.device_response_size_max
+            poll_request[2] >= self.device_response_size_max
         ):
             # multiple requests are disabled
             # or this request alone would overflow the device response size limit
-            await self.async_request(*handler.polling_request)
+            self.polling_cycle_messages += 1
+            self.polling_cycle_requests += 1
+            await self.async_request(*poll_request[1])
             return
-        # estimate the size of the multiple response
-        multiple_response_size = (
-            self._multiple_response_size + handler.polling_response_size
+        # just queue it: _async_multiple_requests_flush will pack all of this
+        # cycle's requests together at the end of the polling cycle
+        self._multiple_requests.append(poll_request)
+        self._multiple_response_size += poll_request[2]
+
+    def _poll_request(self, handler: NamespaceHandler) -> "PollRequestType":
+        """Snapshot of the handler current polling request together with its
+        expected response size: what we've learned from actual responses to
+        the same request if any, else the handler estimate (which is left
+        untouched since hub handlers reset it for every chunk they poll)."""
+        request = handler.polling_request
+        return (
+            handler,
+            request,
+            self._response_size_entry["sizes"].get(
+                self._response_size_key(handler.ns, request[2]),
+                handler.polling_response_size,
+            ),
         )
-        if multiple_response_size > self.device_response_size_max:
-            # this request (together with already previously packed)
-            # would overflow the device response size limit
-            if not self._multiple_requests:
-                # again this request alone would overflow the device response size limit
-                await self.async_request(*handler.polling_request)
-                return
-            # flush the pending multiple requests
-            await self._async_multiple_requests_flush()
-            multiple_response_size = (
-                self._multiple_response_size + handler.polling_response_size
+
+    @staticmethod
+    def _response_size_key(ns: "mn.Namespace", payload: "MerossPayloadType"):
+        """Learned sizes are keyed by namespace and number of items (channels,
+        subdevices) in the payload: this works the same on the request we're
+        about to send and on the response we've received."""
+        items = payload.get(ns.key)
+        return f"{ns.name}:{len(items) if type(items) is list else 0}"
+
+    def _learn_response_size(self, key: str, size: int):
+        if self._response_size_model:
+            self._response_size_model.learn(self._response_size_entry, key, size)
+
+    def _response_size_recalibrate(self):
+        """Our sizes/limits proved wrong (ns_multiple overflow): learn again."""
+        self._response_size_samples.clear()
+
+    def _learn_response_size_limits(self):
+        if self._response_size_model:
+            self._response_size_model.learn_limits(
+                self._response_size_entry,
+                self.device_response_size_min,
+                self.device_response_size_max,
             )
-        self._multiple_requests.append(handler.polling_request)
-        self._multiple_response_size = multiple_response_size
-        if len(self._multiple_requests) >= self.multiple_max:
-            await self._async_multiple_requests_flush()
+
+    def _multiple_requests_pending(self):
+        """Estimate of how many (ns_multiple) messages the currently queued
+        poll requests will need once packed."""
+        if not self._multiple_requests:
+            return 0
+        return max(
+            -(-len(self._multiple_requests) // (self.multiple_max or 1)),
+            -(-self._multiple_response_size // self.device_response_size_max),
+        )
 
     async def async_request_smartpoll(
         self,
@@ -1676,7 +1888,13 @@ class Device(BaseDevice, ConfigEntryManager):
     ):
         if (
             (self.curr_protocol is CONF_PROTOCOL_MQTT)
-            and (self._queued_cloudpoll_requests >= cloud_queue_max)
+            and (
+                # queued poll requests are not sent until the end of the cycle but,
+                # besides the last (still filling) message, they're as good as sent
+                self._queued_cloudpoll_requests
+                + max(self._multiple_requests_pending() - 1, 0)
+                >= cloud_queue_max
+            )
             and (
                 (self._polling_epoch - handler.lastrequest)
                 < handler.polling_period_cloud
@@ -1706,6 +1924,8 @@ class Device(BaseDevice, ConfigEntryManager):
         """
         self._lazypoll_requests.clear()
         self._queued_cloudpoll_requests = 0
+        self.polling_cycle_messages = 0
+        self.polling_cycle_requests = 0
         # self.namespace_handlers could change at any time due to async
         # message parsing (handlers might be dynamically created by then)
         for handler in [
@@ -1769,14 +1989,21 @@ class Device(BaseDevice, ConfigEntryManager):
                 (self.lastresponse > self.lastrequest)
                 or ((epoch - self.lastrequest) < (self.polling_period - 2))
             ):
+                if (epoch - self._protocol_stats_epoch) > PARAM_HEARTBEAT_PERIOD:
+                    self._check_protocol_stats(epoch)
                 # when mqtt is working as a fallback for HTTP
                 # we should periodically check if http comes back
                 # in case our self.pref_protocol is HTTP.
                 # when self.pref_protocol is MQTT we don't care
-                # since we'll just try the switch when mqtt fails
+                # since we'll just try the switch when mqtt fails.
+                # In 'fastest' mode we also need fresh samples of the
+                # unused transport in order to compare them
                 if (
                     (self.curr_protocol is CONF_PROTOCOL_MQTT)
-                    and (self.pref_protocol is CONF_PROTOCOL_HTTP)
+                    and (
+                        (self.pref_protocol is CONF_PROTOCOL_HTTP)
+                        or self._protocol_fastest
+                    )
                     and ((epoch - self._http_lastrequest) > PARAM_HEARTBEAT_PERIOD)
                 ):
                     if await self.async_http_request(
@@ -1793,7 +2020,10 @@ class Device(BaseDevice, ConfigEntryManager):
                 if self.mqtt_locallyactive:
                     # implement an heartbeat since mqtt might
                     # be unused for quite a bit
-                    if (epoch - self._mqtt_lastresponse) > PARAM_HEARTBEAT_PERIOD:
+                    if ((epoch - self._mqtt_lastresponse) > PARAM_HEARTBEAT_PERIOD) or (
+                        self._protocol_fastest
+                        and ((epoch - self._mqtt_lastrequest) > PARAM_HEARTBEAT_PERIOD)
+                    ):
                         if not await self.async_mqtt_request(
                             *mn.Appliance_System_All.request_get
                         ):
@@ -1870,11 +2100,18 @@ class Device(BaseDevice, ConfigEntryManager):
                 self._polling_callback_shutdown.set_result(True)
                 self._polling_callback_shutdown = None
             else:
-                self._polling_callback_unsub = self.schedule_async_callback(
-                    self._polling_delay, self._async_polling_callback, None
+                self._polling_callback_unsub = self._schedule_polling_callback(
+                    self._polling_delay, None
                 )
             self.log(self.DEBUG, "Polling end")
 
+    def _schedule_polling_callback(self, delay: float, namespace: str | None):
+        # polling callbacks of all the devices go through the shared scheduler
+        # (see PollingScheduler) instead of having a timer each
+        return self.api.polling_scheduler.schedule(
+            self, delay, self._async_polling_callback, namespace
+        )
+
     async def _async_polling_stop(self):
         """Ensure we're not polling nor any schedule is in place."""
         if self._polling_callback_unsub:
@@ -1948,9 +2185,7 @@ class Device(BaseDevice, ConfigEntryManager):
             if not self.online and self._polling_callback_unsub:
                 # reschedule immediately
                 self._polling_callback_unsub.cancel()
-                self._polling_callback_unsub = self.schedule_async_callback(
-                    0, self._async_polling_callback, None
-                )
+                self._polling_callback_unsub = self._schedule_polling_callback(0, None)
         elif self.conf_protocol is CONF_PROTOCOL_MQTT:
             self.log(
                 self.WARNING,
@@ -2069,8 +2304,16 @@ class Device(BaseDevice, ConfigEntryManager):
             self.device_response_size_min = message_size
             if message_size > self.device_response_size_max:
                 self.device_response_size_max = message_size
+            self._learn_response_size_limits()
 
         header = message[mc.KEY_HEADER]
+        if (header[mc.KEY_METHOD] == mc.METHOD_GETACK) and (
+            handler := self.namespace_handlers.get(header[mc.KEY_NAMESPACE])
+        ):
+            self._learn_response_size(
+                self._response_size_key(handler.ns, message[mc.KEY_PAYLOAD]),
+                message_size,
+            )
         # we'll use the device timestamp to 'align' our time to the device one
         # this is useful for metered plugs reporting timestamped energy consumption
         # and we want to 'translate' this timings in our (local) time.
@@ -2113,10 +2356,8 @@ class Device(BaseDevice, ConfigEntryManager):
             # This could happen when we receive an MQTT message
             if self._polling_callback_unsub:
                 self._polling_callback_unsub.cancel()
-                self._polling_callback_unsub = self.schedule_async_callback(
-                    0,
-                    self._async_polling_callback,
-                    header[mc.KEY_NAMESPACE],
+                self._polling_callback_unsub = self._schedule_polling_callback(
+                    0, header[mc.KEY_NAMESPACE]
                 )
 
         return self._handle(header, message[mc.KEY_PAYLOAD])
@@ -2133,7 +2374,15 @@ class Device(BaseDevice, ConfigEntryManager):
         elif method == mc.METHOD_SETACK:
             # SETACK generally doesn't carry any state/info so it is
             # no use parsing..moreover, our callbacks system is full
-            # in place so we have no need to further process
+            # in place so we have no need to further process.
+            # Entities might have (optimistically) updated their state though
+            # so we need to parse whatever will come next.
+            if handler := self.namespace_handlers.get(namespace):
+                if push_coalescer := self._push_coalescer:
+                    # any PUSH still held is older than our SET: dispatch it now
+                    # or it would override the (optimistic) state when flushed
+                    push_coalescer.flush(handler)
+                handler.fingerprints_reset()
             return
         elif method == mc.METHOD_ERROR:
             if payload.get(mc.KEY_ERROR) == mc.ERROR_INVALIDKEY:
@@ -2180,6 +2429,15 @@ class Device(BaseDevice, ConfigEntryManager):
             # we're saving for diagnostic purposes so we have knowledge of
             # which data the device pushes asynchronously
             handler.lastpush = payload
+            if (
+                (push_coalescer := self._push_coalescer)
+                and handler.push_coalesce
+                and push_coalescer.put(handler, header, payload)
+            ):
+                return
+        if push_coalescer := self._push_coalescer:
+            # keep ordering: anything pending for this namespace is older
+            push_coalescer.flush(handler)
         try:
             handler.handler(header, payload)  # type: ignore
         except Exception as exception:
@@ -2520,6 +2778,38 @@ class Device(BaseDevice, ConfigEntryManager):
 
         return False
 
+    def _check_protocol_stats(self, epoch: float):
+        """
+        Periodically refreshes the ProtocolSensor stats attributes and, when
+        in 'fastest' mode, prefers the transport performing better provided
+        both are working. Besides ProtocolStats.HYSTERESIS, switches are
+        spaced at least PARAM_PROTOCOL_FASTEST_DWELL.
+        """
+        self._protocol_stats_epoch = epoch
+        self.sensor_protocol.update_attr_stats()
+        if not (self._protocol_fastest and self._http_active and self._mqtt_active):
+            return
+        if (epoch - self._protocol_fastest_epoch) < mlc.PARAM_PROTOCOL_FASTEST_DWELL:
+            return
+        pref_protocol = self.pref_protocol
+        alt_protocol = (
+            CONF_PROTOCOL_MQTT
+            if pref_protocol is CONF_PROTOCOL_HTTP
+            else CONF_PROTOCOL_HTTP
+        )
+        protocol_stats = self.protocol_stats
+        if protocol_stats[alt_protocol].outperforms(protocol_stats[pref_protocol]):
+            self.log(
+                self.DEBUG,
+                "Preferring protocol %s (measured faster than %s)",
+                alt_protocol,
+                pref_protocol,
+            )
+            self._protocol_fastest_epoch = epoch
+            self.pref_protocol = alt_protocol
+            if self.curr_protocol is not alt_protocol:
+                self._switch_protocol(alt_protocol)
+
     def _switch_protocol(self, protocol):
         self.log(
             self.DEBUG,
@@ -2545,11 +2835,24 @@ class Device(BaseDevice, ConfigEntryManager):
             self.polling_period = mlc.CONF_POLLING_PERIOD_MIN
         self._polling_delay = self.polling_period
 
+        # this is only effective when we're free to choose the protocol
+        self._protocol_fastest = bool(config.get(mlc.CONF_PROTOCOL_FASTEST)) and (
+            self.conf_protocol is CONF_PROTOCOL_AUTO
+        )
+
         if config.get(mlc.CONF_DISABLE_MULTIPLE):
             self.disable_multiple()
         else:
             self.enable_multiple()
 
+        if config.get(mlc.CONF_PUSH_COALESCE):
+            if not self._push_coalescer:
+                self._push_coalescer = PushCoalescer(self)
+        elif self._push_coalescer:
+            self._push_coalescer.flush()
+            self._push_coalescer.shutdown()
+            self._push_coalescer = None
+
         _http = self._http
         host = self.host
         if (self.conf_protocol is CONF_PROTOCOL_MQTT) or (not host):
@@ -29,9 +29,9 @@ from .obfuscate import (
     obfuscated_any,
     obfuscated_dict,
 )
+from .trace_writer import TraceWriter
 
 if TYPE_CHECKING:
-    import io
     from types import MappingProxyType
     from typing import (
         Any,
@@ -263,7 +263,7 @@ class ConfigEntryManager(EntityManager):
         config: Mapping[str, Any]
         key: str
         logger: logging.Logger
-        _trace_file: io.TextIOWrapper | None
+        _trace_file: TraceWriter | None
         _trace_future: asyncio.Future | None
         _trace_data: list | None
         _unsub_trace_endtime: asyncio.TimerHandle | None
@@ -506,13 +506,14 @@ class ConfigEntryManager(EntityManager):
                     "custom_components", DOMAIN, mlc.CONF_TRACE_DIRECTORY
                 )
                 os.makedirs(tracedir, exist_ok=True)
-                return open(
+                return TraceWriter(
+                    hass,
                     os.path.join(
                         tracedir,
                         f"{strftime('%Y-%m-%d_%H-%M-%S', localtime(epoch))}_{self.logtag}.csv",
                     ),
-                    mode="w",
-                    encoding="utf8",
+                    mlc.CONF_TRACE_MAXSIZE,
+                    bool(self.config.get(mlc.CONF_TRACE_COMPRESS)),
                 )
 
             self._trace_file = _t = await hass.async_add_executor_job(_trace_open)
@@ -566,11 +567,10 @@ class ConfigEntryManager(EntityManager):
     def trace_close(
         self, exception: Exception | None = None, error_context: str | None = None
     ):
-        notify_message = "Data not available"
-        if self._trace_file:
+        close_future = None
+        if _trace_file := self._trace_file:
             try:
-                notify_message = f"Data available in {self._trace_file.name}"
-                self._trace_file.close()
+                close_future = _trace_file.close()
             except Exception as e:
                 if not exception:
                     exception = e
@@ -585,6 +585,36 @@ class ConfigEntryManager(EntityManager):
             self._trace_future.set_result(self._trace_data)
             self._trace_future = None
         self._trace_data = None
+
+        if close_future:
+            # rows_dropped is only final once the last flush is done
+            @callback
+            def _trace_closed(future: asyncio.Future):
+                if exception or future.cancelled() or not future.exception():
+                    self._trace_notify_closed(_trace_file, exception, error_context)
+                else:
+                    self._trace_notify_closed(
+                        _trace_file, future.exception(), "closing file"  # type: ignore
+                    )
+
+            close_future.add_done_callback(_trace_closed)
+        else:
+            self._trace_notify_closed(_trace_file, exception, error_context)
+
+    def _trace_notify_closed(
+        self,
+        trace_file: TraceWriter | None,
+        exception: Exception | None,
+        error_context: str | None,
+    ):
+        if trace_file:
+            notify_message = f"Data available in {', '.join(trace_file.files)}"
+            if trace_file.rows_dropped:
+                notify_message += (
+                    f"\n{trace_file.rows_dropped} rows dropped (buffer overflow)"
+                )
+        else:
+            notify_message = "Data not available"
         if exception:
             self.log_exception(
                 self.WARNING, exception, "tracing operation (%s)", error_context
@@ -627,11 +657,11 @@ class ConfigEntryManager(EntityManager):
             ]
             if self._trace_data:
                 self._trace_data.append(columns)
-            if self._trace_file:
+            if _trace_file := self._trace_file:
                 columns[5] = json_dumps(data)
-                self._trace_file.write("\t".join(columns) + "\r\n")
+                _trace_file.write("\t".join(columns) + "\r\n")
                 columns[5] = data  # restore the (eventual) _trace_data ref
-                if self._trace_file.tell() > mlc.CONF_TRACE_MAXSIZE:
+                if _trace_file.full:
                     self.trace_close()
 
         except Exception as exception:
@@ -654,9 +684,9 @@ class ConfigEntryManager(EntityManager):
             ]
             if self._trace_data:
                 self._trace_data.append(columns)
-            if self._trace_file:
-                self._trace_file.write("\t".join(columns) + "\r\n")
-                if self._trace_file.tell() > mlc.CONF_TRACE_MAXSIZE:
+            if _trace_file := self._trace_file:
+                _trace_file.write("\t".join(columns) + "\r\n")
+                if _trace_file.full:
                     self.trace_close()
 
         except Exception as exception:
@@ -21,6 +21,7 @@ from ..merossclient import (
 from ..merossclient.mqttclient import MerossMQTTRateLimitException
 from ..merossclient.protocol import MerossKeyError, const as mc, namespaces as mn
 from ..merossclient.protocol.message import (
+    MerossLazyResponse,
     MerossRequest,
     MerossResponse,
     check_message_strict,
@@ -420,25 +421,31 @@ class MQTTConnection(Loggable):
             if sensor_connection := self.sensor_connection:
                 sensor_connection.inc_counter(ConnectionSensor.ATTR_RECEIVED)
             mqtt_payload = mqtt_msg.payload
-            message = MerossResponse(
+            # only the header is decoded here: the payload will be when
+            # (and if) the message gets actually dispatched
+            message = MerossLazyResponse(
                 mqtt_payload
                 if type(mqtt_payload) is str
                 else mqtt_payload.decode("utf-8")  # type: ignore
             )
-            header = message[mc.KEY_HEADER]
+            header = message.header
             device_id = get_message_uuid(header)
             namespace = header[mc.KEY_NAMESPACE]
             messageid = header[mc.KEY_MESSAGEID]
-            payload = message[mc.KEY_PAYLOAD]
 
             profile = self.profile
             api = profile.api
-            profile.trace_or_log(self, device_id, message, MQTTProfile.TRACE_RX)
+            if profile.is_tracing or profile.isEnabledFor(profile.VERBOSE):
+                profile.trace_or_log(
+                    self, device_id, message.response, MQTTProfile.TRACE_RX
+                )
+            else:
+                profile.log_header(self, device_id, header, MQTTProfile.TRACE_RX)
 
             try:
                 if self._mqtt_transactions[messageid].namespace == namespace:
                     self._mqtt_transactions.pop(messageid).response_future.set_result(
-                        message
+                        message.response
                     )
             except KeyError:
                 # special session management: cloud connections would
@@ -447,13 +454,13 @@ class MQTTConnection(Loggable):
                 # implemented in the derived MQTTConnections
                 if namespace in self.namespace_handlers:
                     if await self.namespace_handlers[namespace](
-                        self, device_id, header, payload
+                        self, device_id, header, message.response[mc.KEY_PAYLOAD]
                     ):
                         # session management has already taken care of everything
                         return
 
             try:
-                self.mqttdevices[device_id].mqtt_receive(message)
+                self.mqttdevices[device_id].mqtt_receive(message.response)
                 return
             except KeyError:
                 # device is not binded to this MQTTConnection
@@ -488,7 +495,7 @@ class MQTTConnection(Loggable):
                         if device._mqtt_connection != self:
                             self.attach(device)
 
-                    device.mqtt_receive(message)
+                    device.mqtt_receive(message.response)
                     return
 
             # the device is not configured: proceed to discovery in case
@@ -812,8 +819,18 @@ class MQTTProfile(ConfigEntryManager):
                     else message.json()
                 ),
             )
-        elif self.isEnabledFor(self.DEBUG):
-            header = message[mc.KEY_HEADER]
+        else:
+            self.log_header(connection, device_id, message[mc.KEY_HEADER], rxtx)
+
+    def log_header(
+        self,
+        connection: "MQTTConnection",
+        device_id: str,
+        header: "MerossHeaderType",
+        rxtx: str,
+    ):
+        """Lightweight trace_or_log when we only need (and have) the header."""
+        if self.isEnabledFor(self.DEBUG):
             connection.log(
                 self.DEBUG,
                 "%s(%s) %s %s (uuid:%s messageId:%s)",
@@ -2,6 +2,7 @@ import bisect
 from typing import TYPE_CHECKING
 
 from .. import const as mlc
+from ..merossclient import json_dumps
 from ..merossclient.protocol import const as mc, namespaces as mn
 from ..merossclient.protocol.message import check_message_strict
 
@@ -59,6 +60,13 @@ class NamespaceParser(Loggable if TYPE_CHECKING else object):
             for handler in set(self.namespace_handlers):
                 handler.unregister(self)
 
+    def fingerprints_reset(self):
+        """Ensures the next payloads for this parser will be parsed whatever their
+        content, in every namespace it is registered to."""
+        if self.namespace_handlers:
+            for handler in self.namespace_handlers:
+                handler.fingerprint_reset(self)
+
     def _parse(self, payload: dict, /):
         """Default payload message parser. This is invoked automatically
         when the parser is registered to a NamespaceHandler for a given namespace
@@ -113,6 +121,10 @@ class NamespaceHandler:
         lastpush: dict | None
         polling_strategy: PollingStrategyFunc | None
         polling_request_channels: list[dict[str, Any]]
+        push_coalesce: bool
+        """PUSHes for this namespace can be coalesced (see PushCoalescer)"""
+        fingerprints: dict[object, int] | None
+        """hash of the last parsed payload x channel (None when disabled)"""
 
     __slots__ = (
         "device",
@@ -132,6 +144,8 @@ class NamespaceHandler:
         "polling_response_size",
         "polling_request",
         "polling_request_channels",
+        "push_coalesce",
+        "fingerprints",
     )
 
     def __init__(
@@ -159,6 +173,8 @@ class NamespaceHandler:
         self.entity_class = None
         self.lastresponse = self.lastrequest = self.polling_epoch_next = 0.0
         self.lastpush = None
+        self.push_coalesce = ns in PUSH_COALESCE_NAMESPACES
+        self.fingerprints = None if ns in FINGERPRINT_OPTOUT_NAMESPACES else {}
 
         if _conf := config or POLLING_STRATEGY_CONF.get(ns):
             self.polling_period = _conf[0]
@@ -318,10 +334,25 @@ class NamespaceHandler:
         parser.namespace_handlers.add(self)
         self.polling_request_add_channel(channel)
         self.handler = self._handle_list
+        if self.fingerprints:
+            self.fingerprints.pop(channel, None)
 
     def unregister(self, parser: "NamespaceParser", /):
-        if self.parsers.pop(getattr(parser, self.ns.key_channel), None):
+        channel = getattr(parser, self.ns.key_channel)
+        if self.parsers.pop(channel, None):
             parser.namespace_handlers.remove(self)
+            if self.fingerprints:
+                self.fingerprints.pop(channel, None)
+
+    def fingerprints_reset(self):
+        """Ensures the next payloads will be parsed whatever their content."""
+        if self.fingerprints:
+            self.fingerprints.clear()
+
+    def fingerprint_reset(self, parser: "NamespaceParser", /):
+        """Ensures the next payload for parser will be parsed whatever its content."""
+        if self.fingerprints:
+            self.fingerprints.pop(getattr(parser, self.ns.key_channel), None)
 
     def handle_exception(self, exception: Exception, function_name: str, payload, /):
         device = self.device
@@ -349,7 +380,10 @@ class NamespaceHandler:
                     _parse = self.parsers[p_channel[self.ns.key_channel]]
                 except KeyError as key_error:
                     _parse = self._try_create_entity(key_error)
-                _parse(p_channel)
+                if self.fingerprints is None:
+                    _parse(p_channel)
+                else:
+                    self._parse_changed(_parse, p_channel)
         except TypeError:
             # this might be expected: the payload is not a list
             self.handler = self._handle_dict
@@ -373,7 +407,10 @@ class NamespaceHandler:
             self.handler = self._handle_generic
             self._handle_generic(header, payload)
             return
-        _parse(p_channel)
+        if self.fingerprints is None:
+            _parse(p_channel)
+        else:
+            self._parse_changed(_parse, p_channel)
 
     def _handle_generic(self, header, payload, /):
         """
@@ -389,7 +426,10 @@ class NamespaceHandler:
                 _parse = self.parsers[p_channel.get(self.ns.key_channel)]
             except KeyError as key_error:
                 _parse = self._try_create_entity(key_error)
-            _parse(p_channel)
+            if self.fingerprints is None:
+                _parse(p_channel)
+            else:
+                self._parse_changed(_parse, p_channel)
         else:
             key_channel = self.ns.key_channel
             for p_channel in p_channel:
@@ -397,7 +437,22 @@ class NamespaceHandler:
                     _parse = self.parsers[p_channel[key_channel]]
                 except KeyError as key_error:
                     _parse = self._try_create_entity(key_error)
-                _parse(p_channel)
+                if self.fingerprints is None:
+                    _parse(p_channel)
+                else:
+                    self._parse_changed(_parse, p_channel)
+
+    def _parse_changed(self, _parse: "Callable[[dict], None]", p_channel: dict, /):
+        """Invokes _parse only if p_channel is different from the last one parsed
+        for the same channel. Most of the polls just return the same state so
+        we'll skip parsing (and updating entities) when nothing changed."""
+        fingerprint = hash(json_dumps(p_channel))
+        channel = p_channel.get(self.ns.key_channel)
+        fingerprints: dict = self.fingerprints  # type: ignore
+        if fingerprints.get(channel) != fingerprint:
+            _parse(p_channel)
+            # set after parsing so that a failing parse is retried
+            fingerprints[channel] = fingerprint
 
     def _handle_undefined(
         self, header: "mt.MerossHeaderType", payload: "mt.MerossPayloadType", /
@@ -440,7 +495,10 @@ class NamespaceHandler:
                     _parse = self.parsers[p_channel[key_channel]]
                 except KeyError as key_error:
                     _parse = self._try_create_entity(key_error)
-                _parse(p_channel)
+                if self.fingerprints is None:
+                    _parse(p_channel)
+                else:
+                    self._parse_changed(_parse, p_channel)
         except Exception as exception:
             self.handle_exception(exception, "_parse_list", digest)
 
@@ -449,7 +507,11 @@ class NamespaceHandler:
         Used when parsing digest(s) in NS_ALL"""
         try:
             if type(digest) is dict:
-                self.parsers[digest.get(self.ns.key_channel)](digest)
+                _parse = self.parsers[digest.get(self.ns.key_channel)]
+                if self.fingerprints is None:
+                    _parse(digest)
+                else:
+                    self._parse_changed(_parse, digest)
             else:
                 key_channel = self.ns.key_channel
                 for p_channel in digest:
@@ -457,7 +519,10 @@ class NamespaceHandler:
                         _parse = self.parsers[p_channel[key_channel]]
                     except KeyError as key_error:
                         _parse = self._try_create_entity(key_error)
-                    _parse(p_channel)
+                    if self.fingerprints is None:
+                        _parse(p_channel)
+                    else:
+                        self._parse_changed(_parse, p_channel)
         except Exception as exception:
             self.handle_exception(exception, "_parse_generic", digest)
 
@@ -1113,3 +1178,34 @@ POLLING_STRATEGY_CONF: dict[mn.Namespace, "NamespaceConfigType"] = {
         NamespaceHandler.async_poll_default,
     ),
 }
+
+"""
+Namespaces whose PUSHes only carry 'state' so that, when receiving a burst,
+only the last payload (x channel) needs to be parsed (see PushCoalescer).
+Namespaces not listed here are never coalesced: this is notably the case for
+consumption reports where every sample counts and for any namespace in
+FINGERPRINT_OPTOUT_NAMESPACES since their parsers depend on every payload and
+on when it is received (Electricity energy integration, RollerShutter
+transitions timing).
+"""
+PUSH_COALESCE_NAMESPACES: set[mn.Namespace] = {
+    mn.Appliance_Control_Fan,
+    mn.Appliance_Control_Light,
+    mn.Appliance_Control_Mp3,
+    mn.Appliance_Control_Spray,
+    mn.Appliance_Control_Toggle,
+    mn.Appliance_Control_ToggleX,
+}
+
+"""
+Namespaces whose parsers have side effects depending on when the payload is
+received (time based integration or emulation) so that they need to parse
+every payload even if it didn't change (see NamespaceHandler._parse_changed).
+"""
+FINGERPRINT_OPTOUT_NAMESPACES: set[mn.Namespace] = {
+    mn.Appliance_Control_Electricity,
+    mn.Appliance_Control_ElectricityX,
+    mn.Appliance_GarageDoor_State,
+    mn.Appliance_RollerShutter_Position,
+    mn.Appliance_RollerShutter_State,
+}
@@ -0,0 +1,206 @@
+"""
+Shared scheduler for the devices polling loops.
+
+Every Device used to arm its own loop timer for its polling callback so that,
+with many devices, we had as many independent timers (re)armed every cycle
+and, since devices are usually started together at boot and share the same
+polling_period, they tended to poll in synchronized bursts.
+PollingScheduler (a singleton owned by ComponentApi) keeps all of the
+schedules in a heap and arms a single loop timer for the earliest one. Wake
+ups are aligned to a 'tick' so that nearby schedules are served together and,
+when too many are due in the same tick, the exceeding ones are spread over
+the following ticks.
+"""
+
+import heapq
+from itertools import count
+import math
+from typing import TYPE_CHECKING
+
+from .. import const as mlc
+
+if TYPE_CHECKING:
+    import asyncio
+    from typing import Any, Callable, Coroutine, Final
+
+    from .manager import EntityManager
+
+
+class PollingHandle:
+    """Returned by PollingScheduler.schedule: mimics asyncio.TimerHandle.cancel."""
+
+    __slots__ = (
+        "due",
+        "manager",
+        "target",
+        "args",
+        "cancelled",
+        "scheduler",
+    )
+
+    def __init__(
+        self,
+        due: float,
+        manager: "EntityManager",
+        target: "Callable[..., Coroutine]",
+        args: "tuple[Any, ...]",
+        scheduler: "PollingScheduler",
+    ):
+        self.due = due
+        self.manager = manager
+        self.target = target
+        self.args = args
+        self.cancelled = False
+        # set while pending i.e. until started or cancelled
+        self.scheduler: "PollingScheduler | None" = scheduler
+
+    def cancel(self):
+        self.cancelled = True
+        if scheduler := self.scheduler:
+            self.scheduler = None
+            scheduler.pending -= 1
+
+
+class PollingScheduler:
+
+    if TYPE_CHECKING:
+        TICK: Final[float]
+        BURST: Final[int]
+
+        loop: Final[asyncio.AbstractEventLoop]
+        pending: int
+        """live (i.e. not cancelled) handles in the heap"""
+        _heap: list[tuple[float, int, PollingHandle]]
+        _timer: asyncio.TimerHandle | None
+        _timer_when: float
+
+    TICK = mlc.PARAM_POLLING_SCHEDULER_TICK
+    """wake-ups are aligned to this period (seconds)"""
+    BURST = mlc.PARAM_POLLING_SCHEDULER_BURST
+    """maximum number of polling callbacks started in a single tick"""
+
+    __slots__ = (
+        "loop",
+        "pending",
+        "_heap",
+        "_sequence",
+        "_timer",
+        "_timer_when",
+        "polls_scheduled",
+        "polls_executed",
+        "polls_cancelled",
+        "polls_deferred",
+        "jitter_avg",
+        "jitter_max",
+    )
+
+    def __init__(self, loop: "asyncio.AbstractEventLoop"):
+        self.loop = loop
+        self.pending = 0
+        self._heap = []
+        self._sequence = count()
+        self._timer = None
+        self._timer_when = 0.0
+        self.polls_scheduled = 0
+        self.polls_executed = 0
+        self.polls_cancelled = 0
+        self.polls_deferred = 0
+        self.jitter_avg = 0.0
+        self.jitter_max = 0.0
+
+    def schedule(
+        self,
+        manager: "EntityManager",
+        delay: float,
+        target: "Callable[..., Coroutine]",
+        *args,
+    ):
+        """Schedules target(*args) to run (as a manager task) after delay.
+        Works like EntityManager.schedule_async_callback."""
+        due = self.loop.time() + delay
+        handle = PollingHandle(due, manager, target, args, self)
+        heapq.heappush(self._heap, (due, next(self._sequence), handle))
+        self.pending += 1
+        self.polls_scheduled += 1
+        self._arm()
+        return handle
+
+    def shutdown(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        for entry in self._heap:
+            entry[2].scheduler = None
+        self._heap.clear()
+        self.pending = 0
+
+    def get_diagnostics(self):
+        return {
+            "pending": self.pending,
+            "polls_scheduled": self.polls_scheduled,
+            "polls_executed": self.polls_executed,
+            "polls_cancelled": self.polls_cancelled,
+            "polls_deferred": self.polls_deferred,
+            "jitter_avg": round(self.jitter_avg, 3),
+            "jitter_max": round(self.jitter_max, 3),
+        }
+
+    def _arm(self):
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+            self.polls_cancelled += 1
+        if not heap:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            return
+        due = heap[0][0]
+        if due > self.loop.time():
+            # align to the tick so that close schedules get served together
+            due = math.ceil(due / self.TICK) * self.TICK
+        if self._timer:
+            if self._timer_when <= due:
+                return
+            self._timer.cancel()
+        self._timer = self.loop.call_at(due, self._run)
+        self._timer_when = due
+
+    def _run(self):
+        self._timer = None
+        now = self.loop.time()
+        heap = self._heap
+        started = 0
+        deferred: list[PollingHandle] = []
+        while heap and heap[0][0] <= now:
+            handle = heapq.heappop(heap)[2]
+            if handle.cancelled:
+                self.polls_cancelled += 1
+            elif started < self.BURST:
+                started += 1
+                jitter = now - handle.due
+                self.jitter_avg = (self.jitter_avg * 9 + jitter) / 10
+                if jitter > self.jitter_max:
+                    self.jitter_max = jitter
+                self.polls_executed += 1
+                handle.scheduler = None
+                self.pending -= 1
+                handle.manager.async_create_task(
+                    handle.target(*handle.args), ".polling_callback"
+                )
+            else:
+                deferred.append(handle)
+
+        # spread the exceeding ones over the next ticks (keeping their
+        # original due time for jitter accounting)
+        for i, handle in enumerate(deferred):
+            heapq.heappush(
+                heap,
+                (
+                    now + self.TICK * (1 + i // self.BURST),
+                    next(self._sequence),
+                    handle,
+                ),
+            )
+        self.polls_deferred += len(deferred)
+        self._arm()
@@ -0,0 +1,126 @@
+"""
+Per device/protocol transport performance.
+
+Choosing between HTTP and MQTT (when the device is configured for 'auto'
+protocol) only follows availability: the statically preferred transport is
+used as long as it works. ProtocolStats keeps a rolling window of the outcome
+(round trip time or failure) of the latest requests over a transport so that
+the Device can (optionally) prefer the one which is actually performing better
+and expose the figures in the ProtocolSensor attributes.
+"""
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+from .. import const as mlc
+
+if TYPE_CHECKING:
+    from typing import Final
+
+
+class ProtocolStats:
+
+    if TYPE_CHECKING:
+        RTT_BUCKETS: Final[tuple[float, ...]]
+        SAMPLES_MIN: Final[int]
+        FAILURE_RATE_MAX: Final[float]
+        HYSTERESIS: Final[float]
+
+        _samples: deque[float | None]
+
+    RTT_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5)
+    """upper bounds (seconds) of the rtt histogram buckets (the last is open)"""
+    SAMPLES_MIN = mlc.PARAM_PROTOCOL_STATS_SAMPLES_MIN
+    """samples needed before the stats are considered meaningful"""
+    FAILURE_RATE_MAX = mlc.PARAM_PROTOCOL_STATS_FAILURE_RATE_MAX
+    """failure rate above which the transport is considered unhealthy"""
+    HYSTERESIS = mlc.PARAM_PROTOCOL_FASTEST_HYSTERESIS
+    """a transport is 'faster' when its median rtt is lower by this ratio"""
+
+    __slots__ = (
+        "_samples",
+        "requests",
+        "failures",
+    )
+
+    def __init__(self):
+        self._samples = deque(maxlen=mlc.PARAM_PROTOCOL_STATS_SAMPLES)
+        self.requests = 0
+        self.failures = 0
+
+    def record(self, rtt: float):
+        self._samples.append(rtt)
+        self.requests += 1
+
+    def record_failure(self):
+        self._samples.append(None)
+        self.requests += 1
+        self.failures += 1
+
+    @property
+    def failure_rate(self):
+        if samples := self._samples:
+            return samples.count(None) / len(samples)
+        return 0.0
+
+    @property
+    def rtt_median(self):
+        rtts = sorted(rtt for rtt in self._samples if rtt is not None)
+        return rtts[len(rtts) // 2] if rtts else None
+
+    @property
+    def healthy(self):
+        return (len(self._samples) >= self.SAMPLES_MIN) and (
+            self.failure_rate <= self.FAILURE_RATE_MAX
+        )
+
+    def outperforms(self, other: "ProtocolStats"):
+        """True when self is healthy and either other is not or self is faster
+        by at least HYSTERESIS (so that similar transports don't flip-flop)."""
+        if not self.healthy:
+            return False
+        if not other.healthy:
+            return len(other._samples) >= other.SAMPLES_MIN
+        rtt = self.rtt_median
+        other_rtt = other.rtt_median
+        if rtt is None or other_rtt is None:
+            return False
+        return rtt < other_rtt * (1 - self.HYSTERESIS)
+
+    def get_histogram(self):
+        """rtt histogram of the rolling window: keys are the bucket upper bound
+        in ms ('inf' for the last one) plus 'failed'."""
+        buckets = self.RTT_BUCKETS
+        counts = [0] * (len(buckets) + 1)
+        failed = 0
+        for rtt in self._samples:
+            if rtt is None:
+                failed += 1
+                continue
+            for index, bound in enumerate(buckets):
+                if rtt <= bound:
+                    break
+            else:
+                index = len(buckets)
+            counts[index] += 1
+        histogram = {
+            str(int(bound * 1000)): counts[index]
+            for index, bound in enumerate(buckets)
+        }
+        histogram["inf"] = counts[-1]
+        histogram["failed"] = failed
+        return histogram
+
+    def get_attrs(self):
+        rtt_median = self.rtt_median
+        return {
+            "rtt_median": round(rtt_median * 1000) if rtt_median is not None else None,
+            "failure_rate": round(self.failure_rate, 3),
+            "rtt_histogram": self.get_histogram(),
+        }
+
+    def get_diagnostics(self):
+        return self.get_attrs() | {
+            "requests": self.requests,
+            "failures": self.failures,
+        }
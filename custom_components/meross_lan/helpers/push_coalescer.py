@@ -0,0 +1,161 @@
+"""
+Coalescing of bursts of PUSH messages.
+
+Some devices push their state (ToggleX, Light, ...) in bursts and every
+message used to be parsed as soon as received, each one
+triggering its entities updates. When enabled (device option) the Device
+hands PUSHes to a PushCoalescer which keeps only the last payload for every
+namespace/channel received in a (short) window and dispatches the result
+when the window closes.
+Only namespaces carrying 'state' (where the last value supersedes the
+previous ones) are coalesced (see NamespaceHandler.push_coalesce): anything
+else (like power readings or consumption reports where every sample matters)
+is dispatched as usual.
+"""
+
+from typing import TYPE_CHECKING
+
+from .. import const as mlc
+
+if TYPE_CHECKING:
+    import asyncio
+    from typing import Final
+
+    from ..merossclient.protocol.types import MerossHeaderType, MerossPayloadType
+    from .device import Device
+    from .namespaces import NamespaceHandler
+
+    # channel -> (header, channel payload, was the channel payload in a list)
+    type PendingType = dict[object, tuple[MerossHeaderType, dict, bool]]
+
+
+class PushCoalescer:
+
+    if TYPE_CHECKING:
+        WINDOW: Final[float]
+
+        device: Final[Device]
+        _pending: dict[NamespaceHandler, PendingType]
+        _flush_unsub: asyncio.TimerHandle | None
+
+    WINDOW = mlc.PARAM_PUSH_COALESCE_WINDOW
+    """time (seconds) a PUSH is held waiting for newer ones"""
+
+    __slots__ = (
+        "device",
+        "_pending",
+        "_flush_unsub",
+        "push_received",
+        "push_coalesced",
+        "push_dispatched",
+    )
+
+    def __init__(self, device: "Device"):
+        self.device = device
+        self._pending = {}
+        self._flush_unsub = None
+        self.push_received = 0
+        self.push_coalesced = 0
+        self.push_dispatched = 0
+
+    def shutdown(self):
+        """Stops without dispatching anything still pending (see flush)."""
+        if self._flush_unsub:
+            self._flush_unsub.cancel()
+            self._flush_unsub = None
+        self._pending.clear()
+
+    def get_diagnostics(self):
+        return {
+            "push_received": self.push_received,
+            "push_coalesced": self.push_coalesced,
+            "push_dispatched": self.push_dispatched,
+        }
+
+    def put(
+        self,
+        handler: "NamespaceHandler",
+        header: "MerossHeaderType",
+        payload: "MerossPayloadType",
+    ):
+        """Queues the PUSH payload. Returns False if the payload layout doesn't
+        allow coalescing so that the caller will dispatch it as usual (after
+        having flushed any pending payload for the same namespace)."""
+        ns = handler.ns
+        key_channel = ns.key_channel
+        try:
+            if len(payload) != 1:
+                return False
+            p_channels = payload[ns.key]
+            if type(p_channels) is dict:
+                items = ((p_channels[key_channel], p_channels, False),)
+            else:
+                items = [
+                    (p_channel[key_channel], p_channel, True)
+                    for p_channel in p_channels
+                ]
+                if not items:
+                    return False
+        except (KeyError, TypeError):
+            return False
+
+        try:
+            pending = self._pending[handler]
+        except KeyError:
+            pending = self._pending[handler] = {}
+        for channel, p_channel, is_list in items:
+            self.push_received += 1
+            if channel in pending:
+                self.push_coalesced += 1
+                # re-insert so that dispatch order follows the last update
+                del pending[channel]
+            pending[channel] = (header, p_channel, is_list)
+
+        if not self._flush_unsub:
+            self._flush_unsub = self.device.schedule_callback(
+                self.WINDOW, self._flush_callback
+            )
+        return True
+
+    def flush(self, handler: "NamespaceHandler | None" = None):
+        """Dispatches the pending payloads for handler (or all of them)."""
+        if handler:
+            if pending := self._pending.pop(handler, None):
+                self._dispatch(handler, pending)
+        else:
+            pending_all = self._pending
+            self._pending = {}
+            for handler, pending in pending_all.items():
+                self._dispatch(handler, pending)
+
+    def _flush_callback(self):
+        self._flush_unsub = None
+        self.flush()
+
+    def _dispatch(self, handler: "NamespaceHandler", pending: "PendingType"):
+        # Channels pushed in 'list' layout are merged in a single payload
+        # while 'dict' layout ones need a message each since legacy handlers
+        # might not expect a list.
+        key = handler.ns.key
+        p_list_header: "MerossHeaderType" = None  # type: ignore
+        p_list = []
+        for header, p_channel, is_list in pending.values():
+            if is_list:
+                p_list_header = header
+                p_list.append(p_channel)
+            else:
+                self._dispatch_payload(handler, header, {key: p_channel})
+        if p_list:
+            self._dispatch_payload(handler, p_list_header, {key: p_list})
+
+    def _dispatch_payload(
+        self,
+        handler: "NamespaceHandler",
+        header: "MerossHeaderType",
+        payload: "MerossPayloadType",
+    ):
+        self.push_dispatched += 1
+        try:
+            handler.handler(header, payload)  # type: ignore
+        except Exception as exception:
+            handler.handle_exception(exception, handler.handler.__name__, payload)
@@ -0,0 +1,128 @@
+"""
+Learned response sizes for packing polls in Appliance.Control.Multiple.
+
+NamespaceHandler.polling_response_size is a static estimate and the device
+response limits (device_response_size_min/max) are only discovered by trial
+(i.e. truncated or missing ns_multiple responses) so that, after every restart,
+a device goes through a warm-up of overflowing messages and re-sent singles.
+This module keeps what we learn from actual responses and persists it to HA
+storage so that the next restart starts out with it.
+Data is shared by every device of the same type/hardware/firmware since they
+respond the same.
+"""
+
+from typing import TYPE_CHECKING
+
+from homeassistant.helpers import storage
+
+from .. import const as mlc
+
+if TYPE_CHECKING:
+    from typing import Final, NotRequired, TypedDict
+
+    from homeassistant.core import HomeAssistant
+
+    from ..merossclient import MerossDeviceDescriptor
+
+    class ResponseSizeEntryType(TypedDict):
+        sizes: dict[str, int]
+        """learned response size keyed by 'namespace:payload item count'"""
+        limits: NotRequired[list[int]]
+        """learned [device_response_size_min, device_response_size_max]"""
+
+    ResponseSizeStoreType = dict[str, ResponseSizeEntryType]
+
+
+class ResponseSizeStore(storage.Store["ResponseSizeStoreType"]):
+    VERSION = 1
+
+    def __init__(self, hass: "HomeAssistant"):
+        super().__init__(
+            hass,
+            ResponseSizeStore.VERSION,
+            f"{mlc.DOMAIN}.response_size",
+        )
+
+
+class ResponseSizeModel:
+    """
+    Keeps a (decaying) high-water mark of the responses size for every
+    'namespace:channel count' query of a class of devices. Devices get their
+    entry (see device_entry) and update it in place through learn/learn_limits
+    while this will take care of (lazily) saving.
+    """
+
+    if TYPE_CHECKING:
+        SAVE_THRESHOLD: Final[float]
+
+        _store: Final[ResponseSizeStore]
+        _data: ResponseSizeStoreType
+        _save_pending: bool
+
+    SAVE_THRESHOLD = 0.1
+    """relative size change which is worth saving the model for"""
+
+    __slots__ = (
+        "_store",
+        "_data",
+        "_save_pending",
+    )
+
+    def __init__(self, hass: "HomeAssistant"):
+        self._store = ResponseSizeStore(hass)
+        self._data = {}
+        self._save_pending = False
+
+    async def async_load(self):
+        if data := await self._store.async_load():
+            self._data = data
+
+    def device_entry(self, descriptor: "MerossDeviceDescriptor"):
+        key = ":".join(
+            (descriptor.type, descriptor.hardwareVersion, descriptor.firmwareVersion)
+        )
+        try:
+            return self._data[key]
+        except KeyError:
+            self._data[key] = entry = {"sizes": {}}
+            return entry
+
+    def learn(self, entry: "ResponseSizeEntryType", key: str, size: int):
+        """Update the size estimate for key with an actual response size.
+        Estimates follow growing sizes immediately while shrinking slowly
+        so they rather stay on the safe side of (varying) responses."""
+        sizes = entry["sizes"]
+        current = sizes.get(key)
+        if current is None:
+            sizes[key] = size
+            self._schedule_save()
+        elif size > current:
+            sizes[key] = size
+            if size > current * (1 + self.SAVE_THRESHOLD):
+                self._schedule_save()
+        elif size < current:
+            sizes[key] = (7 * current + size) // 8
+
+    def learn_limits(
+        self, entry: "ResponseSizeEntryType", size_min: int, size_max: int
+    ):
+        limits = [int(size_min), int(size_max)]
+        if entry.get("limits") != limits:
+            entry["limits"] = limits
+            self._schedule_save()
+
+    def _schedule_save(self):
+        # async_delay_save reschedules on every call so we'd never get saved
+        # if learning often: just schedule once and let the delay collect
+        # the following updates.
+        if self._save_pending:
+            return
+        self._save_pending = True
+
+        def _data_func():
+            self._save_pending = False
+            return self._data
+
+        self._store.async_delay_save(
+            _data_func, mlc.PARAM_RESPONSE_SIZE_DELAYED_SAVE_TIMEOUT
+        )
@@ -0,0 +1,228 @@
+"""
+Buffered trace file writer.
+
+Tracing used to write every row to the trace file straight from the event loop
+(i.e. while the message was being handled) so that, when tracing a few busy
+devices at once, the message handling latency was also paying for the disk.
+TraceWriter just queues the (already formatted) rows in a bounded buffer and
+periodically flushes them in batches from an executor thread. Should the
+buffer fill up (the disk not keeping up) further rows are dropped (and
+counted) rather than blocking the caller: the loop side and the executor side
+keep their own drop counters so that neither needs to lock the other.
+When a file reaches its size limit the trace goes on in a new 'part'
+(so that the first one, carrying the trace header, is never lost) until
+the maximum number of parts is reached: the writer is then 'full' and the
+owner is expected to stop tracing. Files can optionally be gzip compressed
+(the size limit still applies to the uncompressed text).
+"""
+
+from collections import deque
+import gzip
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from . import LOGGER
+from .. import const as mlc
+
+if TYPE_CHECKING:
+    import asyncio
+    from typing import Final, TextIO
+
+    from homeassistant.core import HomeAssistant
+
+
+class TraceWriter:
+
+    if TYPE_CHECKING:
+        FLUSH_DELAY: Final[float]
+        BUFFER_MAX: Final[int]
+        FILES_MAX: Final[int]
+
+        hass: Final[HomeAssistant]
+        path: Final[str]
+        compress: Final[bool]
+        max_size: Final[int]
+        _rows_overflow: int
+        _rows_discarded: int
+        _buffer: deque[str]
+        _lock: Final[threading.Lock]
+        _file: TextIO | None
+        _file_size: int
+        _flush_unsub: asyncio.TimerHandle | None
+        _flush_pending: bool
+        _closed: bool
+
+    FLUSH_DELAY = mlc.PARAM_TRACE_FLUSH_DELAY
+    """rows are collected for this time (seconds) before flushing"""
+    BUFFER_MAX = mlc.PARAM_TRACE_BUFFER_MAX
+    """maximum number of rows waiting to be flushed"""
+    FILES_MAX = mlc.PARAM_TRACE_FILES_MAX
+    """maximum number of files (parts) a trace is split into"""
+
+    __slots__ = (
+        "hass",
+        "path",
+        "compress",
+        "max_size",
+        "full",
+        "rows_written",
+        "_rows_overflow",
+        "_rows_discarded",
+        "_buffer",
+        "_lock",
+        "_file",
+        "_file_size",
+        "_file_index",
+        "_flush_unsub",
+        "_flush_pending",
+        "_closed",
+    )
+
+    def __init__(
+        self, hass: "HomeAssistant", path: str, max_size: int, compress: bool
+    ):
+        """Opens the (first) file so it needs to be run in an executor."""
+        self.hass = hass
+        self.path = path
+        self.compress = compress
+        self.max_size = max_size
+        self.full = False
+        self.rows_written = 0
+        self._rows_overflow = 0
+        self._rows_discarded = 0
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_size = 0
+        self._file_index = 0
+        self._flush_unsub = None
+        self._flush_pending = False
+        self._closed = False
+        self._open()
+
+    @property
+    def name(self):
+        """Name of the file currently being written."""
+        return self._file_path(self._file_index)
+
+    @property
+    def files(self):
+        """Names of the files (parts) written so far."""
+        return [self._file_path(index) for index in range(self._file_index + 1)]
+
+    @property
+    def rows_dropped(self):
+        """Rows lost either because the buffer was full or the trace was ending."""
+        return self._rows_overflow + self._rows_discarded
+
+    def write(self, row: str):
+        """Queues the row for the next flush. Returns False if dropped."""
+        if self._closed or self.full or (len(self._buffer) >= self.BUFFER_MAX):
+            self._rows_overflow += 1
+            return False
+        self._buffer.append(row)
+        if not (self._flush_unsub or self._flush_pending):
+            self._flush_unsub = self.hass.loop.call_later(
+                self.FLUSH_DELAY, self._flush_callback
+            )
+        return True
+
+    def close(self) -> "asyncio.Future[None]":
+        """Schedules the flush of anything still queued and closes the file.
+        The returned future is done once the file is closed (and rows_dropped final)."""
+        if self._flush_unsub:
+            self._flush_unsub.cancel()
+            self._flush_unsub = None
+        self._closed = True
+        return self.hass.async_add_executor_job(self._flush, True)
+
+    def get_diagnostics(self):
+        return {
+            "file": self.name,
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "rows_pending": len(self._buffer),
+        }
+
+    def _flush_callback(self):
+        self._flush_unsub = None
+        self._flush_pending = True
+        self.hass.async_add_executor_job(self._flush, False).add_done_callback(
+            self._flush_done
+        )
+
+    def _flush_done(self, future: "asyncio.Future"):
+        self._flush_pending = False
+        if not future.cancelled() and (exception := future.exception()):
+            # not an OSError (those are handled in _flush) so something unexpected:
+            # flag the writer as full so that the owner closes the trace
+            LOGGER.warning(
+                "TraceWriter(%s): %s(%s) while flushing",
+                self.name,
+                exception.__class__.__name__,
+                str(exception),
+            )
+            self.full = True
+            return
+        if self._buffer and not (self._closed or self.full or self._flush_unsub):
+            self._flush_unsub = self.hass.loop.call_later(
+                self.FLUSH_DELAY, self._flush_callback
+            )
+
+    def _flush(self, close: bool):
+        """Executor side: writes out the buffered rows (and eventually closes)."""
+        with self._lock:
+            buffer = self._buffer
+            try:
+                while buffer and (_file := self._file):
+                    rows = []
+                    size = self._file_size
+                    # only we pop from the buffer so it cannot empty under us
+                    while buffer and (size < self.max_size):
+                        row = buffer.popleft()
+                        rows.append(row)
+                        size += len(row)
+                    _file.write("".join(rows))
+                    _file.flush()
+                    self._file_size = size
+                    self.rows_written += len(rows)
+                    if size >= self.max_size:
+                        self._close()
+                        if self._file_index + 1 < self.FILES_MAX:
+                            self._file_index += 1
+                            self._open()
+                        else:
+                            self.full = True
+            except OSError:
+                self.full = True
+                self._close()
+            finally:
+                # _rows_discarded is only touched here (under the lock) while
+                # _rows_overflow is only touched by write() in the loop
+                if close or self.full:
+                    self._rows_discarded += len(buffer)
+                    buffer.clear()
+                    self._close()
+
+    def _file_path(self, index: int):
+        path, ext = os.path.splitext(self.path)
+        if index:
+            path = f"{path}_{index}"
+        return f"{path}{ext}.gz" if self.compress else f"{path}{ext}"
+
+    def _open(self):
+        path = self._file_path(self._file_index)
+        if self.compress:
+            self._file = gzip.open(path, mode="wt", encoding="utf8")  # type: ignore
+        else:
+            self._file = open(path, mode="w", encoding="utf8")
+        self._file_size = 0
+
+    def _close(self):
+        if _file := self._file:
+            self._file = None
+            try:
+                _file.close()
+            except OSError:
+                pass
@@ -5,11 +5,14 @@ for Meross devices.
 
 import asyncio
 from base64 import b64decode, b64encode
+from collections import deque
 import logging
 import socket
 import sys
+from time import monotonic
 from typing import TYPE_CHECKING
 from uuid import uuid4
+from weakref import WeakValueDictionary
 
 import aiohttp
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -24,7 +27,7 @@ from .protocol.message import (
 )
 
 if TYPE_CHECKING:
-    from typing import ClassVar, Protocol
+    from typing import ClassVar, Final, Protocol
 
     from protocol.types import MerossHeaderType, MerossPayloadType
 
@@ -37,18 +40,114 @@ class TerminatedException(Exception):
     pass
 
 
+class MerossHttpHost:
+    """
+    Per host (device) connection state shared by any MerossHttpClient pointing
+    to the same host. Requests are serialized through 'lock' (asyncio.Lock
+    is fair so this works as a FIFO queue) since devices misbehave when
+    receiving concurrent requests and, this way, every request finds the
+    (single) kept-alive connection free for reuse instead of waiting in the
+    connector pool (where the wait would count against its timeout).
+    The wait for the lock is itself bounded by the client (total) timeout so
+    that a stuck request doesn't indefinitely hold back the ones queued behind.
+    It also collects connection reuse and latency statistics.
+    """
+
+    if TYPE_CHECKING:
+        LATENCY_SAMPLES: ClassVar[int]
+
+        host: Final[str]
+        lock: Final[asyncio.Lock]
+        latencies: Final[deque[float]]
+
+    LATENCY_SAMPLES = 100
+    """number of (most recent) request latencies kept to compute percentiles"""
+
+    __slots__ = (
+        "host",
+        "lock",
+        "latencies",
+        "requests",
+        "failures",
+        "lock_timeouts",
+        "connections_created",
+        "connections_reused",
+        "connection_reused",
+        "stale_retries",
+        "__weakref__",
+    )
+
+    def __init__(self, host: str):
+        self.host = host
+        self.lock = asyncio.Lock()
+        self.latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self.requests = 0
+        self.failures = 0
+        self.lock_timeouts = 0
+        """requests which timed out while waiting their turn (never sent)"""
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.connection_reused = False
+        """the current (last) request reused a kept-alive connection"""
+        self.stale_retries = 0
+
+    def get_stats(self):
+        latencies = sorted(self.latencies)
+        connections = self.connections_created + self.connections_reused
+
+        def _percentile(p: float):
+            if latencies:
+                return round(latencies[int(p * (len(latencies) - 1))], 3)
+            return None
+
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "lock_timeouts": self.lock_timeouts,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_rate": (
+                round(self.connections_reused / connections, 3)
+                if connections
+                else None
+            ),
+            "stale_retries": self.stale_retries,
+            "latency_p50": _percentile(0.5),
+            "latency_p90": _percentile(0.9),
+            "latency_p99": _percentile(0.99),
+        }
+
+
+async def _on_connection_create_end(session, trace_config_ctx, params):
+    if (host := trace_config_ctx.trace_request_ctx) is not None:
+        host.connections_created += 1
+        host.connection_reused = False
+
+
+async def _on_connection_reuseconn(session, trace_config_ctx, params):
+    if (host := trace_config_ctx.trace_request_ctx) is not None:
+        host.connections_reused += 1
+        host.connection_reused = True
+
+
 class MerossHttpClient:
     if TYPE_CHECKING:
         SESSION_MAXIMUM_CONNECTIONS: ClassVar
         SESSION_MAXIMUM_CONNECTIONS_PER_HOST: ClassVar
+        SESSION_KEEPALIVE_TIMEOUT: ClassVar
         SESSION_TIMEOUT: ClassVar
         _SESSION: ClassVar[aiohttp.ClientSession | None]
+        _HOSTS: ClassVar[WeakValueDictionary[str, MerossHttpHost]]
 
+        _http_host: MerossHttpHost
         _encryption_cipher: Cipher | None
         _key_header: MerossHeaderType
 
     SESSION_MAXIMUM_CONNECTIONS = 50
     SESSION_MAXIMUM_CONNECTIONS_PER_HOST = 1
+    SESSION_KEEPALIVE_TIMEOUT = 60
+    """Keep the connection to a device open across (default period) polls.
+    Devices closing it earlier are fine: aiohttp drops the connection."""
     SESSION_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
 
     # Use an 'isolated' and dedicated client session to better manage
@@ -58,17 +157,24 @@ class MerossHttpClient:
     # Setting SESSION_MAXIMUM_CONNECTIONS_PER_HOST == 1 should prevent
     # concurrent http sessions to the same device.
     _SESSION = None
+    # Per host state shared by clients (see MerossHttpHost).
+    _HOSTS = WeakValueDictionary()
 
     @staticmethod
     def _get_or_create_client_session():
         if not MerossHttpClient._SESSION:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(_on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
             MerossHttpClient._SESSION = aiohttp.ClientSession(
                 connector=aiohttp.TCPConnector(
                     family=socket.AF_INET,
                     limit=MerossHttpClient.SESSION_MAXIMUM_CONNECTIONS,
                     limit_per_host=MerossHttpClient.SESSION_MAXIMUM_CONNECTIONS_PER_HOST,
+                    keepalive_timeout=MerossHttpClient.SESSION_KEEPALIVE_TIMEOUT,
                     ssl=False,
                 ),
+                trace_configs=[trace_config],
                 headers={
                     aiohttp.hdrs.USER_AGENT: "MerossLan aiohttp/{0} Python/{1[0]}.{1[1]}".format(
                         aiohttp.__version__, sys.version_info
@@ -78,6 +184,14 @@ class MerossHttpClient:
             )
         return MerossHttpClient._SESSION
 
+    @staticmethod
+    def _get_http_host(host: str):
+        try:
+            return MerossHttpClient._HOSTS[host]
+        except KeyError:
+            MerossHttpClient._HOSTS[host] = http_host = MerossHttpHost(host)
+            return http_host
+
     @staticmethod
     async def async_shutdown_session():
         if MerossHttpClient._SESSION:
@@ -86,6 +200,7 @@ class MerossHttpClient:
 
     __slots__ = (
         "_host",
+        "_http_host",
         "_requesturl",
         "key",
         "timeout",
@@ -97,6 +212,7 @@ class MerossHttpClient:
         "_terminate_guard",
         "_encryption_cipher",
         "_key_header",
+        "last_latency",
     )
 
     def __init__(
@@ -116,6 +232,7 @@ class MerossHttpClient:
         log_level_dump: the logging level at which the full json payloads will be dumped (costly)
         """
         self._host = host
+        self._http_host = MerossHttpClient._get_http_host(host)
         self._requesturl = URL(f"http://{host}/config")
         self.key = key
         self.timeout = MerossHttpClient.SESSION_TIMEOUT
@@ -127,6 +244,9 @@ class MerossHttpClient:
         self._terminate_guard = 0
         self._encryption_cipher = None
         self._key_header = {}  # type: ignore
+        self.last_latency = 0.0
+        """duration of the last (successful) post, not counting the wait
+        for the host lock"""
 
     @property
     def host(self):
@@ -134,8 +254,13 @@ class MerossHttpClient:
 
     @host.setter
     def host(self, value: str):
-        self._host = value
-        self._requesturl = URL(f"http://{value}/config")
+        if value != self._host:
+            self._host = value
+            self._http_host = MerossHttpClient._get_http_host(value)
+            self._requesturl = URL(f"http://{value}/config")
+
+    def get_connection_stats(self):
+        return self._http_host.get_stats()
 
     def set_encryption(self, encryption_key: bytes | None, /):
         if encryption_key:
@@ -198,33 +323,26 @@ class MerossHttpClient:
                 headers = {
                     aiohttp.hdrs.CONTENT_TYPE: "application/json",
                 }
-            # since device HTTP service sometimes timeouts with no apparent
-            # reason we're using an increasing timeout loop to try recover
-            # when this timeout is transient. This will lead to a total timeout
-            # (for the caller) exceeding the value(s) actually set in self.timeout
-            _connect_timeout_max = self.timeout.connect or self.timeout.total or 5
-            _connect_timeout = 1
-            while True:
+            http_host = self._http_host
+            try:
+                async with asyncio.timeout(self.timeout.total):
+                    await http_host.lock.acquire()
+            except TimeoutError:
+                http_host.lock_timeouts += 1
+                raise
+            try:
+                self._check_terminated()
+                http_host.requests += 1
+                epoch = monotonic()
                 try:
-                    response = await self._session.post(
-                        url=self._requesturl,
-                        data=request,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(
-                            total=self.timeout.total, connect=_connect_timeout
-                        ),
-                    )
-                    break
-                except aiohttp.ServerTimeoutError as exception:
-                    self._check_terminated()
-                    if _connect_timeout < _connect_timeout_max:
-                        _connect_timeout = _connect_timeout * 2
-                    else:
-                        raise exception
-
-            self._check_terminated()
-            response.raise_for_status()
-            response = await response.text()
+                    response = await self._async_post(request, headers)
+                except Exception:
+                    http_host.failures += 1
+                    raise
+                self.last_latency = latency = monotonic() - epoch
+                http_host.latencies.append(latency)
+            finally:
+                http_host.lock.release()
             if _cipher:
                 decryptor = _cipher.decryptor()
                 decrypted_bytes = decryptor.update(b64decode(response))
@@ -253,6 +371,48 @@ class MerossHttpClient:
         finally:
             self._terminate_guard -= 1
 
+    async def _async_post(self, request: str, headers: dict, /):
+        """Posts the request and returns the response text. Needs to be called
+        while holding the host lock."""
+        http_host = self._http_host
+        # since device HTTP service sometimes timeouts with no apparent
+        # reason we're using an increasing timeout loop to try recover
+        # when this timeout is transient. This will lead to a total timeout
+        # (for the caller) exceeding the value(s) actually set in self.timeout
+        _connect_timeout_max = self.timeout.connect or self.timeout.total or 5
+        _connect_timeout = 1
+        _stale_retry = True
+        while True:
+            http_host.connection_reused = False
+            try:
+                async with self._session.post(
+                    url=self._requesturl,
+                    data=request,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(
+                        total=self.timeout.total, connect=_connect_timeout
+                    ),
+                    trace_request_ctx=http_host,
+                ) as response:
+                    self._check_terminated()
+                    response.raise_for_status()
+                    return await response.text()
+            except aiohttp.ServerTimeoutError as exception:
+                self._check_terminated()
+                if _connect_timeout < _connect_timeout_max:
+                    _connect_timeout = _connect_timeout * 2
+                else:
+                    raise exception
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError):
+                # the device might have closed the kept-alive connection
+                # right when we were reusing it: retry (once) on a new one
+                self._check_terminated()
+                if _stale_retry and http_host.connection_reused:
+                    _stale_retry = False
+                    http_host.stale_retries += 1
+                else:
+                    raise
+
     async def async_request(
         self, namespace: str, method: str, payload: "MerossPayloadType", /
     ) -> MerossResponse:
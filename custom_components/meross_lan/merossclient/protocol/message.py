@@ -1,4 +1,5 @@
 from hashlib import md5
+import re
 from time import time
 from typing import TYPE_CHECKING
 from uuid import uuid4
@@ -7,6 +8,8 @@ from . import MerossKeyError, MerossProtocolError, const as mc, namespaces as mn
 from .. import JSON_DECODER, JSON_ENCODER
 
 if TYPE_CHECKING:
+    from typing import Final
+
     from .types import KeyType, MerossHeaderType, MerossMessageType, MerossPayloadType
 
 
@@ -159,8 +162,71 @@ class MerossMessage(dict):
 class MerossResponse(MerossMessage):
     """Helper for messages received from a device"""
 
+    def __init__(self, json_str: str, message: dict | None = None, /):
+        super().__init__(
+            JSON_DECODER.decode(json_str) if message is None else message, json_str
+        )
+
+
+class MerossLazyResponse:
+    """
+    Header-first parser for messages received from a device: only the header
+    is decoded when built while the payload is decoded (into a MerossResponse)
+    when first accessing 'response'. This allows dispatching (or dropping)
+    messages by their header before paying for the full decoding which might
+    not be needed at all (i.e. MQTT messages for devices we don't manage).
+    Meross messages are always serialized as '{"header":{...},"payload":{...}}'
+    so we just decode the header object in place and leave the parsing
+    position at its end. Any other layout falls back to a full decode.
+    """
+
+    RE_HEADER_START = re.compile(r'\s*\{\s*"header"\s*:\s*')
+    RE_PAYLOAD_START = re.compile(r'\s*,\s*"payload"\s*:\s*')
+    RE_MESSAGE_END = re.compile(r"\s*\}\s*")
+
+    if TYPE_CHECKING:
+        json_str: Final[str]
+        header: Final[MerossHeaderType]
+        _header_end: int
+        _response: MerossResponse | None
+
+    __slots__ = (
+        "json_str",
+        "header",
+        "_header_end",
+        "_response",
+    )
+
     def __init__(self, json_str: str, /):
-        super().__init__(JSON_DECODER.decode(json_str), json_str)
+        self.json_str = json_str
+        if match := MerossLazyResponse.RE_HEADER_START.match(json_str):
+            self.header, self._header_end = JSON_DECODER.raw_decode(
+                json_str, match.end()
+            )
+            self._response = None
+        else:
+            self._response = response = MerossResponse(json_str)
+            self.header = response[mc.KEY_HEADER]
+            self._header_end = 0
+
+    @property
+    def response(self):
+        if self._response is not None:
+            return self._response
+        json_str = self.json_str
+        if match := MerossLazyResponse.RE_PAYLOAD_START.match(
+            json_str, self._header_end
+        ):
+            payload, end = JSON_DECODER.raw_decode(json_str, match.end())
+            if MerossLazyResponse.RE_MESSAGE_END.fullmatch(json_str, end):
+                self._response = MerossResponse(
+                    json_str, {mc.KEY_HEADER: self.header, mc.KEY_PAYLOAD: payload}
+                )
+                return self._response
+        # unexpected layout (i.e. some other key after the header)
+        self._response = response = MerossResponse(json_str)
+        response[mc.KEY_HEADER] = self.header
+        return response
 
 
 class MerossRequest(MerossMessage):
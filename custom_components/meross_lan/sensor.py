@@ -297,6 +297,8 @@ class ProtocolSensor(me.MEAlwaysAvailableMixin, MLEnumSensor):
     ATTR_HTTP = mlc.CONF_PROTOCOL_HTTP
     ATTR_MQTT = mlc.CONF_PROTOCOL_MQTT
     ATTR_MQTT_BROKER = "mqtt_broker"
+    ATTR_HTTP_STATS = "http_stats"
+    ATTR_MQTT_STATS = "mqtt_stats"
 
     manager: "Device"
 
@@ -337,6 +339,7 @@ class ProtocolSensor(me.MEAlwaysAvailableMixin, MLEnumSensor):
             attrs[self.ATTR_HTTP] = _get_attr_state(manager._http_active)
             attrs[self.ATTR_MQTT] = _get_attr_state(manager._mqtt_active)
             attrs[self.ATTR_MQTT_BROKER] = _get_attr_state(manager._mqtt_connected)
+            self._set_attr_stats(attrs)
         self.flush_state()
 
     def set_unavailable(self):
@@ -376,6 +379,17 @@ class ProtocolSensor(me.MEAlwaysAvailableMixin, MLEnumSensor):
             attrs[attrname] = self.STATE_INACTIVE
             self.flush_state()
 
+    def update_attr_stats(self):
+        attrs = self.extra_state_attributes
+        if self.ATTR_HTTP in attrs:
+            self._set_attr_stats(attrs)
+            self.flush_state()
+
+    def _set_attr_stats(self, attrs: dict):
+        protocol_stats = self.manager.protocol_stats
+        attrs[self.ATTR_HTTP_STATS] = protocol_stats[self.ATTR_HTTP].get_attrs()
+        attrs[self.ATTR_MQTT_STATS] = protocol_stats[self.ATTR_MQTT].get_attrs()
+
     def update_attrs_inactive(self, *attrnames):
         flush = False
         attrs = self.extra_state_attributes
@@ -46,10 +46,12 @@ off Xiaomi or its affiliates' products.
 Common utilities.
 """
 import asyncio
+from collections import deque
 import json
 from os import path
 import random
-from typing import Any, Optional
+import threading
+from typing import Any, Callable, Optional
 import hashlib
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
@@ -123,6 +125,176 @@ class MIoTMatcher(MQTTMatcher):
             return None
 
 
+class MIoTSubRouter:
+    """Route device property/event messages to their subscribers.
+
+    Subscriptions used to be MIoTMatcher topics like '{did}/p/{siid}/{piid}'
+    (or '{did}/p/#'), so that every message needed the topic formatted and
+    the trie walked. Here they are keyed by the (did, kind, siid, iid) tuple
+    (kind being 'p' for properties and 'e' for events) in a dict, while the
+    whole device ones (siid or iid None, i.e. '#') go in a separate, small,
+    (did, kind) table. siid and iid are the integers found in the messages.
+    """
+    _exact: dict[tuple[str, str, int, int], Any]
+    _wildcard: dict[tuple[str, str], Any]
+
+    def __init__(self) -> None:
+        self._exact = {}
+        self._wildcard = {}
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._wildcard)
+
+    def set(
+        self, did: str, kind: str, siid: Optional[int], iid: Optional[int],
+        value: Any
+    ) -> None:
+        """Add (or replace) a subscription, for the whole device (kind) if
+        siid or iid is None."""
+        if siid is None or iid is None:
+            self._wildcard[(did, kind)] = value
+        else:
+            self._exact[(did, kind, siid, iid)] = value
+
+    def remove(
+        self, did: str, kind: str, siid: Optional[int], iid: Optional[int]
+    ) -> Optional[Any]:
+        """Remove a subscription, return it or None if not found."""
+        if siid is None or iid is None:
+            return self._wildcard.pop((did, kind), None)
+        return self._exact.pop((did, kind, siid, iid), None)
+
+    def match(
+        self, did: str, kind: str, siid: int, iid: int
+    ) -> list[Any]:
+        """Return the subscriptions matching a message, the exact one
+        first (same order as MIoTMatcher.iter_match)."""
+        result = []
+        value = self._exact.get((did, kind, siid, iid))
+        if value is not None:
+            result.append(value)
+        value = self._wildcard.get((did, kind))
+        if value is not None:
+            result.append(value)
+        return result
+
+
+class MIoTAimdController:
+    """Adaptive batch size and interval of a batched request (AIMD).
+
+    A request replied within latency_target grows the batch by batch_step
+    and shortens the interval by interval_step (additive increase), a slow
+    or failed one halves the batch and doubles the interval (multiplicative
+    decrease). The batch doesn't grow while the error rate (moving average
+    of the failures) is above ERROR_RATE_MAX.
+    """
+    ERROR_RATE_MAX: float = 0.1
+    ERROR_RATE_WEIGHT: float = 0.2
+    batch_size: int
+    interval: float
+    error_rate: float
+    latency: Optional[float]
+    _batch_min: int
+    _batch_max: int
+    _batch_step: int
+    _interval_min: float
+    _interval_max: float
+    _interval_step: float
+    _latency_target: float
+
+    def __init__(
+        self, batch_max: int, interval_min: float, interval_max: float,
+        latency_target: float, batch_min: int = 1,
+        batch_step: Optional[int] = None,
+        interval_step: Optional[float] = None
+    ) -> None:
+        self._batch_min = batch_min
+        self._batch_max = batch_max
+        self._batch_step = batch_step or max(1, batch_max // 10)
+        self._interval_min = interval_min
+        self._interval_max = interval_max
+        self._interval_step = interval_step or interval_min
+        self._latency_target = latency_target
+        self.batch_size = batch_max
+        self.interval = interval_min
+        self.error_rate = 0.0
+        self.latency = None
+
+    def on_success(self, latency: float) -> None:
+        """Record a request replied after latency seconds."""
+        self.error_rate *= 1 - self.ERROR_RATE_WEIGHT
+        self.latency = latency if self.latency is None else (
+            self.latency + (latency - self.latency) * self.ERROR_RATE_WEIGHT)
+        if latency > self._latency_target:
+            self.__decrease()
+            return
+        self.interval = max(
+            self._interval_min, self.interval - self._interval_step)
+        if self.error_rate <= self.ERROR_RATE_MAX:
+            self.batch_size = min(
+                self._batch_max, self.batch_size + self._batch_step)
+
+    def on_failure(self) -> None:
+        """Record a failed request."""
+        self.error_rate += (1 - self.error_rate) * self.ERROR_RATE_WEIGHT
+        self.__decrease()
+
+    def __decrease(self) -> None:
+        self.batch_size = max(self._batch_min, self.batch_size // 2)
+        self.interval = min(self._interval_max, self.interval * 2)
+
+
+class MIoTHandoffQueue:
+    """Hand callbacks over from an internal thread to the main loop in batches.
+
+    Calling main_loop.call_soon_threadsafe() wakes up the main loop (through
+    its self-pipe) every time. Callbacks put here are queued instead, and only
+    the first one queued while no drain is pending wakes the main loop up:
+    the drain then runs everything queued so far, in order, so that the
+    callbacks ordering (and per-subscriber ordering) is preserved.
+    """
+    # pylint: disable=inconsistent-quotes
+    _main_loop: asyncio.AbstractEventLoop
+    _queue: deque[tuple[Callable[..., Any], tuple]]
+    _lock: threading.Lock
+    _drain_pending: bool
+    wakeups: int
+    callbacks: int
+
+    def __init__(self, main_loop: asyncio.AbstractEventLoop) -> None:
+        self._main_loop = main_loop
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._drain_pending = False
+        self.wakeups = 0
+        self.callbacks = 0
+
+    def put(self, handler: Callable[..., Any], *args: Any) -> None:
+        """Queue handler(*args) to be called in the main loop."""
+        with self._lock:
+            self._queue.append((handler, args))
+            self.callbacks += 1
+            if self._drain_pending:
+                return
+            self._drain_pending = True
+            self.wakeups += 1
+        self._main_loop.call_soon_threadsafe(self.__drain)
+
+    def __drain(self) -> None:
+        with self._lock:
+            queue = self._queue
+            self._queue = deque()
+            self._drain_pending = False
+        for handler, args in queue:
+            try:
+                handler(*args)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                # same as an exception raised by a call_soon callback
+                self._main_loop.call_exception_handler({
+                    'message': f'Exception in handoff callback {handler}',
+                    'exception': err})
+
+
 class MIoTHttp:
     """MIoT Common HTTP API."""
     @staticmethod
@@ -59,7 +59,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.components import zeroconf
 
 # pylint: disable=relative-beyond-top-level
-from .common import MIoTMatcher, slugify_did
+from .common import MIoTSubRouter, slugify_did
 from .const import (
     DEFAULT_CTRL_MODE, DEFAULT_INTEGRATION_LANGUAGE, DEFAULT_NICK_NAME, DOMAIN,
     MIHOME_CERT_EXPIRE_MARGIN, NETWORK_REFRESH_INTERVAL,
@@ -158,7 +158,7 @@ class MIoTClient:
     _device_list_update_ts: int
 
     _sub_source_list: dict[str, Optional[str]]
-    _sub_tree: MIoTMatcher
+    _sub_tree: MIoTSubRouter
     _sub_device_state: dict[str, MipsDeviceState]
 
     _mips_local_state_changed_timers: dict[str, asyncio.TimerHandle]
@@ -169,6 +169,9 @@ class MIoTClient:
     _refresh_props_list: dict[str, dict]
     _refresh_props_timer: Optional[asyncio.TimerHandle]
     _refresh_props_retry_count: int
+    # Time needed to get all props fresh after startup
+    _refresh_props_start_ts: Optional[float]
+    _refresh_props_fresh_time: Optional[float]
 
     # Persistence notify handler, params: notify_id, title, message
     _persistence_notify: Callable[[str, Optional[str], Optional[str]], None]
@@ -228,7 +231,7 @@ class MIoTClient:
         self._device_list_lan = {}
         self._device_list_update_ts = 0
         self._sub_source_list = {}
-        self._sub_tree = MIoTMatcher()
+        self._sub_tree = MIoTSubRouter()
         self._sub_device_state = {}
 
         self._mips_local_state_changed_timers = {}
@@ -240,6 +243,8 @@ class MIoTClient:
         self._refresh_props_list = {}
         self._refresh_props_timer = None
         self._refresh_props_retry_count = 0
+        self._refresh_props_start_ts = None
+        self._refresh_props_fresh_time = None
 
         self._persistence_notify = None
         self._show_devices_changed_notify_timer = None
@@ -720,6 +725,8 @@ class MIoTClient:
             return
         self._refresh_props_list[key] = {
             'did': did, 'siid': siid, 'piid': piid}
+        if self._refresh_props_start_ts is None:
+            self._refresh_props_start_ts = time.monotonic()
         if self._refresh_props_timer:
             return
         self._refresh_props_timer = self._main_loop.call_later(
@@ -841,8 +848,9 @@ class MIoTClient:
         topic = (
             f'{did}/p/'
             f'{"#" if siid is None or piid is None else f"{siid}/{piid}"}')
-        self._sub_tree[topic] = MIoTClientSub(
-            topic=topic, handler=handler, handler_ctx=handler_ctx)
+        self._sub_tree.set(
+            did, 'p', siid, piid, MIoTClientSub(
+                topic=topic, handler=handler, handler_ctx=handler_ctx))
         _LOGGER.debug('client sub prop, %s', topic)
         return True
 
@@ -852,8 +860,7 @@ class MIoTClient:
         topic = (
             f'{did}/p/'
             f'{"#" if siid is None or piid is None else f"{siid}/{piid}"}')
-        if self._sub_tree.get(topic=topic):
-            del self._sub_tree[topic]
+        self._sub_tree.remove(did, 'p', siid, piid)
         _LOGGER.debug('client unsub prop, %s', topic)
         return True
 
@@ -867,8 +874,9 @@ class MIoTClient:
         topic = (
             f'{did}/e/'
             f'{"#" if siid is None or eiid is None else f"{siid}/{eiid}"}')
-        self._sub_tree[topic] = MIoTClientSub(
-            topic=topic, handler=handler, handler_ctx=handler_ctx)
+        self._sub_tree.set(
+            did, 'e', siid, eiid, MIoTClientSub(
+                topic=topic, handler=handler, handler_ctx=handler_ctx))
         _LOGGER.debug('client sub event, %s', topic)
         return True
 
@@ -878,8 +886,7 @@ class MIoTClient:
         topic = (
             f'{did}/e/'
             f'{"#" if siid is None or eiid is None else f"{siid}/{eiid}"}')
-        if self._sub_tree.get(topic=topic):
-            del self._sub_tree[topic]
+        self._sub_tree.remove(did, 'e', siid, eiid)
         _LOGGER.debug('client unsub event, %s', topic)
         return True
 
@@ -1311,8 +1318,8 @@ class MIoTClient:
         """params MUST contain did, siid, piid, value"""
         # BLE device has no online/offline msg
         try:
-            subs: list[MIoTClientSub] = list(self._sub_tree.iter_match(
-                f'{params["did"]}/p/{params["siid"]}/{params["piid"]}'))
+            subs: list[MIoTClientSub] = self._sub_tree.match(
+                params['did'], 'p', params['siid'], params['piid'])
             for sub in subs:
                 sub.handler(params, sub.handler_ctx)
         except Exception as err:  # pylint: disable=broad-exception-caught
@@ -1321,8 +1328,8 @@ class MIoTClient:
     @final
     def __on_event_msg(self, params: dict, ctx: Any) -> None:
         try:
-            subs: list[MIoTClientSub] = list(self._sub_tree.iter_match(
-                f'{params["did"]}/e/{params["siid"]}/{params["eiid"]}'))
+            subs: list[MIoTClientSub] = self._sub_tree.match(
+                params['did'], 'e', params['siid'], params['eiid'])
             for sub in subs:
                 sub.handler(params, sub.handler_ctx)
         except Exception as err:  # pylint: disable=broad-exception-caught
@@ -1631,10 +1638,12 @@ class MIoTClient:
                         group_id=group_id))))
 
     @final
-    async def __refresh_props_from_cloud(self, patch_len: int = 150) -> bool:
+    async def __refresh_props_from_cloud(self) -> bool:
         if not self._network.network_status:
             return False
 
+        # Adapted to the cloud latency and failures, see get_props_async
+        patch_len: int = self._http.props_aimd.batch_size
         request_list = None
         if len(self._refresh_props_list) < patch_len:
             request_list = self._refresh_props_list
@@ -1645,8 +1654,14 @@ class MIoTClient:
                 key, value = self._refresh_props_list.popitem()
                 request_list[key] = value
         try:
+            unread: list[dict] = []
             results = await self._http.get_props_async(
-                params=list(request_list.values()))
+                params=list(request_list.values()), unread=unread)
+            for param in unread:
+                # Not read for a failure of their request, retry them
+                key = f'{param["did"]}|{param["siid"]}|{param["piid"]}'
+                if key in request_list:
+                    self._refresh_props_list[key] = request_list.pop(key)
             if not results:
                 raise MIoTClientError('get_props_async failed')
             for result in results:
@@ -1679,49 +1694,55 @@ class MIoTClient:
     async def __refresh_props_from_gw(self) -> bool:
         if not self._mips_local or not self._device_list_gateway:
             return False
-        request_list = {}
-        succeed_once = False
+        # {group_id: {key: params}}
+        request_list: dict[str, dict[str, dict]] = {}
         for key in list(self._refresh_props_list.keys()):
             did = key.split('|')[0]
-            if did in request_list:
-                # NOTICE: A device only requests once a cycle, continuous
-                # acquisition of properties can cause device exceptions.
-                continue
             params = self._refresh_props_list.pop(key)
             device_gw = self._device_list_gateway.get(did, None)
             if not device_gw:
                 # Device not exist
                 continue
-            mips_gw = self._mips_local.get(device_gw['group_id'], None)
-            if not mips_gw:
+            if device_gw['group_id'] not in self._mips_local:
                 _LOGGER.error('mips gateway not exist, %s', key)
                 continue
-            request_list[did] = {
-                **params,
-                'fut': mips_gw.get_prop_async(
-                    did=did, siid=params['siid'], piid=params['piid'],
-                    timeout_ms=6000)}
-        results = await asyncio.gather(
-            *[v['fut'] for v in request_list.values()])
-        for (did, param), result in zip(request_list.items(), results):
-            if result is None:
-                # Don't use "not result", it will be skipped when result
-                # is 0, false
-                continue
-            self.__on_prop_msg(
-                params={
-                    'did': did,
-                    'siid': param['siid'],
-                    'piid': param['piid'],
-                    'value': result},
-                ctx=None)
-            succeed_once = True
+            request_list.setdefault(device_gw['group_id'], {})[key] = params
+        # NOTICE: Props of a device are read by one request at a time,
+        # continuous acquisition of properties can cause device exceptions.
+        # Different devices are read concurrently.
+        group_ids = list(request_list.keys())
+        results = await asyncio.gather(*[
+            self._mips_local[group_id].get_props_multi_async(
+                params=list(request_list[group_id].values()),
+                timeout_ms=6000)
+            for group_id in group_ids])
+        succeed_once = False
+        for group_id, (group_results, group_skipped) in zip(
+                group_ids, results):
+            for result in group_results:
+                request_list[group_id].pop(
+                    f'{result["did"]}|{result["siid"]}|{result["piid"]}',
+                    None)
+                self.__on_prop_msg(params=result, ctx=None)
+                succeed_once = True
+            for param in group_skipped:
+                # Not requested, keep them for the next cycle
+                key = f'{param["did"]}|{param["siid"]}|{param["piid"]}'
+                if key in request_list[group_id]:
+                    self._refresh_props_list[key] = request_list[
+                        group_id].pop(key)
+        failed_list: dict[str, dict] = {}
+        for group_list in request_list.values():
+            failed_list.update(group_list)
         if succeed_once:
+            if failed_list:
+                _LOGGER.info(
+                    'refresh props failed, gw, %s', list(failed_list.keys()))
             return True
         _LOGGER.info(
-            'refresh props failed, gw, %s', list(request_list.keys()))
+            'refresh props failed, gw, %s', list(failed_list.keys()))
         # Add failed request back to the list
-        self._refresh_props_list.update(request_list)
+        self._refresh_props_list.update(failed_list)
         return False
 
     @final
@@ -1772,24 +1793,42 @@ class MIoTClient:
         if not self._refresh_props_list:
             return
         # Cloud, Central hub gateway, Lan control
-        if (
-            await self.__refresh_props_from_cloud()
-            or await self.__refresh_props_from_gw()
+        refresh_delay: Optional[float] = None
+        if await self.__refresh_props_from_cloud():
+            # Do not hammer the cloud when it is slow or failing
+            refresh_delay = max(
+                REFRESH_PROPS_DELAY, self._http.props_aimd.interval)
+        elif (
+            await self.__refresh_props_from_gw()
             or await self.__refresh_props_from_lan()
         ):
+            refresh_delay = REFRESH_PROPS_DELAY
+        if refresh_delay is not None:
             self._refresh_props_retry_count = 0
             if self._refresh_props_list:
                 self._refresh_props_timer = self._main_loop.call_later(
-                    REFRESH_PROPS_DELAY, lambda: self._main_loop.create_task(
+                    refresh_delay, lambda: self._main_loop.create_task(
                         self.__refresh_props_handler()))
             else:
                 self._refresh_props_timer = None
+                if (
+                    self._refresh_props_fresh_time is None
+                    and self._refresh_props_start_ts is not None
+                ):
+                    self._refresh_props_fresh_time = (
+                        time.monotonic() - self._refresh_props_start_ts)
+                    _LOGGER.info(
+                        'refresh props, all props fresh after %.1fs',
+                        self._refresh_props_fresh_time)
             return
 
         # Try three times, and if it fails three times, empty the list.
         if self._refresh_props_retry_count >= 3:
             self._refresh_props_list = {}
             self._refresh_props_retry_count = 0
+            if self._refresh_props_fresh_time is None:
+                # Props given up, time the next refresh
+                self._refresh_props_start_ts = None
             if self._refresh_props_timer:
                 self._refresh_props_timer.cancel()
                 self._refresh_props_timer = None
@@ -57,7 +57,7 @@ from urllib.parse import urlencode
 import aiohttp
 
 # pylint: disable=relative-beyond-top-level
-from .common import calc_group_id
+from .common import MIoTAimdController, calc_group_id
 from .const import (
     UNSUPPORTED_MODELS,
     DEFAULT_OAUTH2_API_HOST,
@@ -232,7 +232,10 @@ class MIoTHttpClient:
     """MIoT http client."""
     # pylint: disable=inconsistent-quotes
     GET_PROP_AGGREGATE_INTERVAL: float = 0.2
+    GET_PROP_AGGREGATE_INTERVAL_MAX: float = 5
     GET_PROP_MAX_REQ_COUNT = 150
+    # Slower replies shrink the prop get batches
+    GET_PROP_LATENCY_TARGET: float = 3
     _main_loop: asyncio.AbstractEventLoop
     _session: aiohttp.ClientSession
     _host: str
@@ -242,6 +245,7 @@ class MIoTHttpClient:
 
     _get_prop_timer: Optional[asyncio.TimerHandle]
     _get_prop_list: dict[str, dict]
+    _props_aimd: MIoTAimdController
 
     def __init__(
             self, cloud_server: str, client_id: str, access_token: str,
@@ -255,6 +259,11 @@ class MIoTHttpClient:
 
         self._get_prop_timer = None
         self._get_prop_list = {}
+        self._props_aimd = MIoTAimdController(
+            batch_max=self.GET_PROP_MAX_REQ_COUNT,
+            interval_min=self.GET_PROP_AGGREGATE_INTERVAL,
+            interval_max=self.GET_PROP_AGGREGATE_INTERVAL_MAX,
+            latency_target=self.GET_PROP_LATENCY_TARGET)
 
         if (
             not isinstance(cloud_server, str)
@@ -328,7 +337,8 @@ class MIoTHttpClient:
         if res_obj.get('code', None) != 0:
             raise MIoTHttpError(
                 f'invalid response code, {res_obj.get("code",None)}, '
-                f'{res_obj.get("message","")}')
+                f'{res_obj.get("message","")}',
+                MIoTErrorCode.CODE_HTTP_INVALID_RESPONSE)
         _LOGGER.debug(
             'mihome api get, %s%s, %s -> %s',
             self._base_url, url_path, params, res_obj)
@@ -356,7 +366,8 @@ class MIoTHttpClient:
         if res_obj.get('code', None) != 0:
             raise MIoTHttpError(
                 f'invalid response code, {res_obj.get("code",None)}, '
-                f'{res_obj.get("message","")}')
+                f'{res_obj.get("message","")}',
+                MIoTErrorCode.CODE_HTTP_INVALID_RESPONSE)
         _LOGGER.debug(
             'mihome api post, %s%s, %s -> %s',
             self._base_url, url_path, data, res_obj)
@@ -719,21 +730,107 @@ class MIoTHttpClient:
             'devices': devices
         }
 
-    async def get_props_async(self, params: list) -> list:
+    @property
+    def props_aimd(self) -> MIoTAimdController:
+        """Batch size and interval to use for get_props_async."""
+        return self._props_aimd
+
+    async def get_props_async(
+        self, params: list, unread: Optional[list] = None
+    ) -> list:
         """
         params = [{"did": "xxxx", "siid": 2, "piid": 1},
                     {"did": "xxxxxx", "siid": 2, "piid": 2}]
+
+        If the cloud rejects the request (error code in the reply), it is
+        split in halves (recursively, within a bounded number of failures)
+        to isolate the devices making it fail: their props are left out of
+        the result. Any other failure of the request is raised. The latency
+        of the requests and their failures drive props_aimd.
+
+        unread, if given, gets the params left out without their device
+        being rejected (a split request failed or the failures allowed ran
+        out) so that the caller can retry them.
         """
-        res_obj = await self.__mihome_api_post_async(
-            url_path='/app/v2/miotspec/prop/get',
-            data={
-                'datasource': 1,
-                'params': params
-            },
-        )
-        if 'result' not in res_obj:
-            raise MIoTHttpError('invalid response result')
-        return res_obj['result']
+        params_by_did: dict[str, list] = {}
+        for param in params:
+            params_by_did.setdefault(param['did'], []).append(param)
+        groups = list(params_by_did.values())
+        # budget: rejections still allowed, failed: props left out,
+        # latency: of the slowest request answered, unread: params to retry
+        split_ctx: dict[str, Any] = {
+            'budget': 2 * (len(groups).bit_length() + 1),
+            'failed': False,
+            'latency': 0.0,
+            'unread': [] if unread is None else unread}
+        try:
+            results = await self.__get_props_split_async(
+                groups=groups, split_ctx=split_ctx, root=True)
+        except Exception:
+            self._props_aimd.on_failure()
+            raise
+        if split_ctx['failed']:
+            self._props_aimd.on_failure()
+        else:
+            self._props_aimd.on_success(split_ctx['latency'])
+        return results
+
+    async def __get_props_split_async(
+        self, groups: list[list], split_ctx: dict[str, Any],
+        root: bool = False
+    ) -> list:
+        """groups: params grouped by did, split_ctx: see get_props_async."""
+        start_ts = time.monotonic()
+        try:
+            res_obj = await self.__mihome_api_post_async(
+                url_path='/app/v2/miotspec/prop/get',
+                data={
+                    'datasource': 1,
+                    'params': [param for group in groups for param in group]
+                },
+            )
+            if 'result' not in res_obj:
+                raise MIoTHttpError(
+                    'invalid response result',
+                    MIoTErrorCode.CODE_HTTP_INVALID_RESPONSE)
+            split_ctx['latency'] = max(
+                split_ctx['latency'], time.monotonic() - start_ts)
+            return res_obj['result']
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            if not (
+                isinstance(err, MIoTHttpError)
+                and err.code == MIoTErrorCode.CODE_HTTP_INVALID_RESPONSE
+            ):
+                # The request itself failed, not because of its props
+                if root:
+                    raise
+                split_ctx['failed'] = True
+                split_ctx['unread'].extend(
+                    param for group in groups for param in group)
+                _LOGGER.error(
+                    'get prop error, %s devices not read, %s',
+                    len(groups), err)
+                return []
+            split_ctx['failed'] = True
+            if split_ctx['budget'] <= 0:
+                split_ctx['unread'].extend(
+                    param for group in groups for param in group)
+                _LOGGER.error(
+                    'get prop error, %s devices not read, %s',
+                    len(groups), err)
+                return []
+            split_ctx['budget'] -= 1
+            if len(groups) == 1:
+                _LOGGER.error(
+                    'get prop error, %s, %s', groups[0][0]['did'], err)
+                return []
+        half = len(groups) // 2
+        results: list = []
+        for part in (groups[:half], groups[half:]):
+            await asyncio.sleep(self.GET_PROP_AGGREGATE_INTERVAL)
+            results.extend(await self.__get_props_split_async(
+                groups=part, split_ctx=split_ctx))
+        return results
 
     async def __get_prop_async(self, did: str, siid: int, piid: int) -> Any:
         results = await self.get_props_async(
@@ -753,7 +850,7 @@ class MIoTHttpClient:
             if item.get('tag', False):
                 continue
             # NOTICE: max req prop
-            if len(props_req) >= self.GET_PROP_MAX_REQ_COUNT:
+            if len(props_req) >= self._props_aimd.batch_size:
                 break
             item['tag'] = True
             props_buffer.append(item['param'])
@@ -762,7 +859,11 @@ class MIoTHttpClient:
         if not props_buffer:
             _LOGGER.error('get prop error, empty request list')
             return False
-        results = await self.get_props_async(props_buffer)
+        try:
+            results = await self.get_props_async(props_buffer)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            _LOGGER.error('get prop error, %s', err)
+            results = []
 
         for result in results:
             if not all(
@@ -787,7 +888,7 @@ class MIoTHttpClient:
 
         if self._get_prop_list:
             self._get_prop_timer = self._main_loop.call_later(
-                self.GET_PROP_AGGREGATE_INTERVAL,
+                self._props_aimd.interval,
                 lambda: self._main_loop.create_task(
                     self.__get_prop_handler()))
         else:
@@ -810,7 +911,7 @@ class MIoTHttpClient:
         }
         if self._get_prop_timer is None:
             self._get_prop_timer = self._main_loop.call_later(
-                self.GET_PROP_AGGREGATE_INTERVAL,
+                self._props_aimd.interval,
                 lambda: self._main_loop.create_task(
                     self.__get_prop_handler()))
 
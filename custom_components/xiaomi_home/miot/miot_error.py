@@ -63,6 +63,7 @@ class MIoTErrorCode(Enum):
     CODE_OAUTH_UNAUTHORIZED = -10020
     # Http error code
     CODE_HTTP_INVALID_ACCESS_TOKEN = -10030
+    CODE_HTTP_INVALID_RESPONSE = -10031
     # MIoT mips error code
     CODE_MIPS_INVALID_RESULT = -10040
     # MIoT cert error code
@@ -47,6 +47,7 @@ MIoT lan device control, only support MIoT SPEC-v2 WiFi devices.
 """
 
 
+import hashlib
 import json
 import time
 import asyncio
@@ -60,7 +61,6 @@ import struct
 import threading
 from typing import Any, Callable, Coroutine, Optional, final
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 
@@ -69,7 +69,8 @@ from .miot_error import MIoTError, MIoTLanError, MIoTErrorCode
 from .miot_network import InterfaceStatus, MIoTNetwork, NetworkInfo
 from .miot_mdns import MipsService, MipsServiceState
 from .common import (
-    randomize_float, load_yaml_file, gen_absolute_path, MIoTMatcher)
+    randomize_float, load_yaml_file, gen_absolute_path, MIoTSubRouter,
+    MIoTHandoffQueue)
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -85,11 +86,19 @@ class _MIoTLanGetDevListData:
 @dataclass
 class _MIoTLanUnregisterBroadcastData:
     key: str
+    did: str
+    kind: str
+    siid: Optional[int]
+    iid: Optional[int]
 
 
 @dataclass
 class _MIoTLanRegisterBroadcastData:
     key: str
+    did: str
+    kind: str
+    siid: Optional[int]
+    iid: Optional[int]
     handler: Callable[[dict, Any], None]
     handler_ctx: Any
 
@@ -133,6 +142,7 @@ class _MIoTLanDevice:
     # pylint: disable=unused-argument
     OT_HEADER: int = 0x2131
     OT_HEADER_LEN: int = 32
+    AES_BLOCK_LEN: int = 16
     NETWORK_UNSTABLE_CNT_TH: int = 10
     NETWORK_UNSTABLE_TIME_TH: float = 120
     NETWORK_UNSTABLE_RESUME_TH: float = 300
@@ -146,6 +156,11 @@ class _MIoTLanDevice:
     cipher: Cipher
     ip: Optional[str]
 
+    _aes_iv: bytes
+    # ECB contexts are stateless between blocks so, unlike the CBC ones,
+    # can be kept across packets (the CBC chaining is done in decrypt_packet)
+    _ecb_decryptor: Any
+
     offset: int
     subscribed: bool
     sub_ts: int
@@ -173,11 +188,7 @@ class _MIoTLanDevice:
     ) -> None:
         self._manager: MIoTLan = manager
         self.did = did
-        self.token = bytes.fromhex(token)
-        aes_key: bytes = self.__md5(self.token)
-        aex_iv: bytes = self.__md5(aes_key + self.token)
-        self.cipher = Cipher(
-            algorithms.AES128(aes_key), modes.CBC(aex_iv), default_backend())
+        self.__update_token(bytes.fromhex(token))
         self.ip = ip
         self.offset = 0
         self.subscribed = False
@@ -227,37 +238,59 @@ class _MIoTLanDevice:
         self, out_buffer: bytearray, clear_data: dict, did: str, offset: int
     ) -> int:
         clear_bytes = json.dumps(clear_data, ensure_ascii=False).encode('utf-8')
-        padder = padding.PKCS7(algorithms.AES128.block_size).padder()
-        padded_data = padder.update(clear_bytes) + padder.finalize()
-        if len(padded_data) + self.OT_HEADER_LEN > len(out_buffer):
+        # PKCS7 padding
+        pad_len = self.AES_BLOCK_LEN - len(clear_bytes) % self.AES_BLOCK_LEN
+        data_len: int = self.OT_HEADER_LEN + len(clear_bytes) + pad_len
+        if data_len > len(out_buffer):
             raise ValueError('rpc too long')
         encryptor = self.cipher.encryptor()
-        encrypted_data = encryptor.update(padded_data) + encryptor.finalize()
-        data_len: int = len(encrypted_data)+self.OT_HEADER_LEN
-        out_buffer[:32] = struct.pack(
-            '>HHQI16s', self.OT_HEADER, data_len, int(did), offset,
-            self.token)
-        out_buffer[32:data_len] = encrypted_data
-        msg_md5: bytes = self.__md5(out_buffer[0:data_len])
-        out_buffer[16:32] = msg_md5
+        out_view = memoryview(out_buffer)
+        struct.pack_into(
+            '>HHQI16s', out_buffer, 0, self.OT_HEADER, data_len, int(did),
+            offset, self.token)
+        out_view[32:data_len] = encryptor.update(
+            clear_bytes + bytes((pad_len,)) * pad_len)
+        out_view[16:32] = hashlib.md5(out_view[0:data_len]).digest()
         return data_len
 
-    def decrypt_packet(self, encrypted_data: bytearray) -> dict:
-        data_len: int = struct.unpack('>H', encrypted_data[2:4])[0]
-        md5_orig: bytes = encrypted_data[16:32]
-        encrypted_data[16:32] = self.token
-        md5_calc: bytes = self.__md5(encrypted_data[0:data_len])
-        if md5_orig != md5_calc:
-            raise ValueError(f'invalid md5, {md5_orig}, {md5_calc}')
-        decryptor = self.cipher.decryptor()
-        decrypted_padded_data = decryptor.update(
-            encrypted_data[32:data_len]) + decryptor.finalize()
-        unpadder = padding.PKCS7(algorithms.AES128.block_size).unpadder()
-        decrypted_data = unpadder.update(
-            decrypted_padded_data) + unpadder.finalize()
+    def decrypt_packet(self, data: memoryview) -> dict:
+        """Decrypt a packet.
+
+        data is usually a view over the (shared) socket read buffer so it
+        is neither copied nor modified: the md5 is computed over the header
+        (with the token in place of the md5 field) and the payload without
+        moving them, and the payload is decrypted straight from the view.
+        """
+        data_len: int = struct.unpack_from('>H', data, 2)[0]
+        payload_len = data_len - self.OT_HEADER_LEN
+        if (
+            data_len > len(data)
+            or payload_len <= 0
+            or payload_len % self.AES_BLOCK_LEN
+        ):
+            raise ValueError(f'invalid data length, {data_len}')
+        hasher = hashlib.md5(data[0:16])
+        hasher.update(self.token)
+        hasher.update(data[32:data_len])
+        md5_calc: bytes = hasher.digest()
+        if data[16:32] != md5_calc:
+            raise ValueError(f'invalid md5, {bytes(data[16:32])}, {md5_calc}')
+        encrypted_data = data[32:data_len]
+        # CBC: every block deciphered is xored with the previous ciphertext
+        # (the iv for the first one): xor them all at once
+        decrypted_data = (
+            int.from_bytes(
+                self._ecb_decryptor.update(encrypted_data), 'big')
+            ^ int.from_bytes(
+                self._aes_iv + encrypted_data[:-self.AES_BLOCK_LEN], 'big')
+        ).to_bytes(payload_len, 'big')
+        pad_len = decrypted_data[-1]
+        if not 0 < pad_len <= self.AES_BLOCK_LEN or (
+            decrypted_data[-pad_len:] != bytes((pad_len,)) * pad_len
+        ):
+            raise ValueError('invalid padding')
         # Some device will add a redundant \0 at the end of JSON string
-        decrypted_data = decrypted_data.rstrip(b'\x00')
-        return json.loads(decrypted_data)
+        return json.loads(decrypted_data[:-pad_len].rstrip(b'\x00'))
 
     def subscribe(self) -> None:
         if self._sub_locked:
@@ -321,12 +354,7 @@ class _MIoTLanDevice:
             and info['token'].upper() != self.token.hex().upper()
         ):
             # Update token
-            self.token = bytes.fromhex(info['token'])
-            aes_key: bytes = self.__md5(self.token)
-            aex_iv: bytes = self.__md5(aes_key + self.token)
-            self.cipher = Cipher(
-                algorithms.AES128(aes_key),
-                modes.CBC(aex_iv), default_backend())
+            self.__update_token(bytes.fromhex(info['token']))
             _LOGGER.debug('update token, %s', self.did)
 
     def __subscribe_handler(self, msg: dict, sub_ts: int) -> None:
@@ -429,6 +457,17 @@ class _MIoTLanDevice:
         _LOGGER.info('unstable resume threshold past, %s', self.did)
         self.online = True
 
+    def __update_token(self, token: bytes) -> None:
+        self.token = token
+        aes_key: bytes = self.__md5(self.token)
+        self._aes_iv = self.__md5(aes_key + self.token)
+        self.cipher = Cipher(
+            algorithms.AES128(aes_key),
+            modes.CBC(self._aes_iv), default_backend())
+        self._ecb_decryptor = Cipher(
+            algorithms.AES128(aes_key), modes.ECB(),
+            default_backend()).decryptor()
+
     def __md5(self, data: bytes) -> bytes:
         hasher = hashes.Hash(hashes.MD5(), default_backend())
         hasher.update(data)
@@ -451,6 +490,7 @@ class MIoTLan:
     PROFILE_MODELS_FILE: str = 'lan/profile_models.yaml'
 
     _main_loop: asyncio.AbstractEventLoop
+    _main_loop_handoff: MIoTHandoffQueue
     _net_ifs: set[str]
     _network: MIoTNetwork
     _mips_service: MipsService
@@ -460,6 +500,7 @@ class MIoTLan:
     _probe_msg: bytes
     _write_buffer: bytearray
     _read_buffer: bytearray
+    _read_view: memoryview
 
     _internal_loop: asyncio.AbstractEventLoop
     _thread: threading.Thread
@@ -471,7 +512,7 @@ class MIoTLan:
     _last_scan_interval: Optional[float]
     _msg_id_counter: int
     _pending_requests: dict[int, _MIoTLanRequestData]
-    _device_msg_matcher: MIoTMatcher
+    _device_msg_matcher: MIoTSubRouter
     _device_state_sub_map: dict[str, _MIoTLanSubDeviceData]
     _reply_msg_buffer: dict[str, asyncio.TimerHandle]
 
@@ -499,6 +540,7 @@ class MIoTLan:
         if not mips_service:
             raise ValueError('mips_service is required')
         self._main_loop = loop or asyncio.get_event_loop()
+        self._main_loop_handoff = MIoTHandoffQueue(self._main_loop)
         self._net_ifs = set(net_ifs)
         self._network = network
         self._network.sub_network_info(
@@ -520,6 +562,7 @@ class MIoTLan:
         probe_bytes[28:32] = b'\x00\x00\x00\x00'
         self._probe_msg = bytes(probe_bytes)
         self._read_buffer = bytearray(self.OT_MSG_LEN)
+        self._read_view = memoryview(self._read_buffer)
         self._write_buffer = bytearray(self.OT_MSG_LEN)
 
         self._lan_devices = {}
@@ -530,7 +573,7 @@ class MIoTLan:
         self._last_scan_interval = None
         self._msg_id_counter = int(random.random()*0x7FFFFFFF)
         self._pending_requests = {}
-        self._device_msg_matcher = MIoTMatcher()
+        self._device_msg_matcher = MIoTSubRouter()
         self._device_state_sub_map = {}
         self._reply_msg_buffer = {}
 
@@ -634,7 +677,7 @@ class MIoTLan:
         self._last_scan_interval = None
         self._msg_id_counter = int(random.random()*0x7FFFFFFF)
         self._pending_requests = {}
-        self._device_msg_matcher = MIoTMatcher()
+        self._device_msg_matcher = MIoTSubRouter()
         self._device_state_sub_map = {}
         self._reply_msg_buffer = {}
         for handler in list(self._lan_state_sub_map.values()):
@@ -749,7 +792,8 @@ class MIoTLan:
         self._internal_loop.call_soon_threadsafe(
             self.__sub_broadcast,
             _MIoTLanRegisterBroadcastData(
-                key=key, handler=handler, handler_ctx=handler_ctx))
+                key=key, did=did, kind='p', siid=siid, iid=piid,
+                handler=handler, handler_ctx=handler_ctx))
         return True
 
     @final
@@ -768,7 +812,8 @@ class MIoTLan:
             f'{"#" if siid is None or piid is None else f"{siid}/{piid}"}')
         self._internal_loop.call_soon_threadsafe(
             self.__unsub_broadcast,
-            _MIoTLanUnregisterBroadcastData(key=key))
+            _MIoTLanUnregisterBroadcastData(
+                key=key, did=did, kind='p', siid=siid, iid=piid))
         return True
 
     @final
@@ -790,7 +835,8 @@ class MIoTLan:
         self._internal_loop.call_soon_threadsafe(
             self.__sub_broadcast,
             _MIoTLanRegisterBroadcastData(
-                key=key, handler=handler, handler_ctx=handler_ctx))
+                key=key, did=did, kind='e', siid=siid, iid=eiid,
+                handler=handler, handler_ctx=handler_ctx))
         return True
 
     @final
@@ -809,7 +855,8 @@ class MIoTLan:
             f'{"#" if siid is None or eiid is None else f"{siid}/{eiid}"}')
         self._internal_loop.call_soon_threadsafe(
             self.__unsub_broadcast,
-            _MIoTLanUnregisterBroadcastData(key=key))
+            _MIoTLanUnregisterBroadcastData(
+                key=key, did=did, kind='e', siid=siid, iid=eiid))
         return True
 
     @final
@@ -1064,12 +1111,13 @@ class MIoTLan:
         self._device_state_sub_map.pop(data.key, None)
 
     def __sub_broadcast(self, data: _MIoTLanRegisterBroadcastData) -> None:
-        self._device_msg_matcher[data.key] = data
+        self._device_msg_matcher.set(
+            data.did, data.kind, data.siid, data.iid, data)
         _LOGGER.debug('lan register broadcast, %s', data.key)
 
     def __unsub_broadcast(self, data: _MIoTLanUnregisterBroadcastData) -> None:
-        if self._device_msg_matcher.get(topic=data.key):
-            del self._device_msg_matcher[data.key]
+        self._device_msg_matcher.remove(
+            data.did, data.kind, data.siid, data.iid)
         _LOGGER.debug('lan unregister broadcast, %s', data.key)
 
     def __get_dev_list(self, data: _MIoTLanGetDevListData) -> None:
@@ -1163,7 +1211,7 @@ class MIoTLan:
         for timer in self._reply_msg_buffer.values():
             timer.cancel()
         self._reply_msg_buffer.clear()
-        self._device_msg_matcher = MIoTMatcher()
+        self._device_msg_matcher = MIoTSubRouter()
         self.__deinit_socket()
         self._internal_loop.stop()
 
@@ -1221,22 +1269,23 @@ class MIoTLan:
             if addr[1] != self.OT_PORT:
                 # Not ot msg
                 return
+            # The view is only valid until the next read
             self.__raw_message_handler(
-                self._read_buffer[:data_len], data_len, addr[0], ctx[0])
+                self._read_view[:data_len], data_len, addr[0], ctx[0])
         except Exception as err:  # pylint: disable=broad-exception-caught
             _LOGGER.error('socket read handler error, %s', err)
 
     def __raw_message_handler(
-        self, data: bytearray, data_len: int, ip: str, if_name: str
+        self, data: memoryview, data_len: int, ip: str, if_name: str
     ) -> None:
-        if data[:2] != self.OT_HEADER:
+        if data_len < self.OT_PROBE_LEN or data[:2] != self.OT_HEADER:
             return
         # Keep alive message
-        did: str = str(struct.unpack('>Q', data[4:12])[0])
+        did_int, timestamp = struct.unpack_from('>QI', data, 4)
+        did: str = str(did_int)
         device: Optional[_MIoTLanDevice] = self._lan_devices.get(did)
         if not device:
             return
-        timestamp: int = struct.unpack('>I', data[12:16])[0]
         device.offset = int(time.time()) - timestamp
         # Keep alive if this is a probe
         if data_len == self.OT_PROBE_LEN or device.subscribed:
@@ -1250,7 +1299,7 @@ class MIoTLan:
         ):
             device.supported_wildcard_sub = (
                 int(data[28]) == self.OT_SUPPORT_WILDCARD_SUB)
-            sub_ts = struct.unpack('>I', data[20:24])[0]
+            sub_ts = struct.unpack_from('>I', data, 20)[0]
             sub_type = int(data[27])
             if (
                 device.supported_wildcard_sub
@@ -1280,8 +1329,7 @@ class MIoTLan:
                 req.timeout.cancel()
                 req.timeout = None
             if req.handler is not None:
-                self._main_loop.call_soon_threadsafe(
-                    req.handler, msg, req.handler_ctx)
+                self._main_loop_handoff.put(req.handler, msg, req.handler_ctx)
             return
         # Handle up link message
         if 'method' not in msg or 'params' not in msg:
@@ -1300,22 +1348,22 @@ class MIoTLan:
                     _LOGGER.debug(
                         'invalid message, no siid or piid, %s, %s', did, msg)
                     continue
-                key = f'{did}/p/{param["siid"]}/{param["piid"]}'
-                subs: list[_MIoTLanRegisterBroadcastData] = list(
-                    self._device_msg_matcher.iter_match(key))
+                subs: list[_MIoTLanRegisterBroadcastData] = (
+                    self._device_msg_matcher.match(
+                        did, 'p', param['siid'], param['piid']))
                 for sub in subs:
-                    self._main_loop.call_soon_threadsafe(
+                    self._main_loop_handoff.put(
                         sub.handler, param, sub.handler_ctx)
         elif (
                 msg['method'] == 'event_occured'
                 and 'siid' in msg['params']
                 and 'eiid' in msg['params']
         ):
-            key = f'{did}/e/{msg["params"]["siid"]}/{msg["params"]["eiid"]}'
-            subs: list[_MIoTLanRegisterBroadcastData] = list(
-                self._device_msg_matcher.iter_match(key))
+            subs: list[_MIoTLanRegisterBroadcastData] = (
+                self._device_msg_matcher.match(
+                    did, 'e', msg['params']['siid'], msg['params']['eiid']))
             for sub in subs:
-                self._main_loop.call_soon_threadsafe(
+                self._main_loop_handoff.put(
                     sub.handler, msg['params'], sub.handler_ctx)
         else:
             _LOGGER.debug(
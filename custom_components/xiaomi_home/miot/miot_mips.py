@@ -67,7 +67,7 @@ from paho.mqtt.client import (
     MQTTMessage)
 
 # pylint: disable=relative-beyond-top-level
-from .common import MIoTMatcher
+from .common import MIoTHandoffQueue, MIoTMatcher
 from .const import (
     UNSUPPORTED_MODELS,
     MIHOME_MQTT_KEEPALIVE,
@@ -225,6 +225,7 @@ class _MipsClient(ABC):
     MIPS_SUB_PATCH: int = 300
     MIPS_SUB_INTERVAL: float = 1
     main_loop: asyncio.AbstractEventLoop
+    _main_loop_handoff: MIoTHandoffQueue
     _logger: Optional[logging.Logger]
     _client_id: str
     _host: str
@@ -267,6 +268,7 @@ class _MipsClient(ABC):
     ) -> None:
         # MUST run with running loop
         self.main_loop = loop or asyncio.get_running_loop()
+        self._main_loop_handoff = MIoTHandoffQueue(self.main_loop)
         self._logger = None
         self._client_id = client_id
         self._host = host
@@ -1107,7 +1109,7 @@ class MipsCloudClient(_MipsClient):
             if item.handler is None:
                 continue
             # NOTICE: call threadsafe
-            self.main_loop.call_soon_threadsafe(
+            self._main_loop_handoff.put(
                 item.handler, topic, payload_str, item.handler_ctx)
 
 
@@ -1119,6 +1121,10 @@ class MipsLocalClient(_MipsClient):
     MIPS_RECONNECT_INTERVAL_MAX: float = 60
     MIPS_SUB_PATCH: int = 1000
     MIPS_SUB_INTERVAL: float = 0.1
+    # Devices whose props are read at the same time
+    GET_PROPS_CONCURRENCY: int = 16
+    # Max props read with a single get_properties rpc
+    GET_PROPS_BATCH_MAX: int = 20
     _did: str
     _group_id: str
     _home_name: str
@@ -1129,6 +1135,8 @@ class MipsLocalClient(_MipsClient):
     _msg_matcher: MIoTMatcher
     _get_prop_queue: dict[str, list]
     _get_prop_timer: Optional[asyncio.TimerHandle]
+    # Whether the gateway answers get_properties rpc, None if not known yet
+    _get_props_batch: Optional[bool]
     _on_dev_list_changed: Optional[Callable[[Any, list[str]], Coroutine]]
 
     def __init__(
@@ -1147,6 +1155,7 @@ class MipsLocalClient(_MipsClient):
         self._msg_matcher = MIoTMatcher()
         self._get_prop_queue = {}
         self._get_prop_timer = None
+        self._get_props_batch = None
         self._on_dev_list_changed = None
 
         super().__init__(
@@ -1305,6 +1314,126 @@ class MipsLocalClient(_MipsClient):
             return None
         return result_obj['value']
 
+    @final
+    async def get_props_async(
+        self, did: str, props: list[tuple[int, int]],
+        timeout_ms: int = 10000
+    ) -> list[Any]:
+        """Get several props of a device.
+
+        The props are read with a single get_properties rpc when the
+        gateway supports it, otherwise with proxy/get one at a time (never
+        more than one request in flight for the device). While the support
+        is not known, and the rpc failed, only the first prop is read with
+        proxy/get: the others are read once the gateway told us which way
+        works, and not at all if the device did not answer either way.
+
+        Returns:
+            The values, in the props order, None for the ones failed. Shorter
+            than props when the device was not read any further, the
+            missing props were not requested.
+        """
+        if self._get_props_batch is not False:
+            payload_obj: dict = {
+                'did': did,
+                'rpc': {
+                    'id': self.__gen_mips_id,
+                    'method': 'get_properties',
+                    'params': [
+                        {'did': did, 'siid': siid, 'piid': piid}
+                        for siid, piid in props]
+                }
+            }
+            result_obj = await self.__request_async(
+                topic='proxy/rpcReq', payload=json.dumps(payload_obj),
+                timeout_ms=timeout_ms)
+            if (
+                isinstance(result_obj, dict)
+                and isinstance(result_obj.get('result', None), list)
+            ):
+                self._get_props_batch = True
+                values: dict[tuple[int, int], Any] = {
+                    (item.get('siid'), item.get('piid')): item['value']
+                    for item in result_obj['result']
+                    if isinstance(item, dict)
+                    and item.get('did', did) == did
+                    and item.get('code', 0) == 0
+                    and 'value' in item}
+                return [values.get(prop, None) for prop in props]
+            if self._get_props_batch:
+                # Supported, the device did not answer
+                return [None] * len(props)
+        results: list[Any] = []
+        for siid, piid in props:
+            result = await self.get_prop_async(
+                did=did, siid=siid, piid=piid, timeout_ms=timeout_ms)
+            results.append(result)
+            if self._get_props_batch is None:
+                if result is None:
+                    # Neither get_properties nor proxy/get answered, the
+                    # device is likely offline
+                    break
+                # proxy/get works while get_properties did not
+                self._get_props_batch = False
+                self.log_info(
+                    'get_properties rpc not supported, use proxy/get')
+        return results
+
+    @final
+    async def get_props_multi_async(
+        self, params: list[dict], timeout_ms: int = 10000
+    ) -> tuple[list[dict], list[dict]]:
+        """Get the props of several devices.
+
+        Devices are read concurrently (at most GET_PROPS_CONCURRENCY at the
+        same time), each one with a request at a time (see get_props_async)
+        since continuous acquisition of properties can cause device
+        exceptions.
+
+        Args:
+            params: [{'did': did, 'siid': siid, 'piid': piid}, ...]
+
+        Returns:
+            ([{'did': did, 'siid': siid, 'piid': piid, 'value': value}, ...]
+            for the props read, [{'did': did, 'siid': siid, 'piid': piid},
+            ...] for the props not requested since their device did not
+            answer the previous ones)
+        """
+        props_by_did: dict[str, list[tuple[int, int]]] = {}
+        for param in params:
+            props_by_did.setdefault(param['did'], []).append(
+                (param['siid'], param['piid']))
+        semaphore = asyncio.Semaphore(self.GET_PROPS_CONCURRENCY)
+        results: list[dict] = []
+        skipped: list[dict] = []
+
+        async def get_device_props(
+            did: str, props: list[tuple[int, int]]
+        ) -> None:
+            async with semaphore:
+                for index in range(0, len(props), self.GET_PROPS_BATCH_MAX):
+                    batch = props[index:index+self.GET_PROPS_BATCH_MAX]
+                    values = await self.get_props_async(
+                        did=did, props=batch, timeout_ms=timeout_ms)
+                    for (siid, piid), value in zip(batch, values):
+                        if value is None:
+                            continue
+                        results.append({
+                            'did': did, 'siid': siid, 'piid': piid,
+                            'value': value})
+                    if len(values) < len(batch) or all(
+                            value is None for value in values):
+                        # The device did not answer, leave it for this cycle
+                        skipped.extend(
+                            {'did': did, 'siid': siid, 'piid': piid}
+                            for siid, piid in props[index+len(values):])
+                        break
+
+        await asyncio.gather(*[
+            get_device_props(did, props)
+            for did, props in props_by_did.items()])
+        return results, skipped
+
     @final
     async def set_prop_async(
         self, did: str, siid: int, piid: int, value: Any,
@@ -1539,7 +1668,7 @@ class MipsLocalClient(_MipsClient):
                 if req.timer:
                     req.timer.cancel()
                 if req.on_reply:
-                    self.main_loop.call_soon_threadsafe(
+                    self._main_loop_handoff.put(
                         req.on_reply, mips_msg.payload or '{}',
                         req.on_reply_ctx)
             return
@@ -1551,7 +1680,7 @@ class MipsLocalClient(_MipsClient):
             for item in bc_list or []:
                 if item.handler is None:
                     continue
-                self.main_loop.call_soon_threadsafe(
+                self._main_loop_handoff.put(
                     item.handler, topic[topic.find('/')+1:],
                     mips_msg.payload or '{}', item.handler_ctx)
             return
@@ -1567,7 +1696,7 @@ class MipsLocalClient(_MipsClient):
                     'unknown devListChange msg, %s', mips_msg.payload)
                 return
             if self._on_dev_list_changed:
-                self.main_loop.call_soon_threadsafe(
+                self._main_loop_handoff.put(
                     self.main_loop.create_task,
                     self._on_dev_list_changed(self, dev_list))
             return
@@ -1650,20 +1779,27 @@ class MipsLocalClient(_MipsClient):
                 'message': f'Error: {result}'}
 
     async def __get_prop_timer_handle(self) -> None:
-        for did in list(self._get_prop_queue.keys()):
-            item = self._get_prop_queue[did].pop()
-            _LOGGER.debug('get prop, %s, %s', did, item)
-            result_obj = await self.__request_async(
-                topic='proxy/get',
-                payload=item['param'],
-                timeout_ms=item['timeout_ms'])
+        # One request per device a round, devices run concurrently
+        semaphore = asyncio.Semaphore(self.GET_PROPS_CONCURRENCY)
+
+        async def get_prop(did: str, item: dict) -> None:
+            async with semaphore:
+                _LOGGER.debug('get prop, %s, %s', did, item)
+                result_obj = await self.__request_async(
+                    topic='proxy/get',
+                    payload=item['param'],
+                    timeout_ms=item['timeout_ms'])
             if result_obj is None or 'value' not in result_obj:
                 item['fut'].set_result(None)
             else:
                 item['fut'].set_result(result_obj['value'])
 
+        requests = []
+        for did in list(self._get_prop_queue.keys()):
+            requests.append(get_prop(did, self._get_prop_queue[did].pop()))
             if not self._get_prop_queue[did]:
                 self._get_prop_queue.pop(did, None)
+        await asyncio.gather(*requests)
 
         if self._get_prop_queue:
             self._get_prop_timer = self.main_loop.call_later(